@@ -0,0 +1,172 @@
+"""
+### Deterministic synthetic PREMIS records for benchmarking ###
+
+generate_record() builds a PremisRecord of a configurable size. The same
+arguments (including the seed) always produce the same record, so timings
+taken at different commits are comparable.
+
+Each object has an identifier, characteristics (format, MD5 and SHA-256
+fixity, size and, with extension_depth > 0, an extension), storage and an
+original name, and links to its events. Each event links back to its
+object and to one of the agents. Rights statements are spread across the
+objects.
+
+Usage: python benchmarks/corpus.py OUTPUT [--objects N] [--events-per-object N]
+       [--agents N] [--rights N] [--extension-depth N] [--seed N]
+"""
+
+import random
+from argparse import ArgumentParser
+
+from pypremis.lib import PremisRecord
+from pypremis.nodes import *
+
+
+EVENT_TYPES = ['ingestion', 'fixity check', 'format identification',
+               'validation', 'replication', 'migration']
+FORMATS = [('text/plain', '1.0'), ('image/tiff', '6.0'), ('application/pdf', '1.7'),
+           ('audio/x-wav', '1.0'), ('image/jpeg', '1.02')]
+
+
+def build_extension(extensionClass, rng, depth, breadth=2):
+    """
+    Builds an ExtendedNode of the given class, with [breadth] nested
+    ExtensionNodes per level, [depth] levels deep.
+    """
+    extension = extensionClass()
+    _fill_extension(extension, rng, depth, breadth)
+    return extension
+
+
+def _fill_extension(extension, rng, depth, breadth):
+    extension.add_to_field('note', 'note_{:08x}'.format(rng.getrandbits(32)))
+    if depth <= 1:
+        return
+    for i in range(breadth):
+        child = ExtensionNode()
+        _fill_extension(child, rng, depth - 1, breadth)
+        extension.add_to_field('level{}'.format(depth - 1), child)
+
+
+def build_object(i, rng, events, extension_depth):
+    formatName, formatVersion = FORMATS[rng.randrange(len(FORMATS))]
+    objectCharacteristics = ObjectCharacteristics(
+        Format(formatDesignation=FormatDesignation(formatName, formatVersion)),
+        size=str(rng.randrange(1, 1 << 30)))
+    objectCharacteristics.add_fixity(Fixity('MD5', '{:032x}'.format(rng.getrandbits(128))))
+    objectCharacteristics.add_fixity(Fixity('SHA-256', '{:064x}'.format(rng.getrandbits(256))))
+    if extension_depth > 0:
+        objectCharacteristics.add_objectCharacteristicsExtension(
+            build_extension(ObjectCharacteristicsExtension, rng, extension_depth))
+    obj = Object(ObjectIdentifier('local', 'object_{}'.format(i)), 'file', objectCharacteristics)
+    obj.set_originalName('file_{}.dat'.format(i))
+    obj.set_storage(Storage(contentLocation=ContentLocation('filepath', '/data/{:02x}/file_{}.dat'.format(i % 256, i))))
+    for event in events:
+        identifier = event.get_eventIdentifier()
+        obj.add_linkingEventIdentifier(LinkingEventIdentifier(
+            identifier.get_eventIdentifierType(), identifier.get_eventIdentifierValue()))
+    return obj
+
+
+def build_event(i, rng, objectID, agentID):
+    event = Event(EventIdentifier('local', 'event_{}'.format(i)),
+                  EVENT_TYPES[rng.randrange(len(EVENT_TYPES))],
+                  '2016-{:02d}-{:02d}T{:02d}:{:02d}:00'.format(
+                      rng.randrange(1, 13), rng.randrange(1, 29),
+                      rng.randrange(24), rng.randrange(60)))
+    event.set_eventDetailInformation(EventDetailInformation(eventDetail='detail_{}'.format(i)))
+    event.set_eventOutcomeInformation(EventOutcomeInformation(eventOutcome='success'))
+    event.add_linkingObjectIdentifier(LinkingObjectIdentifier('local', objectID))
+    event.add_linkingAgentIdentifier(LinkingAgentIdentifier('local', agentID))
+    return event
+
+
+def build_agent(i, rng, extension_depth):
+    agent = Agent(AgentIdentifier('local', 'agent_{}'.format(i)))
+    agent.add_agentName('agent_name_{}'.format(i))
+    agent.set_agentType('software')
+    agent.set_agentVersion('{}.{}'.format(rng.randrange(10), rng.randrange(10)))
+    if extension_depth > 0:
+        agent.add_agentExtension(build_extension(AgentExtension, rng, extension_depth))
+    return agent
+
+
+def build_rights(i, rng, objectIDs):
+    rightsStatement = RightsStatement(RightsStatementIdentifier('local', 'rights_{}'.format(i)), 'license')
+    rightsStatement.set_licenseInformation(LicenseInformation(licenseTerms='terms_{}'.format(i)))
+    rightsStatement.add_rightsGranted(RightsGranted('disseminate', termOfGrant=TermOfGrant('2016-01-01')))
+    for objectID in objectIDs:
+        rightsStatement.add_linkingObjectIdentifier(LinkingObjectIdentifier('local', objectID))
+    return Rights(rightsStatement=rightsStatement)
+
+
+def generate_record(objects=100, events_per_object=3, agents=5, rights=10,
+                    extension_depth=2, seed=0):
+    """
+    Generates a synthetic PremisRecord.
+
+    __KWArgs__
+
+    * objects (int): the number of objects
+    * events_per_object (int): the number of events linked to each object
+    * agents (int): the number of agents, linked to events round robin
+    * rights (int): the number of rights statements, spread across objects
+    * extension_depth (int): how deeply nested the object characteristics
+    and agent extensions are. 0 omits them.
+    * seed (int): the seed for the values in the record
+
+    __Returns__
+
+    * (PremisRecord): the record
+    """
+    if objects < 1:
+        raise ValueError("A synthetic record needs at least one object")
+    rng = random.Random(seed)
+    agentList = [build_agent(i, rng, extension_depth) for i in range(agents)]
+    objectList = []
+    eventList = []
+    for i in range(objects):
+        objectID = 'object_{}'.format(i)
+        events = []
+        for j in range(events_per_object):
+            agentID = 'agent_{}'.format(len(eventList) % agents) if agents else 'agent_0'
+            events.append(build_event(len(eventList), rng, objectID, agentID))
+            eventList.append(events[-1])
+        objectList.append(build_object(i, rng, events, extension_depth))
+    rightsList = [build_rights(i, rng, ['object_{}'.format(x) for x in range(i, objects, max(rights, 1))])
+                  for i in range(rights)]
+    return PremisRecord(objects=objectList, events=eventList,
+                        agents=agentList, rights=rightsList)
+
+
+def add_arguments(parser):
+    """
+    Adds the generate_record() arguments to an ArgumentParser.
+    """
+    parser.add_argument('--objects', type=int, default=100)
+    parser.add_argument('--events-per-object', type=int, default=3)
+    parser.add_argument('--agents', type=int, default=5)
+    parser.add_argument('--rights', type=int, default=10)
+    parser.add_argument('--extension-depth', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=0)
+
+
+def record_arguments(args):
+    """
+    Returns the generate_record() keyword arguments from parsed arguments.
+    """
+    return {'objects': args.objects, 'events_per_object': args.events_per_object,
+            'agents': args.agents, 'rights': args.rights,
+            'extension_depth': args.extension_depth, 'seed': args.seed}
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0].strip('# '))
+    parser.add_argument('output', help='the path to write the record to')
+    add_arguments(parser)
+    args = parser.parse_args()
+    generate_record(**record_arguments(args)).write_to_file(args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+### Memory saved by interning parsed values ###
+
+Writes a synthetic record of events (see corpus.build_event()) to a
+temporary file, one event at a time, then builds every event in it with
+StreamingXMLNodeFactory twice, in fresh processes: once without interning
+and once interning through the factory's InternTable. Each run reports the
+peak resident memory of its process, its time, and how many values the
+table shared.
+
+The events are the bulk of a large record, and carry the most repeated
+values: eventType, the identifier types, eventOutcome...
+
+Usage: PYTHONPATH=. python benchmarks/interning.py [--events N] [--maxsize N]
+"""
+
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from argparse import SUPPRESS, ArgumentParser
+
+from corpus import build_event
+from pypremis.factories import StreamingXMLNodeFactory
+from pypremis.nodes import InternTable
+
+
+def write_events(path, events, agents=5, seed=0):
+    """
+    Writes a record of [events] events, without holding them in memory.
+    """
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("<?xml version='1.0' encoding='UTF-8'?>\n<premis:premis "
+                'xmlns:premis="http://www.loc.gov/premis/v3" '
+                'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" version="3.0">')
+        for i in range(events):
+            build_event(i, rng, 'object_{}'.format(i // 3),
+                        'agent_{}'.format(i % agents)).writeXML(f.write)
+        f.write('</premis:premis>')
+
+
+def measure(path, intern, maxsize):
+    """
+    Builds every event in [path] and returns the peak memory of the process,
+    the time taken and the intern table's counts.
+    """
+    table = InternTable(maxsize) if intern else None
+    factory = StreamingXMLNodeFactory(path, intern_strings=intern, intern_table=table)
+    start = time.perf_counter()
+    events = list(factory.find_events())
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is in kilobytes on Linux, and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform != 'darwin':
+        peak *= 1024
+    return {'events': len(events), 'peak_bytes': peak, 'seconds': elapsed,
+            'hits': table.hits if table else 0, 'misses': table.misses if table else 0}
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0].strip('# '))
+    parser.add_argument('--events', type=int, default=1000000)
+    parser.add_argument('--maxsize', type=int, default=InternTable().maxsize,
+                        help='the size of the intern table')
+    parser.add_argument('--measure', help=SUPPRESS)
+    parser.add_argument('--intern', action='store_true', help=SUPPRESS)
+    args = parser.parse_args()
+    if args.measure:
+        json.dump(measure(args.measure, args.intern, args.maxsize), sys.stdout)
+        return
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'events.xml')
+        write_events(path, args.events)
+        sys.stdout.write('{} events, {:.1f} MB of xml\n'.format(
+            args.events, os.path.getsize(path) / 1e6))
+        results = {}
+        for intern in (False, True):
+            command = [sys.executable, __file__, '--measure', path,
+                       '--maxsize', str(args.maxsize)] + (['--intern'] if intern else [])
+            results[intern] = json.loads(subprocess.check_output(command))
+    sys.stdout.write('{:<14}{:>12}{:>10}{:>14}{:>14}\n'.format(
+        'interning', 'peak MB', 'seconds', 'shared', 'stored'))
+    for intern, result in results.items():
+        sys.stdout.write('{:<14}{:>12.1f}{:>10.1f}{:>14}{:>14}\n'.format(
+            'on' if intern else 'off', result['peak_bytes'] / 1e6, result['seconds'],
+            result['hits'], result['misses']))
+    saved = results[False]['peak_bytes'] - results[True]['peak_bytes']
+    sys.stdout.write('saved {:.1f} MB ({:.0%}), {:.0f} bytes per event\n'.format(
+        saved / 1e6, saved / results[False]['peak_bytes'], saved / args.events))
+
+
+if __name__ == '__main__':
+    main()
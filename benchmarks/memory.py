@@ -0,0 +1,67 @@
+"""
+### Memory benchmark for PremisNode storage ###
+
+Measures the memory held per node for the small, numerous node types
+(ObjectIdentifier, Fixity, LinkingAgentIdentifier, EventIdentifier), and
+for the same contents held the way nodes used to be stored, with an
+instance __dict__ and an OrderedDict of fields.
+
+Usage: python benchmarks/memory.py [--count N]
+"""
+
+import tracemalloc
+from argparse import ArgumentParser
+from collections import OrderedDict
+
+from pypremis.nodes import *
+
+
+class DictLayoutNode(object):
+    # The storage layout nodes had before __slots__, kept here as the
+    # baseline: a __dict__ holding the name, the hash cache, the parent
+    # references and an OrderedDict of fields.
+    def __init__(self, node):
+        self._hash = None
+        self._parents = None
+        self.fields = OrderedDict(node._field_items())
+        self.name = node.name
+
+
+BUILDERS = (
+    ('ObjectIdentifier', lambda i: ObjectIdentifier('local', 'object_{}'.format(i))),
+    ('Fixity', lambda i: Fixity('SHA-256', '{:064x}'.format(i))),
+    ('LinkingAgentIdentifier', lambda i: LinkingAgentIdentifier('local', 'agent_{}'.format(i))),
+    ('EventIdentifier', lambda i: EventIdentifier('local', 'event_{}'.format(i))),
+)
+
+
+def measure(build, count):
+    """
+    Returns the bytes allocated, and still held, per object built.
+    """
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        held = [build(i) for i in range(count)]
+        size = tracemalloc.get_traced_memory()[0] - start
+    finally:
+        tracemalloc.stop()
+    del held
+    return size / count
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0].strip('# '))
+    parser.add_argument('--count', type=int, default=100000,
+                        help='nodes built per measurement')
+    args = parser.parse_args()
+    for name, builder in BUILDERS:
+        # Both measurements include the field values, which are identical.
+        legacy = measure(lambda i: DictLayoutNode(builder(i)), args.count)
+        compact = measure(builder, args.count)
+        print('{:<24} dict layout {:7.1f}B  slots {:7.1f}B  reduction {:5.1f}%'.format(
+            name, legacy, compact, 100 * (1 - compact / legacy)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+"""
+### Parse and serialize benchmark suite ###
+
+Generates a synthetic record (see corpus.py), writes it to a temporary
+file and times each stage of reading and writing premis records:
+
+* parse: ElementTree parsing of the file
+* build: building the PremisNodes from the parsed tree (XMLNodeFactory)
+* read: PremisRecord(frompath=...), parse and build together
+* equality: comparing the record to an equal copy, with cold hash caches
+* validate: PremisRecord.validate()
+* toXML: building an Element for every entity with PremisNode.toXML()
+* to_xml: PremisRecord.to_xml()
+* write_to_file: PremisRecord.write_to_file()
+* binary_dumps: binary.dumps() of the record
+* binary_loads: binary.loads() of the record
+
+The size of the record serialized with binary.dumps() is reported
+alongside the size of its xml.
+
+Each stage is repeated and the best time is reported, along with the
+throughput in entities and megabytes (of serialized xml) per second. Each
+stage is then run once more under tracemalloc to report its peak memory.
+
+Results can be written as JSON with --json, and a previous JSON result
+can be compared against with --compare, eg. to check a change for
+regressions across commits.
+
+Usage: PYTHONPATH=. python benchmarks/suite.py [--objects N] [...] [--repeat N]
+       [--stage NAME] [--json PATH] [--compare PATH]
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from argparse import ArgumentParser
+from copy import deepcopy
+
+from corpus import add_arguments, generate_record, record_arguments
+from pypremis import binary
+from pypremis.factories import XMLNodeFactory
+from pypremis.lib import PremisRecord
+
+
+def _build(factory):
+    return (factory.find_objects() + factory.find_events() +
+            factory.find_agents() + factory.find_rights())
+
+
+def stages(record, path):
+    """
+    Returns the benchmarked stages, as (name, setup, run) tuples. setup is
+    called (untimed) before each timing, and its return value passed to run.
+    """
+    def parsed():
+        factory = XMLNodeFactory.__new__(XMLNodeFactory)
+        factory.xml = ET.parse(path).getroot()
+        return factory
+    data = binary.dumps(record)
+    return [
+        ('parse', lambda: path, ET.parse),
+        ('build', parsed, _build),
+        ('read', lambda: path, lambda x: PremisRecord(frompath=x)),
+        ('equality', lambda: (deepcopy(record), deepcopy(record)), lambda x: x[0] == x[1]),
+        ('validate', lambda: record, lambda x: x.validate()),
+        ('toXML', lambda: record, lambda x: [node.toXML() for node in x]),
+        ('to_xml', lambda: record, lambda x: x.to_xml()),
+        ('write_to_file', lambda: path + '.out', record.write_to_file),
+        ('binary_dumps', lambda: record, binary.dumps),
+        ('binary_loads', lambda: data, binary.loads),
+    ]
+
+
+def time_stage(setup, run, repeat):
+    """
+    Returns the best and mean of [repeat] timings of run(setup()).
+    """
+    timings = []
+    for i in range(repeat):
+        arg = setup()
+        start = time.perf_counter()
+        run(arg)
+        timings.append(time.perf_counter() - start)
+    return min(timings), sum(timings) / len(timings)
+
+
+def peak_memory(setup, run):
+    """
+    Returns the peak memory, in bytes, allocated by run(setup()) over what
+    was allocated when it started.
+    """
+    arg = setup()
+    tracemalloc.start()
+    try:
+        run(arg)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def metadata(params):
+    try:
+        commit = subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL,
+            cwd=os.path.dirname(os.path.abspath(__file__))).decode('utf-8').strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'commit': commit, 'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(), 'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'params': params}
+
+
+def run_suite(params, repeat=5, only=None):
+    """
+    Runs the suite over a record generated with [params].
+
+    __Args__
+
+    1. params (dict): generate_record() keyword arguments
+
+    __KWArgs__
+
+    * repeat (int): the number of timings taken of each stage
+    * only (list): the names of the stages to run. Defaults to all of them.
+
+    __Returns__
+
+    * (dict): the results, suitable for serializing as JSON
+    """
+    record = generate_record(**params)
+    entities = len(list(record))
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'record.xml')
+        record.write_to_file(path)
+        size = os.path.getsize(path)
+        results = {}
+        for name, setup, run in stages(record, path):
+            if only and name not in only:
+                continue
+            best, mean = time_stage(setup, run, repeat)
+            results[name] = {
+                'best_s': best, 'mean_s': mean,
+                'entities_per_s': entities / best,
+                'mb_per_s': size / best / 1e6,
+                'peak_bytes': peak_memory(setup, run)
+            }
+    return {'metadata': metadata(params), 'entities': entities,
+            'xml_bytes': size, 'binary_bytes': len(binary.dumps(record)),
+            'results': results}
+
+
+def report(suite, baseline=None, out=sys.stdout):
+    """
+    Writes a table of the results, with the change from a baseline result
+    if one is given.
+    """
+    out.write('{} entities, {:.2f} MB of xml'.format(suite['entities'], suite['xml_bytes'] / 1e6))
+    if 'binary_bytes' in suite:
+        out.write(', {:.2f} MB binary'.format(suite['binary_bytes'] / 1e6))
+    out.write('\n')
+    header = '{:<14}{:>10}{:>14}{:>10}{:>12}'.format('stage', 'best ms', 'entities/s', 'MB/s', 'peak MB')
+    if baseline is not None:
+        header += '{:>10}'.format('vs base')
+    out.write(header + '\n')
+    for name, result in suite['results'].items():
+        line = '{:<14}{:>10.1f}{:>14.0f}{:>10.2f}{:>12.2f}'.format(
+            name, result['best_s'] * 1e3, result['entities_per_s'],
+            result['mb_per_s'], result['peak_bytes'] / 1e6)
+        if baseline is not None:
+            base = baseline['results'].get(name)
+            line += '{:>9.2f}x'.format(base['best_s'] / result['best_s']) if base else '{:>10}'.format('-')
+        out.write(line + '\n')
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0].strip('# '))
+    add_arguments(parser)
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='timings taken of each stage, the best is reported')
+    parser.add_argument('--stage', action='append',
+                        help='only run the named stage, may be given more than once')
+    parser.add_argument('--json', help='write the results to this path as JSON')
+    parser.add_argument('--compare', help='a JSON result to compare against')
+    args = parser.parse_args()
+    suite = run_suite(record_arguments(args), repeat=args.repeat, only=args.stage)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline['metadata']['params'] != suite['metadata']['params']:
+            sys.stderr.write('warning: the baseline was run with different parameters\n')
+    report(suite, baseline)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(suite, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
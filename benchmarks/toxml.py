@@ -0,0 +1,108 @@
+"""
+### Microbenchmark for PremisNode.toXML() ###
+
+Times .toXML() on Object, Event and RightsStatement trees of realistic
+depth, comparing the current single pass implementation against the
+previous one, which scanned every field for every key in field_order.
+
+Usage: python benchmarks/toxml.py [--number N] [--repeat R]
+"""
+
+import xml.etree.ElementTree as ET
+from argparse import ArgumentParser
+from timeit import repeat
+
+from pypremis.nodes import *
+
+
+def legacy_toXML(node):
+    # PremisNode.toXML() before the field position map, kept here as the
+    # baseline. O(len(field_order) * len(fields)) per node.
+    if isinstance(node, ExtensionNode):
+        return node.toXML()
+    fields = dict(node.fields)
+    root = ET.Element('premis:'+node.name)
+    if isinstance(node, Object):
+        root.set("xsi:type", 'premis:'+node.get_objectCategory())
+    for key in node.field_order:
+        if key == "objectCategory" and isinstance(node, Object):
+            continue
+        if key not in fields:
+            continue
+        values = [fields[x] for x in fields if x == key]
+        for value in values:
+            for x in value if isinstance(value, list) else [value]:
+                if isinstance(x, str):
+                    e = ET.Element('premis:'+key)
+                    e.text = x
+                    root.append(e)
+                else:
+                    root.append(legacy_toXML(x))
+    return root
+
+
+def build_object():
+    objectCharacteristics = ObjectCharacteristics(
+        Format(formatDesignation=FormatDesignation('text/plain', '1.0')),
+        compositionLevel='0', size='1048576')
+    for algorithm in ('MD5', 'SHA-1', 'SHA-256'):
+        objectCharacteristics.add_fixity(Fixity(algorithm, '0' * 64, 'pypremis'))
+    obj = Object(ObjectIdentifier('local', 'object_0'), 'file', objectCharacteristics)
+    obj.add_objectIdentifier(ObjectIdentifier('ark', 'ark:/00000/object_0'))
+    obj.set_originalName('original_name.txt')
+    obj.set_storage(Storage(contentLocation=ContentLocation('filepath', '/data/object_0.txt'),
+                            storageMedium='disk'))
+    obj.set_significantProperties(SignificantProperties(significantPropertiesValue='content'))
+    for i in range(3):
+        obj.add_relationship(Relationship(
+            'structural', 'is part of',
+            RelatedObjectIdentifier('local', 'object_{}'.format(i + 1), str(i))))
+    for i in range(5):
+        obj.add_linkingEventIdentifier(LinkingEventIdentifier('local', 'event_{}'.format(i)))
+    obj.add_linkingRightsStatementIdentifier(LinkingRightsStatementIdentifier('local', 'rights_0'))
+    return obj
+
+
+def build_event():
+    event = Event(EventIdentifier('local', 'event_0'), 'fixity check', '2016-01-01T00:00:00')
+    event.set_eventDetailInformation(EventDetailInformation(eventDetail='checked with pypremis'))
+    event.set_eventOutcomeInformation(EventOutcomeInformation(
+        'success', EventOutcomeDetail(eventOutcomeDetailNote='all digests matched')))
+    for i in range(3):
+        event.add_linkingAgentIdentifier(LinkingAgentIdentifier('local', 'agent_{}'.format(i)))
+        event.add_linkingObjectIdentifier(LinkingObjectIdentifier('local', 'object_{}'.format(i)))
+    return event
+
+
+def build_rightsStatement():
+    rightsStatement = RightsStatement(RightsStatementIdentifier('local', 'rights_0'), 'copyright')
+    rightsStatement.set_copyrightInformation(CopyrightInformation(
+        'copyrighted', 'us', copyrightNote='note'))
+    rightsStatement.set_licenseInformation(LicenseInformation(licenseTerms='terms', licenseNote='note'))
+    for act in ('disseminate', 'migrate', 'replicate'):
+        rightsStatement.add_rightsGranted(RightsGranted(
+            act, restriction='none', termOfGrant=TermOfGrant('2016-01-01', '2026-01-01')))
+    for i in range(3):
+        rightsStatement.add_linkingObjectIdentifier(LinkingObjectIdentifier('local', 'object_{}'.format(i)))
+    return rightsStatement
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0].strip('# '))
+    parser.add_argument('--number', type=int, default=2000,
+                        help='serializations per timing')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='timings per measurement, the best is reported')
+    args = parser.parse_args()
+    for name, builder in (('Object', build_object), ('Event', build_event),
+                          ('RightsStatement', build_rightsStatement)):
+        node = builder()
+        assert ET.tostring(node.toXML()) == ET.tostring(legacy_toXML(node))
+        before = min(repeat(lambda: legacy_toXML(node), number=args.number, repeat=args.repeat))
+        after = min(repeat(node.toXML, number=args.number, repeat=args.repeat))
+        print('{:<16} legacy {:8.2f}us  toXML {:8.2f}us  speedup {:.2f}x'.format(
+            name, before / args.number * 1e6, after / args.number * 1e6, before / after))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,313 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from copy import copy
+from datetime import datetime, timezone
+from urllib.parse import unquote, urlparse
+from uuid import uuid4
+
+from pypremis.indexes import field_values
+from pypremis.nodes import *
+
+
+"""
+### Verifying the files a premis record describes ###
+
+1. **FixityAudit** recomputes the digests of every file object in a
+PremisRecord, in a pool of threads, compares them with the object's
+recorded Fixity nodes and emits a fixity check Event for each object.
+2. **normalize_algorithm()** maps a recorded messageDigestAlgorithm, in
+any case or as hashlib spells it, to its name in FIXITY_ALGORITHMS.
+"""
+
+
+def default_resolve_path(contentLocation, root=None):
+    """
+    Returns the local path of a ContentLocation: its value, with any file://
+    scheme removed, relative to [root] if it is a relative path.
+
+    __Args__
+
+    1. contentLocation (ContentLocation): the location to resolve
+
+    __KWArgs__
+
+    * root (str): the directory relative paths are resolved against
+
+    __Returns__
+
+    * (str): the path
+    """
+    path = contentLocation.get_contentLocationValue()
+    if path.startswith('file://'):
+        path = unquote(urlparse(path).path)
+    if root is not None and not os.path.isabs(path):
+        path = os.path.join(root, path)
+    return path
+
+
+def _algorithm_names():
+    # Maps the spellings of each supported algorithm, case folded, to its
+    # name in FIXITY_ALGORITHMS: 'md5', 'sha-256', and hashlib's 'sha256'.
+    names = {}
+    for name, hashlibName in FIXITY_ALGORITHMS.items():
+        for spelling in (name, hashlibName, name.replace('-', '')):
+            names[spelling.casefold()] = name
+    return names
+
+
+_ALGORITHM_NAMES = _algorithm_names()
+
+
+def normalize_algorithm(algorithm):
+    """
+    Returns the FIXITY_ALGORITHMS name of a recorded messageDigestAlgorithm,
+    which may be written in any case, or as hashlib names it.
+
+    __Args__
+
+    1. algorithm (str): the recorded algorithm, eg. 'sha256' or 'Sha-256'
+
+    __Returns__
+
+    * (str or None): the algorithm's name, eg. 'SHA-256', or None if it
+    isn't supported
+    """
+    if algorithm is None:
+        return None
+    return _ALGORITHM_NAMES.get(algorithm.strip().casefold())
+
+
+def _verify(path, expected, chunksize):
+    # Runs in a worker thread: returns the outcome, outcome notes and the
+    # number of bytes read for one file.
+    algorithms = []
+    notes = []
+    for algorithm, digest in expected:
+        name = normalize_algorithm(algorithm)
+        if name is None:
+            notes.append("{} not checked: unsupported algorithm".format(algorithm))
+        elif name not in algorithms:
+            algorithms.append(name)
+    if not algorithms:
+        return 'failure', notes + ["no supported messageDigestAlgorithm recorded"], 0
+    try:
+        size = os.path.getsize(path)
+        computed = {x.get_messageDigestAlgorithm(): x.get_messageDigest()
+                    for x in compute_fixity(path, algorithms, chunksize=chunksize)}
+    except OSError as e:
+        return 'failure', notes + ["{} could not be read: {}".format(path, e.strerror or e)], 0
+    outcome = 'success'
+    for algorithm, digest in expected:
+        name = normalize_algorithm(algorithm)
+        if name is None:
+            continue
+        if computed[name] == digest.strip().lower():
+            notes.append("{} digest matched".format(algorithm))
+        else:
+            outcome = 'failure'
+            notes.append("{} digest mismatch: recorded {}, computed {}".format(
+                algorithm, digest, computed[name]))
+    return outcome, notes, size
+
+
+class FixityAudit(object):
+    """
+    Verifies the files described by a PremisRecord against their recorded
+    fixity.
+
+    Each file object with Fixity in its ObjectCharacteristics is located
+    through its Storage's ContentLocation, and every recorded digest is
+    recomputed with compute_fixity(), reading the file once. Files are
+    read in a pool of threads (hashing releases the GIL), with only a
+    bounded number of files in flight at a time. The result for each object
+    is a fixity check Event linked to the object.
+
+    __Attributes__
+
+    1. record is the PremisRecord being audited
+    2. bytes_read is the number of bytes read so far
+    3. objects_checked is the number of objects verified so far
+    4. failures is the number of those whose outcome was failure
+    5. elapsed is the wall clock time, in seconds, spent running the audit
+    """
+    def __init__(self, record, max_workers=4, max_in_flight=None, root=None,
+                 resolve_path=None, linkingAgentIdentifier=None,
+                 eventIdentifierType='uuid', chunksize=1 << 20):
+        """
+        Initializes an audit of a PremisRecord. Nothing is read until .run()
+
+        __Args__
+
+        1. record (PremisRecord): the record whose objects are audited
+
+        __KWArgs__
+
+        * max_workers (int): the number of threads reading files
+        * max_in_flight (int): the most files being read, or read and waiting
+        to be reported, at once. Defaults to twice max_workers.
+        * root (str): the directory relative content locations are resolved
+        against
+        * resolve_path (func): a function taking a ContentLocation and
+        returning a local path, or None if it can't be resolved. Defaults to
+        default_resolve_path() relative to root.
+        * linkingAgentIdentifier (LinkingAgentIdentifier): a copy is linked to
+        each event as the agent performing the check
+        * eventIdentifierType (str): the eventIdentifierType of the events,
+        whose values are generated uuids
+        * chunksize (int): the size of the chunks each file is read in
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be a positive integer")
+        if max_in_flight is None:
+            max_in_flight = 2 * max_workers
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be a positive integer")
+        if linkingAgentIdentifier is not None and \
+                not isinstance(linkingAgentIdentifier, LinkingAgentIdentifier):
+            raise TypeError("linkingAgentIdentifier must be a LinkingAgentIdentifier")
+        self.record = record
+        self.max_workers = max_workers
+        self.max_in_flight = max_in_flight
+        self.root = root
+        self.resolve_path = resolve_path
+        self.linkingAgentIdentifier = linkingAgentIdentifier
+        self.eventIdentifierType = eventIdentifierType
+        self.chunksize = chunksize
+        self.bytes_read = 0
+        self.objects_checked = 0
+        self.failures = 0
+        self.elapsed = 0.0
+
+    def get_throughput(self):
+        """
+        Returns the rate the audit has read files at.
+
+        __Returns__
+
+        * (float): bytes per second
+        """
+        if not self.elapsed:
+            return 0.0
+        return self.bytes_read / self.elapsed
+
+    def _resolve(self, obj):
+        # The path of the first storage location which resolves.
+        for storage in field_values(obj, 'storage'):
+            contentLocation = field_values(storage, 'contentLocation')
+            if not contentLocation:
+                continue
+            if self.resolve_path is not None:
+                path = self.resolve_path(contentLocation)
+            else:
+                path = default_resolve_path(contentLocation, self.root)
+            if path is not None:
+                return path
+        return None
+
+    def _expected(self, obj):
+        # The (messageDigestAlgorithm, messageDigest) pairs recorded for obj.
+        return [(x.get_messageDigestAlgorithm(), x.get_messageDigest())
+                for objectCharacteristics in field_values(obj, 'objectCharacteristics')
+                for x in field_values(objectCharacteristics, 'fixity')]
+
+    def _build_event(self, obj, path, outcome, notes):
+        event = Event(EventIdentifier(self.eventIdentifierType, str(uuid4())),
+                      'fixity check',
+                      datetime.now(timezone.utc).isoformat(timespec='seconds'))
+        detail = 'Fixity audit of {}'.format(path) if path is not None \
+            else 'Fixity audit'
+        event.add_eventDetailInformation(EventDetailInformation(eventDetail=detail))
+        outcomeInformation = EventOutcomeInformation(eventOutcome=outcome)
+        for note in notes:
+            outcomeInformation.add_eventOutcomeDetail(
+                EventOutcomeDetail(eventOutcomeDetailNote=note))
+        event.add_eventOutcomeInformation(outcomeInformation)
+        if self.linkingAgentIdentifier is not None:
+            # Each event gets its own copy, so the events don't all share
+            # (and track themselves as parents of) one node.
+            event.add_linkingAgentIdentifier(copy(self.linkingAgentIdentifier))
+        for identifier in field_values(obj, 'objectIdentifier')[:1]:
+            event.add_linkingObjectIdentifier(LinkingObjectIdentifier(
+                identifier.get_objectIdentifierType(),
+                identifier.get_objectIdentifierValue()))
+        return event
+
+    def run(self, record_events=False):
+        """
+        Audits every file object in the record which has recorded fixity.
+
+        __KWArgs__
+
+        * record_events (bool): if True each event is also added to the
+        record, and linked from its object with a LinkingEventIdentifier
+
+        __Returns__
+
+        * (generator): a generator of (Object, Event) tuples, in the order of
+        the record's objects
+        """
+        start = time.perf_counter()
+        elapsed = self.elapsed
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        objects = iter(self.record.get_object_list())
+        pending = deque()
+
+        def submit():
+            for obj in objects:
+                if obj.get_objectCategory() != 'file':
+                    continue
+                expected = self._expected(obj)
+                if not expected:
+                    continue
+                path = self._resolve(obj)
+                if path is None:
+                    pending.append((obj, path, None))
+                else:
+                    pending.append((obj, path, executor.submit(
+                        _verify, path, expected, self.chunksize)))
+                return True
+            return False
+
+        try:
+            while len(pending) < self.max_in_flight and submit():
+                pass
+            while pending:
+                obj, path, future = pending.popleft()
+                if future is None:
+                    outcome, notes, size = 'failure', ['no resolvable contentLocation'], 0
+                else:
+                    outcome, notes, size = future.result()
+                submit()
+                self.bytes_read += size
+                self.objects_checked += 1
+                if outcome != 'success':
+                    self.failures += 1
+                self.elapsed = elapsed + time.perf_counter() - start
+                event = self._build_event(obj, path, outcome, notes)
+                if record_events:
+                    self.record.add_event(event)
+                    obj.add_linkingEventIdentifier(LinkingEventIdentifier(
+                        event.get_eventIdentifier().get_eventIdentifierType(),
+                        event.get_eventIdentifier().get_eventIdentifierValue()))
+                yield obj, event
+        finally:
+            for obj, path, future in pending:
+                if future is not None:
+                    future.cancel()
+            executor.shutdown(wait=True)
+            self.elapsed = elapsed + time.perf_counter() - start
+
+    def report(self):
+        """
+        Returns a one line summary of the audit so far.
+
+        __Returns__
+
+        * (str): the summary
+        """
+        return "{} objects checked, {} failed, {} bytes read in {:.2f}s " \
+            "({:.2f} MB/s)".format(self.objects_checked, self.failures,
+                                   self.bytes_read, self.elapsed,
+                                   self.get_throughput() / 1e6)
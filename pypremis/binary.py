@@ -0,0 +1,348 @@
+import zlib
+
+import pypremis.nodes
+from pypremis.lib import PremisRecord
+from pypremis.nodes import *
+
+
+"""
+### A compact binary serialization of PremisNodes and PremisRecords ###
+
+1. **dumps()** and **dump()** serialize a PremisRecord, or any PremisNode,
+to bytes or to a binary file.
+2. **loads()** and **load()** read them back.
+
+The format is meant for caching parsed records, eg. between the stages of a
+pipeline, rather than for exchange: reading it back is much faster than
+parsing and building xml, and it is smaller. It is versioned, and tied to
+the node classes it was written with: data written with a different set of
+node classes, or with a field added to or moved in a class' field_order,
+is refused with a ValueError rather than read wrongly.
+
+The layout is:
+
+* a header: MAGIC, the FORMAT_VERSION byte, a 4 byte fingerprint of the
+node classes, and a byte which is 0 for a record or 1 for a single node
+* for a record, the number of entities followed by each entity node
+* for a node, the node itself
+
+Every integer is an unsigned varint (7 bits per byte, least significant
+first). A node is its class' type code (its position in NODE_CLASSES),
+its name, the number of fields set and, for each, the position of the field
+in the class' field_order followed by its value. Fields outside field_order,
+including all of the fields of extension content, have the position
+len(field_order) followed by their key. A value is a tag byte (VALUE_STR,
+VALUE_NODE or VALUE_LIST) followed by a string, a node, or the length of a
+list followed by each of its values.
+
+Strings (names, keys and values alike) are written through a string table
+which is built as the data is written: a string's first occurrence is
+written as 0 followed by its length and its UTF-8 bytes, and it is
+referred to afterwards by its position in the table plus one. Tag names,
+identifier types, event types and the like are only ever written once.
+"""
+
+
+MAGIC = b'PPB'
+FORMAT_VERSION = 1
+
+VALUE_STR = 0
+VALUE_NODE = 1
+VALUE_LIST = 2
+
+_RECORD = 0
+_NODE = 1
+
+
+def _node_classes():
+    return tuple(sorted(
+        (x for x in vars(pypremis.nodes).values()
+         if isinstance(x, type) and issubclass(x, PremisNode)),
+        key=lambda x: x.__name__))
+
+
+# Every node class which can be serialized, in type code order.
+NODE_CLASSES = _node_classes()
+TYPE_CODES = {cls: code for code, cls in enumerate(NODE_CLASSES)}
+
+
+def _fingerprint():
+    # Changes whenever a type code or field position would.
+    schema = '\n'.join('{} {}'.format(cls.__name__, ' '.join(cls.field_order))
+                       for cls in NODE_CLASSES)
+    return zlib.crc32(schema.encode('utf-8')).to_bytes(4, 'little')
+
+
+_HEADER = MAGIC + bytes([FORMAT_VERSION]) + _fingerprint()
+
+
+def _write_varint(out, n):
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+class _Writer(object):
+    """
+    Serializes nodes into a bytearray, sharing one string table.
+    """
+    __slots__ = ('out', 'strings')
+
+    def __init__(self):
+        self.out = bytearray(_HEADER)
+        self.strings = {}
+
+    def string(self, s):
+        out = self.out
+        index = self.strings.get(s)
+        if index is not None:
+            index += 1
+            if index < 0x80:
+                out.append(index)
+            else:
+                _write_varint(out, index)
+            return
+        self.strings[s] = len(self.strings)
+        data = s.encode('utf-8', 'surrogatepass')
+        out.append(0)
+        _write_varint(out, len(data))
+        out += data
+
+    def value(self, value):
+        out = self.out
+        if isinstance(value, str):
+            out.append(VALUE_STR)
+            self.string(value)
+        elif isinstance(value, PremisNode):
+            out.append(VALUE_NODE)
+            self.node(value)
+        elif isinstance(value, list):
+            out.append(VALUE_LIST)
+            _write_varint(out, len(value))
+            for x in value:
+                self.value(x)
+        else:
+            raise ValueError('{} is not a str, node or list'.format(str(value)))
+
+    def node(self, node):
+        out = self.out
+        code = TYPE_CODES.get(type(node))
+        if code is None:
+            raise TypeError("{} is not a node class from pypremis.nodes and "
+                            "can't be serialized".format(type(node).__name__))
+        _write_varint(out, code)
+        name, values, extra = node._to_values()
+        self.string(name)
+        extra = extra or {}
+        _write_varint(out, len(values) - values.count(None) + len(extra))
+        for position, value in enumerate(values):
+            if value is not None:
+                if position < 0x80:
+                    out.append(position)
+                else:
+                    _write_varint(out, position)
+                self.value(value)
+        if extra:
+            position = len(values)
+            for key, value in extra.items():
+                _write_varint(out, position)
+                self.string(key)
+                self.value(value)
+
+
+def _read(data):
+    """
+    Rebuilds the nodes in serialized data, without running their setters.
+    Returns the content byte and the list of nodes read.
+
+    The readers are closures over the data and the read position, with the
+    common single byte varints read inline, as this is the hot loop.
+    """
+    data = bytes(data)
+    header = data[:len(_HEADER)]
+    if header[:len(MAGIC)] != MAGIC:
+        raise ValueError("The data isn't binary serialized premis.")
+    if len(header) < len(_HEADER):
+        raise ValueError("The binary premis data is truncated or corrupt.")
+    if header[len(MAGIC)] != FORMAT_VERSION:
+        raise ValueError("Unsupported binary premis format version: {}".format(
+            header[len(MAGIC)]))
+    if header != _HEADER:
+        raise ValueError("The data was serialized with different node classes.")
+    pos = len(_HEADER)
+    strings = []
+    classes = [(cls._from_values, len(cls.field_order)) for cls in NODE_CLASSES]
+
+    def varint():
+        nonlocal pos
+        result = 0
+        shift = 0
+        while True:
+            byte = data[pos]
+            pos += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return result
+            shift += 7
+
+    def string():
+        nonlocal pos
+        index = data[pos]
+        if index < 0x80:
+            pos += 1
+        else:
+            index = varint()
+        if index:
+            return strings[index - 1]
+        length = varint()
+        end = pos + length
+        if end > len(data):
+            raise IndexError
+        s = data[pos:end].decode('utf-8', 'surrogatepass')
+        pos = end
+        strings.append(s)
+        return s
+
+    def value(parent):
+        nonlocal pos
+        tag = data[pos]
+        pos += 1
+        if tag == VALUE_STR:
+            return string()
+        if tag == VALUE_NODE:
+            return node(parent)
+        if tag == VALUE_LIST:
+            return [value(parent) for i in range(varint())]
+        raise ValueError("Unknown value tag: {}".format(tag))
+
+    def node(parent=None):
+        nonlocal pos
+        code = data[pos]
+        if code < 0x80:
+            pos += 1
+        else:
+            code = varint()
+        build, width = classes[code]
+        values = [None] * width
+        result = build(string(), values, None, parent)
+        count = data[pos]
+        if count < 0x80:
+            pos += 1
+        else:
+            count = varint()
+        for i in range(count):
+            position = data[pos]
+            if position < 0x80:
+                pos += 1
+            else:
+                position = varint()
+            if position < width:
+                values[position] = value(result)
+            else:
+                key = string()
+                result._store_field(key, value(result))
+        return result
+
+    try:
+        kind = data[pos]
+        pos += 1
+        if kind == _NODE:
+            nodes = [node()]
+        elif kind == _RECORD:
+            nodes = [node() for i in range(varint())]
+        else:
+            raise ValueError("Unknown binary premis content: {}".format(kind))
+    except IndexError:
+        raise ValueError("The binary premis data is truncated or corrupt.")
+    if pos != len(data):
+        raise ValueError("The binary premis data has trailing content.")
+    return kind, nodes
+
+
+def dumps(obj):
+    """
+    Serializes a PremisRecord, or a single PremisNode, to bytes.
+
+    __Args__
+
+    1. obj (PremisRecord or PremisNode): what to serialize
+
+    __Returns__
+
+    * (bytes): the serialized data
+    """
+    writer = _Writer()
+    if isinstance(obj, PremisRecord):
+        entities = list(obj)
+        writer.out.append(_RECORD)
+        _write_varint(writer.out, len(entities))
+        for node in entities:
+            writer.node(node)
+    elif isinstance(obj, PremisNode):
+        writer.out.append(_NODE)
+        writer.node(obj)
+    else:
+        raise TypeError("Only PremisRecords and PremisNodes can be serialized.")
+    return bytes(writer.out)
+
+
+def loads(data):
+    """
+    Reads a PremisRecord, or a single PremisNode, from bytes written by
+    dumps().
+
+    __Args__
+
+    1. data (bytes): the serialized data
+
+    __Returns__
+
+    * (PremisRecord or PremisNode): whichever was serialized
+    """
+    kind, nodes = _read(data)
+    if kind == _NODE:
+        return nodes[0]
+    lists = {Object: [], Event: [], Agent: [], Rights: []}
+    for node in nodes:
+        if type(node) not in lists:
+            raise ValueError("A record can't contain a {}.".format(type(node).__name__))
+        lists[type(node)].append(node)
+    return PremisRecord(objects=lists[Object], events=lists[Event],
+                        agents=lists[Agent], rights=lists[Rights])
+
+
+def dump(obj, fp):
+    """
+    Serializes a PremisRecord or PremisNode to a file. See dumps().
+
+    __Args__
+
+    1. obj (PremisRecord or PremisNode): what to serialize
+    2. fp (str or file): a path, or a file opened for writing in binary mode
+    """
+    data = dumps(obj)
+    if hasattr(fp, 'write'):
+        fp.write(data)
+    else:
+        with open(fp, 'wb') as f:
+            f.write(data)
+
+
+def load(fp):
+    """
+    Reads a PremisRecord or PremisNode from a file written by dump(). See
+    loads().
+
+    __Args__
+
+    1. fp (str or file): a path, or a file opened for reading in binary mode
+
+    __Returns__
+
+    * (PremisRecord or PremisNode): whichever was serialized
+    """
+    if hasattr(fp, 'read'):
+        return loads(fp.read())
+    with open(fp, 'rb') as f:
+        return loads(f.read())
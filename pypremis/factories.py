@@ -9,9 +9,60 @@ from pypremis.nodes import *
 1. **XMLNodeFactory** is a class implementing .find_objects(), .find_events(),
 .find_rights(), and .find_agents() meant to build PremisNode instances from
 valid premis XML records
+2. **StreamingXMLNodeFactory** is a class implementing the same interface as
+XMLNodeFactory which builds PremisNode instances incrementally as the
+document is read, rather than holding the whole document in memory.
+3. **LinkingXIdentifierFactory** subclasses build the linking identifier
+nodes which refer to an existing node, one node at a time with
+.produce_linking_node(), or for many nodes at once with
+.produce_linking_nodes().
 """
 
 
+def _optional_fields(*fields):
+    """
+    Builds the dispatch table XMLNodeFactory._set_optional_fields() uses to
+    set the optional fields of one kind of node.
+
+    __Args__
+
+    1. fields (tuple): (name, kind) pairs. The name is the field's tag (in
+    the premis namespace), and names its setter (set_name) and, for nodes,
+    its build method (buildName). The kind is one of:
+        * 'text': the text of the first such child, if it isn't empty
+        * 'texts': a list of the text of every such child
+        * 'node': the first such child built into a node, if it has children
+        * 'nodes': a list of every such child built into a node
+
+    __Returns__
+
+    * (dict): a dict mapping each qualified tag to a (setter, kind, builder)
+    tuple
+    """
+    return {'{http://www.loc.gov/premis/v3}'+name:
+            ('set_'+name, kind, 'build'+name[0].upper()+name[1:])
+            for name, kind in fields}
+
+
+def _intern_table_for(intern_strings, intern_table):
+    """
+    Returns the InternTable a factory interns the text of parsed elements
+    through: [intern_table] if one is given, otherwise a new table, or None
+    if [intern_strings] is False. It is also None while node setters are
+    interning values (see set_intern_table()), as every value a factory
+    builds passes through them.
+    """
+    if not intern_strings:
+        return None
+    if intern_table is not None:
+        if not isinstance(intern_table, InternTable):
+            raise TypeError("{} is not an InternTable".format(str(intern_table)))
+        return intern_table
+    if get_intern_table() is not None:
+        return None
+    return InternTable()
+
+
 class XMLNodeFactory(object):
     """
     A class for ingesting an xml document and building PremisNodes out of it.
@@ -20,21 +71,101 @@ class XMLNodeFactory(object):
 
     1. xml: an ElementTree xml Element object meant to act as the root to attach
     objects too from the xml.
+    2. intern_table: the InternTable the text of parsed elements is interned
+    through, so equal values share one str, or None.
+
+    Each build method looks up the handful of children its node requires
+    directly, then sets every optional field in a single pass over the
+    element's children, dispatching on a precomputed table of tags (see
+    ._set_optional_fields()), so an entity is built in time linear in its
+    size rather than scanning its children once per optional field.
     """
-    def __init__(self, xmlfile):
+    # The top level entities in a premis record, and the methods that build
+    # them.
+    entity_builders = {
+        '{http://www.loc.gov/premis/v3}object': 'buildObject',
+        '{http://www.loc.gov/premis/v3}event': 'buildEvent',
+        '{http://www.loc.gov/premis/v3}agent': 'buildAgent',
+        '{http://www.loc.gov/premis/v3}rights': 'buildRights'
+    }
+
+    intern_table = None
+
+    def __init__(self, xmlfile, intern_strings=True, intern_table=None):
         """
         Initializes an XML node factory and points it to a PREMIS xml file
         to be used to build PremisNode instances.
 
         __Args__
 
-        1. xmlfile: the path to a PREMIS xml serialization on disk
+        1. xmlfile: the path to a PREMIS xml serialization on disk, or None
+        for a factory which is only used to build nodes from elements parsed
+        elsewhere, through its .build* methods
+
+        __KWArgs__
+
+        * intern_strings (bool): if True the text of parsed elements is
+        interned, see _intern_table_for()
+        * intern_table (InternTable): the table to intern through, eg. one
+        shared between factories. Defaults to a table for this factory.
         """
         ET.register_namespace('premis', "http://www.loc.gov/premis/v3")
         ET.register_namespace('xsi', "http://www.w3.org/2001/XMLSchema-instance")
+        self.intern_table = _intern_table_for(intern_strings, intern_table)
+        if xmlfile is None:
+            self.xml = None
+            return
         tree = ET.parse(xmlfile)
         self.xml = tree.getroot()
 
+    def _text(self, element):
+        """
+        returns the text of an element, interned if the factory has an
+        intern_table.
+        """
+        if self.intern_table is None:
+            return element.text
+        return self.intern_table.intern(element.text)
+
+    def _set_optional_fields(self, result, node, fields):
+        """
+        Sets the optional fields of a node being built from the children of
+        [node], walking the children once and dispatching each tag present
+        through a table built by _optional_fields(). Fields which aren't
+        present cost nothing.
+
+        __Args__
+
+        1. result (PremisNode): the node being built
+        2. node (ET.Element): the element it is being built from
+        3. fields (dict): the table of optional fields
+        """
+        present = {}
+        for child in node:
+            tag = child.tag
+            if tag in fields:
+                children = present.get(tag)
+                if children is None:
+                    present[tag] = [child]
+                else:
+                    children.append(child)
+        for tag, children in present.items():
+            setter, kind, builder = fields[tag]
+            if kind == 'text':
+                value = self._text(children[0])
+                if not value:
+                    continue
+            elif kind == 'texts':
+                value = [self._text(x) for x in children]
+            elif kind == 'nodes':
+                builder = getattr(self, builder)
+                value = [builder(x) for x in children]
+            else:
+                if len(children[0]) == 0:
+                    continue
+                value = getattr(self, builder)(children[0])
+            getattr(result, setter)(value)
+
     def _find_all(self, node, tag, req=False):
         """
         Searches a given Element instance for all values corresponding to the
@@ -56,7 +187,7 @@ class XMLNodeFactory(object):
         parse = [x for x in node.findall(tag)]
         if len(parse) < 1 and req:
             raise ValueError("The {} tag is required but was not found.".format(tag))
-        result = [x.text for x in parse]
+        result = [self._text(x) for x in parse]
         return result
 
     def _find(self, node, tag, req=False):
@@ -82,7 +213,7 @@ class XMLNodeFactory(object):
         if parse is None and req:
             raise ValueError("The {} tag is required but was not found.".format(tag))
         try:
-            result = parse.text
+            result = self._text(parse)
             return result
         except AttributeError:
             return ""
@@ -162,18 +293,16 @@ class XMLNodeFactory(object):
         * (list or False): A list of PremisNodes, or False if no applicable
         nodes were found.
         """
-        parse = self._find_all_nodes(node, tag, req)
+        parse = node.findall(tag)
         if parse:
-            result = [func(x) for x in parse]
-            return result
+            return [func(x) for x in parse]
+        if req:
+            raise ValueError("The {} tag is required but was not found.".format(tag))
         return False
 
-    def _pn(self, func, node, tag, req=False):
-        """
-        wraps ._process_nodes(), because I got tired of typing the whole thing
-        so many times.
-        """
-        return self._process_nodes(func, node, tag, req)
+    # wraps ._process_nodes(), because I got tired of typing the whole thing
+    # so many times.
+    _pn = _process_nodes
 
     def find_objects(self):
         """
@@ -235,7 +364,7 @@ class XMLNodeFactory(object):
         result = ExtensionNode()
         for child in node:
             if len(child) == 0:
-                result.add_to_field(child.tag, child.text)
+                result.add_to_field(child.tag, self._text(child))
             else:
                 result.add_to_field(child.tag, self.buildExtensionNode(child))
         return result
@@ -257,7 +386,7 @@ class XMLNodeFactory(object):
         result = extendedNode()
         for child in node:
             if len(child) == 0:
-                result.add_to_field(child.tag, child.text)
+                result.add_to_field(child.tag, self._text(child))
             else:
                 result.add_to_field(child.tag, self.buildExtensionNode(child))
         return result
@@ -301,6 +430,21 @@ class XMLNodeFactory(object):
     def buildRightsExtension(self, node):
         return self.buildExtendedNode(RightsExtension, node)
 
+    _object_fields = _optional_fields(
+        ('preservationLevel', 'nodes'),
+        ('significantProperties', 'nodes'),
+        ('originalName', 'text'),
+        ('storage', 'nodes'),
+        ('signatureInformation', 'nodes'),
+        ('environmentFunction', 'nodes'),
+        ('environmentDesignation', 'nodes'),
+        ('environmentRegistry', 'nodes'),
+        ('environmentExtension', 'nodes'),
+        ('relationship', 'nodes'),
+        ('linkingEventIdentifier', 'nodes'),
+        ('linkingRightsStatementIdentifier', 'nodes')
+    )
+
     def buildObject(self, node):
         objIDs = self._pn(self.buildObjectIdentifier, node, '{http://www.loc.gov/premis/v3}objectIdentifier', req=True)
         objectCategory = node.get('{http://www.w3.org/2001/XMLSchema-instance}type').lstrip('premis:')
@@ -309,53 +453,7 @@ class XMLNodeFactory(object):
         objectCharacteristics = self._pn(self.buildObjectCharacteristics, node, '{http://www.loc.gov/premis/v3}objectCharacteristics', req=True)
         obj = Object(objIDs, objectCategory, objectCharacteristics)
 
-        preservationLevel = self._pn(self.buildPreservationLevel, node, '{http://www.loc.gov/premis/v3}preservationLevel')
-        if preservationLevel:
-            obj.set_preservationLevel(preservationLevel)
-
-        significantProperties = self._pn(self.buildSignificantProperties, node, '{http://www.loc.gov/premis/v3}significantProperties')
-        if significantProperties:
-            obj.set_significantProperties(significantProperties)
-
-        originalName = self._find(node, '{http://www.loc.gov/premis/v3}originalName')
-        if originalName:
-            obj.set_originalName(originalName)
-
-        storage = self._pn(self.buildStorage, node, '{http://www.loc.gov/premis/v3}storage')
-        if storage:
-            obj.set_storage(storage)
-
-        signatureInformation = self._pn(self.buildSignatureInformation, node, '{http://www.loc.gov/premis/v3}signatureInformation')
-        if signatureInformation:
-            obj.set_signatureInformation(signatureInformation)
-
-        environmentFunction = self._pn(self.buildEnvironmentFunction, node, '{http://www.loc.gov/premis/v3}environmentFunction')
-        if environmentFunction:
-            obj.set_environmentFunction(environmentFunction)
-
-        environmentDesignation = self._pn(self.buildEnvironmentDesignation, node, '{http://www.loc.gov/premis/v3}environmentDesignation')
-        if environmentDesignation:
-            obj.set_environmentDesignation(environmentDesignation)
-
-        environmentRegistry = self._pn(self.buildEnvironmentRegistry, node, '{http://www.loc.gov/premis/v3}environmentRegistry')
-        if environmentRegistry:
-            obj.set_environmentRegistry(environmentRegistry)
-
-        environmentExtension = self._find_all(node, '{http://www.loc.gov/premis/v3}environmentExtension')
-        if environmentExtension:
-            obj.set_environmentExtension(self._pn(self.buildEnvironmentExtension, node, '{http://www.loc.gov/premis/v3}environmentExtension'))
-
-        relationship = self._pn(self.buildRelationship, node, '{http://www.loc.gov/premis/v3}relationship')
-        if relationship:
-            obj.set_relationship(relationship)
-
-        linkingEventIdentifier = self._pn(self.buildLinkingEventIdentifier, node, '{http://www.loc.gov/premis/v3}linkingEventIdentifier')
-        if linkingEventIdentifier:
-            obj.set_linkingEventIdentifier(linkingEventIdentifier)
-
-        linkingRightsStatementIdentifier = self._pn(self.buildLinkingRightsStatementIdentifier, node, '{http://www.loc.gov/premis/v3}linkingRightsStatementIdentifier')
-        if linkingRightsStatementIdentifier:
-            obj.set_linkingRightsStatementIdentifier(linkingRightsStatementIdentifier)
+        self._set_optional_fields(obj, node, self._object_fields)
 
         return obj
 
@@ -365,28 +463,25 @@ class XMLNodeFactory(object):
         objID = ObjectIdentifier(objectIdentifierType, objectIdentifierValue)
         return objID
 
+    _preservationLevel_fields = _optional_fields(
+        ('preservationLevelType', 'text'),
+        ('preservationLevelRole', 'text'),
+        ('preservationLevelRationale', 'texts'),
+        ('preservationLevelDateAssigned', 'text')
+    )
+
     def buildPreservationLevel(self, node):
         preservationLevelValue = self._find(node, '{http://www.loc.gov/premis/v3}preservationLevelValue', req=True)
         preservationLevel = PreservationLevel(preservationLevelValue)
 
-        preservationLevelType = self._find(node, '{http://www.loc.gov/premis/v3}preservationLevelType')
-        if preservationLevelType:
-            preservationLevel.set_preservationLevelType(preservationLevelType)
-
-        preservationLevelRole = self._find(node, '{http://www.loc.gov/premis/v3}preservationLevelRole')
-        if preservationLevelRole:
-            preservationLevel.set_preservationLevelRole(preservationLevelRole)
-
-        preservationLevelRationale = self._find_all(node, '{http://www.loc.gov/premis/v3}preservationLevelRationale')
-        if preservationLevelRationale:
-            preservationLevel.set_preservationLevelRationale(preservationLevelRationale)
-
-        preservationLevelDateAssigned = self._find(node, '{http://www.loc.gov/premis/v3}preservationLevelDateAssigned')
-        if preservationLevelDateAssigned:
-            preservationLevel.set_preservationLevelDateAssigned(preservationLevelDateAssigned)
+        self._set_optional_fields(preservationLevel, node, self._preservationLevel_fields)
 
         return preservationLevel
 
+    _significantProperties_fields = _optional_fields(
+        ('significantPropertiesType', 'text')
+    )
+
     def buildSignificantProperties(self, node):
         significantPropertiesValue = None
         significantPropertiesExtension = None
@@ -403,65 +498,47 @@ class XMLNodeFactory(object):
         else:
             significantProperties = SignificantProperties(significantPropertiesValue=significantPropertiesValue, significantPropertiesExtension=self._pn(self.buildSignificantPropertiesExtension, node, '{http://www.loc.gov/premis/v3}significantPropertiesExtension'))
 
-        significantPropertiesType = self._find(node, '{http://www.loc.gov/premis/v3}significantPropertiesType')
-        if significantPropertiesType:
-            significantProperties.set_significantPropertiesType(significantPropertiesType)
+        self._set_optional_fields(significantProperties, node, self._significantProperties_fields)
 
         return significantProperties
 
+    _objectCharacteristics_fields = _optional_fields(
+        ('compositionLevel', 'text'),
+        ('fixity', 'nodes'),
+        ('size', 'text'),
+        ('creatingApplication', 'nodes'),
+        ('inhibitors', 'nodes'),
+        ('objectCharacteristicsExtension', 'nodes')
+    )
+
     def buildObjectCharacteristics(self, node):
         format = self._pn(self.buildFormat, node, '{http://www.loc.gov/premis/v3}format', req=True)
         objectCharacteristics = ObjectCharacteristics(format)
 
-        compositionLevel = self._find(node, '{http://www.loc.gov/premis/v3}compositionLevel')
-        if compositionLevel:
-            objectCharacteristics.set_compositionLevel(compositionLevel)
-
-        fixity = self._pn(self.buildFixity, node, '{http://www.loc.gov/premis/v3}fixity')
-        if fixity:
-            objectCharacteristics.set_fixity(fixity)
-
-        size = self._find(node, '{http://www.loc.gov/premis/v3}size')
-        if size:
-            objectCharacteristics.set_size(size)
-
-        creatingApplication = self._pn(self.buildCreatingApplication, node, '{http://www.loc.gov/premis/v3}creatingApplication')
-        if creatingApplication:
-            objectCharacteristics.set_creatingApplication(creatingApplication)
-
-        inhibitors = self._pn(self.buildInhibitors, node, '{http://www.loc.gov/premis/v3}inhibitors')
-        if inhibitors:
-            objectCharacteristics.set_inhibitors(inhibitors)
-
-        objectCharacteristicsExtension = self._find_all(node, '{http://www.loc.gov/premis/v3}objectCharacteristicsExtension')
-        if objectCharacteristicsExtension:
-            objectCharacteristics.set_objectCharacteristicsExtension(self._pn(self.buildObjectCharacteristicsExtension, node, '{http://www.loc.gov/premis/v3}objectCharacteristicsExtension'))
+        self._set_optional_fields(objectCharacteristics, node, self._objectCharacteristics_fields)
 
         return objectCharacteristics
 
+    _storage_fields = _optional_fields(
+        ('contentLocation', 'node'),
+        ('storageMedium', 'text')
+    )
+
     def buildStorage(self, node):
         storage = Storage()
 
-        contentLocationNode = self._find_node(node, '{http://www.loc.gov/premis/v3}contentLocation')
-        if contentLocationNode:
-            contentLocation = self.buildContentLocation(contentLocationNode)
-            storage.set_contentLocation(contentLocation)
-
-        storageMedium = self._find(node, '{http://www.loc.gov/premis/v3}storageMedium')
-        if storageMedium:
-            storage.set_storageMedium(storageMedium)
+        self._set_optional_fields(storage, node, self._storage_fields)
 
         return storage
 
+    _signatureInformation_fields = _optional_fields(
+        ('signature', 'nodes'),
+        ('signatureInformationExtension', 'nodes')
+    )
+
     def buildSignatureInformation(self, node):
         signatureInformation = SignatureInformation()
-        signature = self._pn(self.buildSignature, node, '{http://www.loc.gov/premis/v3}signature')
-        if signature:
-            signatureInformation.set_signature(signature)
-
-        signatureInformationExtension = self._find_all(node, '{http://www.loc.gov/premis/v3}signatureInformationExtension')
-        if signatureInformationExtension:
-            signatureInformation.set_signatureInformationExtension(self._pn(self.buildSignatureInformationExtension, node, '{http://www.loc.gov/premis/v3}signatureInformationExtension'))
+        self._set_optional_fields(signatureInformation, node, self._signatureInformation_fields)
 
         return signatureInformation
 
@@ -473,41 +550,42 @@ class XMLNodeFactory(object):
 
         return environmentFunction
 
+    _environmentDesignation_fields = _optional_fields(
+        ('environmentVersion', 'text'),
+        ('environmentOrigin', 'text'),
+        ('environmentDesignationNote', 'texts'),
+        ('environmentDesignationExtension', 'nodes')
+    )
+
     def buildEnvironmentDesignation(self, node):
         environmentDesignationName = self._find(node, '{http://www.loc.gov/premis/v3}environmentName', req=True)
 
         environmentDesignation = EnvironmentDesignation(environmentDesignationName)
 
-        environmentVersion = self._find(node, '{http://www.loc.gov/premis/v3}environmentVersion')
-        if environmentVersion:
-            environmentDesignation.set_environmentVersion(environmentVersion)
-
-        environmentOrigin = self._find(node, '{http://www.loc.gov/premis/v3}environmentOrigin')
-        if environmentOrigin:
-            environmentDesignation.set_environmentOrigin(environmentOrigin)
-
-        environmentDesignationNote = self._find_all(node, '{http://www.loc.gov/premis/v3}environmentDesignationNote')
-        if environmentDesignationNote:
-            environmentDesignation.set_environmentDesignationNote(environmentDesignationNote)
-
-        environmentDesignationExtension = self._find_all(node, '{http://www.loc.gov/premis/v3}environmentDesignationExtension')
-        if environmentDesignationExtension:
-            environmentDesignation.set_environmentDesignationExtension(self._pn(self.buildEnvironmentDesignationExtension, node, '{http://www.loc.gov/premis/v3}environmentDesignationExtension'))
+        self._set_optional_fields(environmentDesignation, node, self._environmentDesignation_fields)
 
         return environmentDesignation
 
+    _environmentRegistry_fields = _optional_fields(
+        ('environmentRegistryRole', 'text')
+    )
+
     def buildEnvironmentRegistry(self, node):
         environmentRegistryName = self._find(node, '{http://www.loc.gov/premis/v3}environmentRegistryName', req=True)
         environmentRegistryKey = self._find(node, '{http://www.loc.gov/premis/v3}environmentRegistryKey', req=True)
 
         environmentRegistry = EnvironmentRegistry(environmentRegistryName, environmentRegistryKey)
 
-        environmentRegistryRole = self._find(node, '{http://www.loc.gov/premis/v3}environmentRegistryRole')
-        if environmentRegistryRole:
-            environmentRegistry.set_environmentRegistryRole(environmentRegistryRole)
+        self._set_optional_fields(environmentRegistry, node, self._environmentRegistry_fields)
 
         return environmentRegistry
 
+    _relationship_fields = _optional_fields(
+        ('relatedEventIdentifier', 'nodes'),
+        ('relatedEnvironmentPurpose', 'texts'),
+        ('relatedEnvironmentCharacteristic', 'text')
+    )
+
     def buildRelationship(self, node):
         relationshipType = self._find(node, '{http://www.loc.gov/premis/v3}relationshipType', req=True)
         relationshipSubType = self._find(node, '{http://www.loc.gov/premis/v3}relationshipSubType', req=True)
@@ -515,17 +593,7 @@ class XMLNodeFactory(object):
 
         relationship = Relationship(relationshipType, relationshipSubType, relatedObjectIdentifier)
 
-        relatedEventIdentifier = self._pn(self.buildRelatedEventIdentifier, node, '{http://www.loc.gov/premis/v3}relatedEventIdentifier')
-        if relatedEventIdentifier:
-            relationship.set_relatedEventIdentifier(relatedEventIdentifier)
-
-        relatedEnvironmentPurpose = self._find_all(node, '{http://www.loc.gov/premis/v3}relatedEnvironmentPurpose')
-        if relatedEnvironmentPurpose:
-            relationship.set_relatedEnvironmentPurpose(relatedEnvironmentPurpose)
-
-        relatedEnvironmentCharacteristic = self._find(node, '{http://www.loc.gov/premis/v3}relatedEnvironmentCharacteristic')
-        if relatedEnvironmentCharacteristic:
-            relationship.set_relatedEnvironmentCharacteristic(relatedEnvironmentCharacteristic)
+        self._set_optional_fields(relationship, node, self._relationship_fields)
 
         return relationship
 
@@ -545,18 +613,24 @@ class XMLNodeFactory(object):
 
         return linkingRightsStatementIdentifier
 
+    _fixity_fields = _optional_fields(
+        ('messageDigestOriginator', 'text')
+    )
+
     def buildFixity(self, node):
         messageDigestAlgorithm = self._find(node, '{http://www.loc.gov/premis/v3}messageDigestAlgorithm')
         messageDigest = self._find(node, '{http://www.loc.gov/premis/v3}messageDigest')
 
         fixity = Fixity(messageDigestAlgorithm, messageDigest)
 
-        messageDigestOriginator = self._find(node, '{http://www.loc.gov/premis/v3}messageDigestOriginator')
-        if messageDigestOriginator:
-            fixity.set_messageDigestOriginator(messageDigestOriginator)
+        self._set_optional_fields(fixity, node, self._fixity_fields)
 
         return fixity
 
+    _format_fields = _optional_fields(
+        ('formatNote', 'texts')
+    )
+
     def buildFormat(self, node):
         formatDesignation = None
         formatRegistry = None
@@ -578,45 +652,35 @@ class XMLNodeFactory(object):
         else:
             format = Format(formatDesignation=formatDesignation, formatRegistry=formatRegistry)
 
-        formatNote = self._find_all(node, '{http://www.loc.gov/premis/v3}formatNote')
-        if formatNote:
-            format.set_formatNote(formatNote)
+        self._set_optional_fields(format, node, self._format_fields)
 
         return format
 
+    _creatingApplication_fields = _optional_fields(
+        ('creatingApplicationName', 'text'),
+        ('creatingApplicationVersion', 'text'),
+        ('dateCreatedByApplication', 'text'),
+        ('creatingApplicationExtension', 'nodes')
+    )
+
     def buildCreatingApplication(self, node):
         creatingApplication = CreatingApplication()
 
-        creatingApplicationName = self._find(node, '{http://www.loc.gov/premis/v3}creatingApplicationName')
-        if creatingApplicationName:
-            creatingApplication.set_creatingApplicationName(creatingApplicationName)
-
-        creatingApplicationVersion = self._find(node, '{http://www.loc.gov/premis/v3}creatingApplicationVersion')
-        if creatingApplicationVersion:
-            creatingApplication.set_creatingApplicationVersion(creatingApplicationVersion)
-
-        dateCreatedByApplication = self._find(node, '{http://www.loc.gov/premis/v3}dateCreatedByApplication')
-        if dateCreatedByApplication:
-            creatingApplication.set_dateCreatedByApplication(dateCreatedByApplication)
-
-        creatingApplicationExtension = self._find_all(node, '{http://www.loc.gov/premis/v3}creatingApplicationExtension')
-        if creatingApplicationExtension:
-            creatingApplication.set_creatingApplicationExtension(self._pn(self.buildCreatingApplicationExtension, node, '{http://www.loc.gov/premis/v3}creatingApplicationExtension'))
+        self._set_optional_fields(creatingApplication, node, self._creatingApplication_fields)
 
         return creatingApplication
 
+    _inhibitors_fields = _optional_fields(
+        ('inhibitorTarget', 'texts'),
+        ('inhibitorKey', 'text')
+    )
+
     def buildInhibitors(self, node):
         inhibitorType = self._find(node, '{http://www.loc.gov/premis/v3}inhibitorType', req=True)
 
         inhibitors = Inhibitors(inhibitorType)
 
-        inhibitorTarget = self._find_all(node, '{http://www.loc.gov/premis/v3}inhibitorTarget')
-        if inhibitorTarget:
-            inhibitors.set_inhibitorTarget(inhibitorTarget)
-
-        inhibitorKey = self._find(node, '{http://www.loc.gov/premis/v3}inhibitorKey')
-        if inhibitorKey:
-            inhibitors.set_inhibitorKey(inhibitorKey)
+        self._set_optional_fields(inhibitors, node, self._inhibitors_fields)
 
         return inhibitors
 
@@ -628,6 +692,12 @@ class XMLNodeFactory(object):
 
         return contentLocation
 
+    _signature_fields = _optional_fields(
+        ('signer', 'text'),
+        ('signatureProperties', 'texts'),
+        ('keyInformation', 'node')
+    )
+
     def buildSignature(self, node):
         signatureEncoding = self._find(node, '{http://www.loc.gov/premis/v3}signatureEncoding', req=True)
         signatureMethod = self._find(node, '{http://www.loc.gov/premis/v3}signatureMethod', req=True)
@@ -636,66 +706,71 @@ class XMLNodeFactory(object):
 
         signature = Signature(signatureEncoding, signatureMethod, signatureValue, signatureValidationRules)
 
-        signer = self._find(node, '{http://www.loc.gov/premis/v3}signer')
-        if signer:
-            signature.set_signer(signer)
-
-        signatureProperties = self._find_all(node, '{http://www.loc.gov/premis/v3}signatureProperties')
-        if signatureProperties:
-            signature.set_signatureProperties(signatureProperties)
-
-        keyInformationNode = self._find_node(node, '{http://www.loc.gov/premis/v3}keyInformation')
-        if keyInformationNode:
-            signature.set_keyInformation(self.buildKeyInformation(keyInformationNode))
+        self._set_optional_fields(signature, node, self._signature_fields)
 
         return signature
 
+    _relatedObjectIdentifier_fields = _optional_fields(
+        ('relatedObjectSequence', 'text')
+    )
+
     def buildRelatedObjectIdentifier(self, node):
         relatedObjectIdentifierType = self._find(node, '{http://www.loc.gov/premis/v3}relatedObjectIdentifierType', req=True)
         relatedObjectIdentifierValue = self._find(node, '{http://www.loc.gov/premis/v3}relatedObjectIdentifierValue', req=True)
 
         relatedObjectIdentifier = RelatedObjectIdentifier(relatedObjectIdentifierType, relatedObjectIdentifierValue)
 
-        relatedObjectSequence = self._find(node, '{http://www.loc.gov/premis/v3}relatedObjectSequence')
-        if relatedObjectSequence:
-            relatedObjectIdentifier.set_relatedObjectSequence(relatedObjectSequence)
+        self._set_optional_fields(relatedObjectIdentifier, node, self._relatedObjectIdentifier_fields)
 
         return relatedObjectIdentifier
 
+    _relatedEventIdentifier_fields = _optional_fields(
+        ('relatedEventSequence', 'text')
+    )
+
     def buildRelatedEventIdentifier(self, node):
         relatedEventIdentifierType = self._find(node, '{http://www.loc.gov/premis/v3}relatedEventIdentifierType', req=True)
         relatedEventIdentifierValue = self._find(node, '{http://www.loc.gov/premis/v3}relatedEventIdentifierValue', req=True)
 
         relatedEventIdentifier = RelatedEventIdentifier(relatedEventIdentifierType, relatedEventIdentifierValue)
 
-        relatedEventSequence = self._find(node, '{http://www.loc.gov/premis/v3}relatedEventSequence')
-        if relatedEventSequence:
-            relatedEventIdentifier.set_relatedEventSequence(relatedEventSequence)
+        self._set_optional_fields(relatedEventIdentifier, node, self._relatedEventIdentifier_fields)
 
         return relatedEventIdentifier
 
+    _formatDesignation_fields = _optional_fields(
+        ('formatVersion', 'text')
+    )
+
     def buildFormatDesignation(self, node):
         formatName = self._find(node, '{http://www.loc.gov/premis/v3}formatName', req=True)
         formatDesignation = FormatDesignation(formatName)
 
-        formatVersion = self._find(node, '{http://www.loc.gov/premis/v3}formatVersion')
-        if formatVersion:
-            formatDesignation.set_formatVersion(formatVersion)
+        self._set_optional_fields(formatDesignation, node, self._formatDesignation_fields)
 
         return formatDesignation
 
+    _formatRegistry_fields = _optional_fields(
+        ('formatRegistryRole', 'text')
+    )
+
     def buildFormatRegistry(self, node):
         formatRegistryName = self._find(node, '{http://www.loc.gov/premis/v3}formatRegistryName', req=True)
         formatRegistryKey = self._find(node, '{http://www.loc.gov/premis/v3}formatRegistryKey', req=True)
 
         formatRegistry = FormatRegistry(formatRegistryName, formatRegistryKey)
 
-        formatRegistryRole = self._find(node, '{http://www.loc.gov/premis/v3}formatRegistryRole')
-        if formatRegistryRole:
-            formatRegistry.set_formatRegistryRole(formatRegistryRole)
+        self._set_optional_fields(formatRegistry, node, self._formatRegistry_fields)
 
         return formatRegistry
 
+    _event_fields = _optional_fields(
+        ('eventDetailInformation', 'nodes'),
+        ('eventOutcomeInformation', 'nodes'),
+        ('linkingAgentIdentifier', 'nodes'),
+        ('linkingObjectIdentifier', 'nodes')
+    )
+
     def buildEvent(self, node):
         eventIdentifier = self.buildEventIdentifier(self._find_node(node, '{http://www.loc.gov/premis/v3}eventIdentifier', req=True))
         eventType = self._find(node, '{http://www.loc.gov/premis/v3}eventType', req=True)
@@ -703,21 +778,7 @@ class XMLNodeFactory(object):
 
         event = Event(eventIdentifier, eventType, eventDateTime)
 
-        eventDetailInformation = self._pn(self.buildEventDetailInformation, node, '{http://www.loc.gov/premis/v3}eventDetailInformation')
-        if eventDetailInformation:
-            event.set_eventDetailInformation(eventDetailInformation)
-
-        eventOutcomeInformation = self._pn(self.buildEventOutcomeInformation, node, '{http://www.loc.gov/premis/v3}eventOutcomeInformation')
-        if eventOutcomeInformation:
-            event.set_eventOutcomeInformation(eventOutcomeInformation)
-
-        linkingAgentIdentifier = self._pn(self.buildLinkingAgentIdentifier, node, '{http://www.loc.gov/premis/v3}linkingAgentIdentifier')
-        if linkingAgentIdentifier:
-            event.set_linkingAgentIdentifier(linkingAgentIdentifier)
-
-        linkingObjectIdentifier = self._pn(self.buildLinkingObjectIdentifier, node, '{http://www.loc.gov/premis/v3}linkingObjectIdentifier')
-        if linkingObjectIdentifier:
-            event.set_linkingObjectIdentifier(linkingObjectIdentifier)
+        self._set_optional_fields(event, node, self._event_fields)
 
         return event
 
@@ -758,27 +819,31 @@ class XMLNodeFactory(object):
 
         return eventOutcomeInformation
 
+    _linkingAgentIdentifier_fields = _optional_fields(
+        ('linkingAgentRole', 'texts')
+    )
+
     def buildLinkingAgentIdentifier(self, node):
         linkingAgentIdentifierType = self._find(node, '{http://www.loc.gov/premis/v3}linkingAgentIdentifierType', req=True)
         linkingAgentIdentifierValue = self._find(node, '{http://www.loc.gov/premis/v3}linkingAgentIdentifierValue', req=True)
 
         linkingAgentIdentifier = LinkingAgentIdentifier(linkingAgentIdentifierType, linkingAgentIdentifierValue)
 
-        linkingAgentRole = self._find_all(node, '{http://www.loc.gov/premis/v3}linkingAgentRole')
-        if linkingAgentRole:
-            linkingAgentIdentifier.set_linkingAgentRole(linkingAgentRole)
+        self._set_optional_fields(linkingAgentIdentifier, node, self._linkingAgentIdentifier_fields)
 
         return linkingAgentIdentifier
 
+    _linkingObjectIdentifier_fields = _optional_fields(
+        ('linkingObjectRole', 'texts')
+    )
+
     def buildLinkingObjectIdentifier(self, node):
         linkingObjectIdentifierType = self._find(node, '{http://www.loc.gov/premis/v3}linkingObjectIdentifierType', req=True)
         linkingObjectIdentifierValue = self._find(node, '{http://www.loc.gov/premis/v3}linkingObjectIdentifierValue', req=True)
 
         linkingObjectIdentifier = LinkingObjectIdentifier(linkingObjectIdentifierType, linkingObjectIdentifierValue)
 
-        linkingObjectRole = self._find_all(node, '{http://www.loc.gov/premis/v3}linkingObjectRole')
-        if linkingObjectRole:
-            linkingObjectIdentifier.set_linkingObjectRole(linkingObjectRole)
+        self._set_optional_fields(linkingObjectIdentifier, node, self._linkingObjectIdentifier_fields)
 
         return linkingObjectIdentifier
 
@@ -797,42 +862,23 @@ class XMLNodeFactory(object):
 
         return eventOutcomeDetail
 
+    _agent_fields = _optional_fields(
+        ('agentName', 'texts'),
+        ('agentType', 'text'),
+        ('agentVersion', 'text'),
+        ('agentNote', 'texts'),
+        ('agentExtension', 'nodes'),
+        ('linkingEventIdentifier', 'nodes'),
+        ('linkingRightsStatementIdentifier', 'nodes'),
+        ('linkingEnvironmentIdentifier', 'nodes')
+    )
+
     def buildAgent(self, node):
         agentIdentifier = self._pn(self.buildAgentIdentifier, node, '{http://www.loc.gov/premis/v3}agentIdentifier', req=True)
 
         agent = Agent(agentIdentifier)
 
-        agentName = self._find_all(node, '{http://www.loc.gov/premis/v3}agentName')
-        if agentName:
-            agent.set_agentName(agentName)
-
-        agentType = self._find(node, '{http://www.loc.gov/premis/v3}agentType')
-        if agentType:
-            agent.set_agentType(agentType)
-
-        agentVersion = self._find(node, '{http://www.loc.gov/premis/v3}agentVersion')
-        if agentVersion:
-            agent.set_agentVersion(agentVersion)
-
-        agentNote = self._find_all(node, '{http://www.loc.gov/premis/v3}agentNote')
-        if agentNote:
-            agent.set_agentNote(agentNote)
-
-        agentExtension = self._find_all(node, '{http://www.loc.gov/premis/v3}agentExtension')
-        if agentExtension:
-            agent.set_agentExtension(self._pn(self.buildAgentExtension, node, '{http://www.loc.gov/premis/v3}agentExtension'))
-
-        linkingEventIdentifier = self._pn(self.buildLinkingEventIdentifier, node, '{http://www.loc.gov/premis/v3}linkingEventIdentifier')
-        if linkingEventIdentifier:
-            agent.set_linkingEventIdentifier(linkingEventIdentifier)
-
-        linkingRightsStatementIdentifier = self._pn(self.buildLinkingRightsStatementIdentifier, node, '{http://www.loc.gov/premis/v3}linkingRightsStatementIdentifier')
-        if linkingRightsStatementIdentifier:
-            agent.set_linkingRightsStatementIdentifier(linkingRightsStatementIdentifier)
-
-        linkingEnvironmentIdentifier = self._pn(self.buildLinkingEnvironmentIdentifier, node, '{http://www.loc.gov/premis/v3}linkingEnvironmentIdentifier')
-        if linkingEnvironmentIdentifier:
-            agent.set_linkingEnvironmentIdentifier(linkingEnvironmentIdentifier)
+        self._set_optional_fields(agent, node, self._agent_fields)
 
         return agent
 
@@ -844,15 +890,17 @@ class XMLNodeFactory(object):
 
         return agentIdentifier
 
+    _linkingEnvironmentIdentifier_fields = _optional_fields(
+        ('linkingEnvironmentRole', 'texts')
+    )
+
     def buildLinkingEnvironmentIdentifier(self, node):
         linkingEnvironmentIdentifierType = self._find(node, '{http://www.loc.gov/premis/v3}linkingEnvironmentIdentifierType', req=True)
         linkingEnvironmentIdentifierValue = self._find(node, '{http://www.loc.gov/premis/v3}linkingEnvironmentIdentifierValue', req=True)
 
         linkingEnvironmentIdentifier = LinkingEnvironmentIdentifier(linkingEnvironmentIdentifierType, linkingEnvironmentIdentifierValue)
 
-        linkingEnvironmentRole = self._find_all(node, '{http://www.loc.gov/premis/v3}linkingEnvironmentRole')
-        if linkingEnvironmentRole:
-            linkingEnvironmentIdentifier.set_linkingEnvironmentRole(linkingEnvironmentRole)
+        self._set_optional_fields(linkingEnvironmentIdentifier, node, self._linkingEnvironmentIdentifier_fields)
 
         return linkingEnvironmentIdentifier
 
@@ -871,6 +919,16 @@ class XMLNodeFactory(object):
 
         return rights
 
+    _rightsStatement_fields = _optional_fields(
+        ('copyrightInformation', 'node'),
+        ('licenseInformation', 'node'),
+        ('statuteInformation', 'nodes'),
+        ('otherRightsInformation', 'node'),
+        ('rightsGranted', 'nodes'),
+        ('linkingObjectIdentifier', 'nodes'),
+        ('linkingAgentIdentifier', 'nodes')
+    )
+
     def buildRightsStatement(self, node):
         rightsStatementIdentifierNode = self._find_node(node, '{http://www.loc.gov/premis/v3}rightsStatementIdentifier', req=True)
         rightsStatementIdentifier = self.buildRightsStatementIdentifier(rightsStatementIdentifierNode)
@@ -878,36 +936,7 @@ class XMLNodeFactory(object):
 
         rightsStatement = RightsStatement(rightsStatementIdentifier, rightsBasis)
 
-        copyrightInformationNode = self._find_node(node, '{http://www.loc.gov/premis/v3}copyrightInformation')
-        if copyrightInformationNode:
-            copyrightInformation = self.buildCopyrightInformation(copyrightInformationNode)
-            rightsStatement.set_copyrightInformation(copyrightInformation)
-
-        licenseInformationNode = self._find_node(node, '{http://www.loc.gov/premis/v3}licenseInformation')
-        if licenseInformationNode:
-            licenseInformation = self.buildLicenseInformation(licenseInformationNode)
-            rightsStatement.set_licenseInformation(licenseInformation)
-
-        statuteInformation = self._pn(self.buildStatuteInformation, node, '{http://www.loc.gov/premis/v3}statuteInformation')
-        if statuteInformation:
-            rightsStatement.set_statuteInformation(statuteInformation)
-
-        otherRightsInformationNode = self._find_node(node, '{http://www.loc.gov/premis/v3}otherRightsInformation')
-        if otherRightsInformationNode:
-            otherRightsInformation = self.buildOtherRightsInformation(otherRightsInformationNode)
-            rightsStatement.set_otherRightsInformation(otherRightsInformation)
-
-        rightsGranted = self._pn(self.buildRightsGranted, node, '{http://www.loc.gov/premis/v3}rightsGranted')
-        if rightsGranted:
-            rightsStatement.set_rightsGranted(rightsGranted)
-
-        linkingObjectIdentifier = self._pn(self.buildLinkingObjectIdentifier, node, '{http://www.loc.gov/premis/v3}linkingObjectIdentifier')
-        if linkingObjectIdentifier:
-            rightsStatement.set_linkingObjectIdentifier(linkingObjectIdentifier)
-
-        linkingAgentIdentifier = self._pn(self.buildLinkingAgentIdentifier, node, '{http://www.loc.gov/premis/v3}linkingAgentIdentifier')
-        if linkingAgentIdentifier:
-            rightsStatement.set_linkingAgentIdentifier(linkingAgentIdentifier)
+        self._set_optional_fields(rightsStatement, node, self._rightsStatement_fields)
 
         return rightsStatement
 
@@ -919,250 +948,366 @@ class XMLNodeFactory(object):
 
         return rightsStatementIdentifier
 
+    _copyrightInformation_fields = _optional_fields(
+        ('copyrightStatusDeterminationDate', 'text'),
+        ('copyrightNote', 'texts'),
+        ('copyrightDocumentationIdentifier', 'nodes'),
+        ('copyrightApplicableDates', 'node')
+    )
+
     def buildCopyrightInformation(self, node):
         copyrightStatus = self._find(node, '{http://www.loc.gov/premis/v3}copyrightStatus', req=True)
         copyrightJurisdiction = self._find(node, '{http://www.loc.gov/premis/v3}copyrightJurisdiction', req=True)
 
         copyrightInformation = CopyrightInformation(copyrightStatus, copyrightJurisdiction)
 
-        copyrightStatusDeterminationDate = self._find(node, '{http://www.loc.gov/premis/v3}copyrightStatusDeterminationDate')
-        if copyrightStatusDeterminationDate:
-            copyrightInformation.set_copyrightStatusDeterminationDate(copyrightStatusDeterminationDate)
-
-        copyrightNote = self._find_all(node, '{http://www.loc.gov/premis/v3}copyrightNote')
-        if copyrightNote:
-            copyrightInformation.set_copyrightNote(copyrightNote)
-
-        copyrightDocumentationIdentifier = self._pn(self.buildCopyrightDocumentationIdentifier, node, '{http://www.loc.gov/premis/v3}copyrightDocumentationIdentifier')
-        if copyrightDocumentationIdentifier:
-            copyrightInformation.set_copyrightDocumentationIdentifier(copyrightDocumentationIdentifier)
-
-        copyrightApplicableDatesNode = self._find_node(node, '{http://www.loc.gov/premis/v3}copyrightApplicableDates')
-        if copyrightApplicableDatesNode:
-            copyrightApplicableDates = self.buildCopyrightApplicableDates(copyrightApplicableDatesNode)
-            copyrightInformation.set_copyrightApplicableDates(copyrightApplicableDates)
+        self._set_optional_fields(copyrightInformation, node, self._copyrightInformation_fields)
 
         return copyrightInformation
 
+    _licenseInformation_fields = _optional_fields(
+        ('licenseDocumentationIdentifier', 'nodes'),
+        ('licenseTerms', 'text'),
+        ('licenseNote', 'texts'),
+        ('licenseApplicableDates', 'node')
+    )
+
     def buildLicenseInformation(self, node):
         licenseInformation = LicenseInformation()
 
-        licenseDocumentationIdentifier = self._pn(self.buildLicenseDocumentationIdentifier, node, '{http://www.loc.gov/premis/v3}licenseDocumentationIdentifier')
-        if licenseDocumentationIdentifier:
-            licenseInformation.set_licenseDocumentationIdentifier(licenseDocumentationIdentifier)
-
-        licenseTerms = self._find(node, '{http://www.loc.gov/premis/v3}licenseTerms')
-        if licenseTerms:
-            licenseInformation.set_licenseTerms(licenseTerms)
-
-        licenseNote = self._find_all(node, '{http://www.loc.gov/premis/v3}licenseNote')
-        if licenseNote:
-            licenseInformation.set_licenseNote(licenseNote)
-
-        licenseApplicableDatesNode = self._find_node(node, '{http://www.loc.gov/premis/v3}licenseApplicableDates')
-        if licenseApplicableDatesNode:
-            licenseApplicableDates = self.buildLicenseApplicableDates(licenseApplicableDatesNode)
-            licenseInformation.set_licenseApplicableDates(licenseApplicableDates)
+        self._set_optional_fields(licenseInformation, node, self._licenseInformation_fields)
 
         return licenseInformation
 
+    _statuteInformation_fields = _optional_fields(
+        ('statuteInformationDeterminationDate', 'text'),
+        ('statuteNote', 'texts'),
+        ('statuteDocumentationIdentifier', 'nodes'),
+        ('statuteApplicableDates', 'node')
+    )
+
     def buildStatuteInformation(self, node):
         statuteJurisdiction = self._find(node, '{http://www.loc.gov/premis/v3}statuteJurisdiction', req=True)
         statuteCitation = self._find(node, '{http://www.loc.gov/premis/v3}statuteCitation', req=True)
 
         statuteInformation = StatuteInformation(statuteJurisdiction, statuteCitation)
 
-        statuteInformationDeterminationDate = self._find(node, '{http://www.loc.gov/premis/v3}statuteInformationDeterminationDate')
-        if statuteInformationDeterminationDate:
-            statuteInformation.set_statuteInformationDeterminationDate(statuteInformationDeterminationDate)
-
-        statuteNote = self._find_all(node, '{http://www.loc.gov/premis/v3}statuteNote')
-        if statuteNote:
-            statuteInformation.set_statuteNote(statuteNote)
-
-        statuteDocumentationIdentifier = self._pn(self.buildStatuteDocumentationIdentifier, node, '{http://www.loc.gov/premis/v3}statuteDocumentationIdentifier')
-        if statuteDocumentationIdentifier:
-            statuteInformation.set_statuteDocumentationIdentifier(statuteDocumentationIdentifier)
-
-        statuteApplicableDatesNode = self._find_node(node, '{http://www.loc.gov/premis/v3}statuteApplicableDates')
-        if statuteApplicableDatesNode:
-            statuteApplicableDates = self.buildStatuteApplicableDates(statuteApplicableDatesNode)
-            statuteInformation.set_statuteApplicableDates(statuteApplicableDates)
+        self._set_optional_fields(statuteInformation, node, self._statuteInformation_fields)
 
         return statuteInformation
 
+    _otherRightsInformation_fields = _optional_fields(
+        ('otherRightsDocumentationIdentifier', 'nodes'),
+        ('otherRightsApplicableDates', 'node'),
+        ('otherRightsNote', 'texts')
+    )
+
     def buildOtherRightsInformation(self, node):
         otherRightsBasis = self._find(node, '{http://www.loc.gov/premis/v3}otherRightsBasis', req=True)
 
         otherRightsInformation = OtherRightsInformation(otherRightsBasis)
 
-        otherRightsDocumentationIdentifier = self._pn(self.buildOtherRightsDocumentationIdentifier, node, '{http://www.loc.gov/premis/v3}otherRightsDocumentationIdentifier')
-        if otherRightsDocumentationIdentifier:
-            otherRightsInformation.set_otherRightsDocumentationIdentifier(otherRightsDocumentationIdentifier)
-
-        otherRightsApplicableDatesNode = self._find_node(node, '{http://www.loc.gov/premis/v3}otherRightsApplicableDates')
-        if otherRightsApplicableDatesNode:
-            otherRightsApplicableDates = self.buildOtherRightsApplicableDates(otherRightsApplicableDatesNode)
-            otherRightsInformation.set_otherRightsApplicableDates(otherRightsApplicableDates)
-
-        otherRightsNote = self._find_all(node, '{http://www.loc.gov/premis/v3}otherRightsNote')
-        if otherRightsNote:
-            otherRightsInformation.set_otherRightsNote(otherRightsNote)
+        self._set_optional_fields(otherRightsInformation, node, self._otherRightsInformation_fields)
 
         return otherRightsInformation
 
+    _rightsGranted_fields = _optional_fields(
+        ('restriction', 'texts'),
+        ('termOfGrant', 'node'),
+        ('termOfRestriction', 'node'),
+        ('rightsGrantedNote', 'texts')
+    )
+
     def buildRightsGranted(self, node):
         act = self._find(node, '{http://www.loc.gov/premis/v3}act', req=True)
 
         rightsGranted = RightsGranted(act)
 
-        restriction = self._find_all(node, '{http://www.loc.gov/premis/v3}restriction')
-        if restriction:
-            rightsGranted.set_restriction(restriction)
-
-        termOfGrantNode = self._find_node(node, '{http://www.loc.gov/premis/v3}termOfGrant')
-        if termOfGrantNode:
-            termOfGrant = self.buildTermOfGrant(termOfGrantNode)
-            rightsGranted.set_termOfGrant(termOfGrant)
-
-        termOfRestrictionNode = self._find_node(node, '{http://www.loc.gov/premis/v3}termOfRestriction')
-        if termOfRestrictionNode:
-            termOfRestriction = self.buildTermOfRestriction(termOfRestrictionNode)
-            rightsGranted.set_termOfRestriction(termOfRestriction)
-
-        rightsGrantedNote = self._find_all(node, '{http://www.loc.gov/premis/v3}rightsGrantedNote')
-        if rightsGrantedNote:
-            rightsGranted.set_rightsGrantedNote(rightsGrantedNote)
+        self._set_optional_fields(rightsGranted, node, self._rightsGranted_fields)
 
         return rightsGranted
 
+    _copyrightDocumentationIdentifier_fields = _optional_fields(
+        ('copyrightDocumentationRole', 'text')
+    )
+
     def buildCopyrightDocumentationIdentifier(self, node):
         copyrightDocumentationIdentifierType = self._find(node, '{http://www.loc.gov/premis/v3}copyrightDocumentationIdentifierType', req=True)
         copyrightDocumentationIdentifierValue = self._find(node, '{http://www.loc.gov/premis/v3}copyrightDocumentationIdentifierValue', req=True)
 
         copyrightDocumentationIdentifier = CopyrightDocumentationIdentifier(copyrightDocumentationIdentifierType, copyrightDocumentationIdentifierValue)
 
-        copyrightDocumentationRole = self._find(node, '{http://www.loc.gov/premis/v3}copyrightDocumentationRole')
-        if copyrightDocumentationRole:
-            copyrightDocumentationIdentifier.set_copyrightDocumentationRole(copyrightDocumentationRole)
+        self._set_optional_fields(copyrightDocumentationIdentifier, node, self._copyrightDocumentationIdentifier_fields)
 
         return copyrightDocumentationIdentifier
 
+    _copyrightApplicableDates_fields = _optional_fields(
+        ('startDate', 'text'),
+        ('endDate', 'text')
+    )
+
     def buildCopyrightApplicableDates(self, node):
         copyrightApplicableDates = CopyrightApplicableDates()
 
-        startDate = self._find(node, '{http://www.loc.gov/premis/v3}startDate')
-        if startDate:
-            copyrightApplicableDates.set_startDate(startDate)
-
-        endDate = self._find(node, '{http://www.loc.gov/premis/v3}endDate')
-        if endDate:
-            copyrightApplicableDates.set_endDate(endDate)
+        self._set_optional_fields(copyrightApplicableDates, node, self._copyrightApplicableDates_fields)
 
         return copyrightApplicableDates
 
+    _licenseDocumentationIdentifier_fields = _optional_fields(
+        ('licenseDocumentationRole', 'text')
+    )
+
     def buildLicenseDocumentationIdentifier(self, node):
         licenseDocumentationIdentifierType = self._find(node, '{http://www.loc.gov/premis/v3}licenseDocumentationIdentifierType', req=True)
         licenseDocumentationIdentifierValue = self._find(node, '{http://www.loc.gov/premis/v3}licenseDocumentationIdentifierValue', req=True)
 
         licenseDocumentationIdentifier = LicenseDocumentationIdentifier(licenseDocumentationIdentifierType, licenseDocumentationIdentifierValue)
 
-        licenseDocumentationRole = self._find(node, '{http://www.loc.gov/premis/v3}licenseDocumentationRole')
-        if licenseDocumentationRole:
-            licenseDocumentationIdentifier.set_licenseDocumentationRole(licenseDocumentationRole)
+        self._set_optional_fields(licenseDocumentationIdentifier, node, self._licenseDocumentationIdentifier_fields)
 
         return licenseDocumentationIdentifier
 
+    _licenseApplicableDates_fields = _optional_fields(
+        ('startDate', 'text'),
+        ('endDate', 'text')
+    )
+
     def buildLicenseApplicableDates(self, node):
         licenseApplicableDates = LicenseApplicableDates()
 
-        startDate = self._find(node, '{http://www.loc.gov/premis/v3}startDate')
-        if startDate:
-            licenseApplicableDates.set_startDate(startDate)
-
-        endDate = self._find(node, '{http://www.loc.gov/premis/v3}endDate')
-        if endDate:
-            licenseApplicableDates.set_endDate(endDate)
+        self._set_optional_fields(licenseApplicableDates, node, self._licenseApplicableDates_fields)
 
         return licenseApplicableDates
 
+    _statuteDocumentationIdentifier_fields = _optional_fields(
+        ('statuteDocumentationRole', 'text')
+    )
+
     def buildStatuteDocumentationIdentifier(self, node):
         statuteDocumentationIdentifierType = self._find(node, '{http://www.loc.gov/premis/v3}statuteDocumentationIdentifierType', req=True)
         statuteDocumentationIdentifierValue = self._find(node, '{http://www.loc.gov/premis/v3}statuteDocumentationIdentifierValue', req=True)
 
         statuteDocumentationIdentifier = StatuteDocumentationIdentifier(statuteDocumentationIdentifierType, statuteDocumentationIdentifierValue)
 
-        statuteDocumentationRole = self._find(node, '{http://www.loc.gov/premis/v3}statuteDocumentationRole')
-        if statuteDocumentationRole:
-            statuteDocumentationIdentifier.set_statuteDocumentationRole(statuteDocumentationRole)
+        self._set_optional_fields(statuteDocumentationIdentifier, node, self._statuteDocumentationIdentifier_fields)
 
         return statuteDocumentationIdentifier
 
+    _statuteApplicableDates_fields = _optional_fields(
+        ('startDate', 'text'),
+        ('endDate', 'text')
+    )
+
     def buildStatuteApplicableDates(self, node):
         statuteApplicableDates = StatuteApplicableDates()
 
-        startDate = self._find(node, '{http://www.loc.gov/premis/v3}startDate')
-        if startDate:
-            statuteApplicableDates.set_startDate(startDate)
-
-        endDate = self._find(node, '{http://www.loc.gov/premis/v3}endDate')
-        if endDate:
-            statuteApplicableDates.set_endDate(endDate)
+        self._set_optional_fields(statuteApplicableDates, node, self._statuteApplicableDates_fields)
 
         return statuteApplicableDates
 
+    _otherRightsDocumentationIdentifier_fields = _optional_fields(
+        ('otherRightsDocumentationRole', 'text')
+    )
+
     def buildOtherRightsDocumentationIdentifier(self, node):
         otherRightsDocumentationIdentifierType = self._find(node, '{http://www.loc.gov/premis/v3}otherRightsDocumentationIdentifierType', req=True)
         otherRightsDocumentationIdentifierValue = self._find(node, '{http://www.loc.gov/premis/v3}otherRightsDocumentationIdentifierValue', req=True)
 
         otherRightsDocumentationIdentifier = OtherRightsDocumentationIdentifier(otherRightsDocumentationIdentifierType, otherRightsDocumentationIdentifierValue)
 
-        otherRightsDocumentationRole = self._find(node, '{http://www.loc.gov/premis/v3}otherRightsDocumentationRole')
-        if otherRightsDocumentationRole:
-            otherRightsDocumentationIdentifier.set_otherRightsDocumentationRole(otherRightsDocumentationRole)
+        self._set_optional_fields(otherRightsDocumentationIdentifier, node, self._otherRightsDocumentationIdentifier_fields)
 
         return otherRightsDocumentationIdentifier
 
+    _otherRightsApplicableDates_fields = _optional_fields(
+        ('startDate', 'text'),
+        ('endDate', 'text')
+    )
+
     def buildOtherRightsApplicableDates(self, node):
         otherRightsApplicableDates = OtherRightsApplicableDates()
 
-        startDate = self._find(node, '{http://www.loc.gov/premis/v3}startDate')
-        if startDate:
-            otherRightsApplicableDates.set_startDate(startDate)
-
-        endDate = self._find(node, '{http://www.loc.gov/premis/v3}endDate')
-        if endDate:
-            otherRightsApplicableDates.set_endDate(endDate)
+        self._set_optional_fields(otherRightsApplicableDates, node, self._otherRightsApplicableDates_fields)
 
         return otherRightsApplicableDates
 
+    _termOfGrant_fields = _optional_fields(
+        ('endDate', 'text')
+    )
+
     def buildTermOfGrant(self, node):
         startDate = self._find(node, '{http://www.loc.gov/premis/v3}startDate')
 
         termOfGrant = TermOfGrant(startDate)
 
-        endDate = self._find(node, '{http://www.loc.gov/premis/v3}endDate')
-        if endDate:
-            termOfGrant.set_endDate(endDate)
+        self._set_optional_fields(termOfGrant, node, self._termOfGrant_fields)
 
         return termOfGrant
 
+    _termOfRestriction_fields = _optional_fields(
+        ('endDate', 'text')
+    )
+
     def buildTermOfRestriction(self, node):
         startDate = self._find(node, '{http://www.loc.gov/premis/v3}startDate')
 
         termOfRestriction = TermOfRestriction(startDate)
 
-        endDate = self._find(node, '{http://www.loc.gov/premis/v3}endDate')
-        if endDate:
-            termOfRestriction.set_endDate(endDate)
+        self._set_optional_fields(termOfRestriction, node, self._termOfRestriction_fields)
 
         return termOfRestriction
 
 
+class StreamingXMLNodeFactory(XMLNodeFactory):
+    """
+    A class for ingesting an xml document incrementally and building
+    PremisNodes out of it.
+
+    The document is read with ElementTree.iterparse(). Each top level
+    object, event, agent, or rights element is built into a PremisNode as
+    soon as its closing tag is read and is then discarded, so peak memory
+    is bounded by the largest single entity rather than by the whole document.
+
+    __Attributes__
+
+    1. xmlfile: the path to (or a file object containing) a PREMIS xml
+    serialization.
+    """
+    def __init__(self, xmlfile, intern_strings=True, intern_table=None):
+        """
+        Initializes a streaming XML node factory and points it to a PREMIS
+        xml file. Nothing is read until nodes are requested.
+
+        __Args__
+
+        1. xmlfile: the path to a PREMIS xml serialization on disk, or a
+        file object opened in binary mode. A seekable file object is rewound
+        to where it was positioned here each time the document is read, any
+        other file object can only be read through once.
+
+        __KWArgs__
+
+        * see XMLNodeFactory.__init__()
+        """
+        ET.register_namespace('premis', "http://www.loc.gov/premis/v3")
+        ET.register_namespace('xsi', "http://www.w3.org/2001/XMLSchema-instance")
+        self.intern_table = _intern_table_for(intern_strings, intern_table)
+        self.xmlfile = xmlfile
+        # Where to rewind a file object to, and if it has been read
+        self._start = None
+        self._consumed = False
+        if hasattr(xmlfile, 'read') and xmlfile.seekable():
+            self._start = xmlfile.tell()
+
+    def __iter__(self):
+        """
+        Yields every top level node in the document, in document order.
+
+        __Returns__
+
+        * (generator): a generator of Object, Event, Agent and Rights
+        PremisNodes
+        """
+        return self.iter_nodes()
+
+    def iter_nodes(self, tags=None):
+        """
+        Reads the document a single time, yielding a built PremisNode as each
+        top level entity element closes.
+
+        __KWArgs__
+
+        * tags (iterable): the qualified tag names of the entities to build.
+        If not provided objects, events, agents and rights are all built.
+
+        __Returns__
+
+        * (generator): a generator of built PremisNodes
+        """
+        if tags is None:
+            tags = self.entity_builders
+        builders = {x: getattr(self, self.entity_builders[x]) for x in tags}
+        if hasattr(self.xmlfile, 'read'):
+            if self._start is not None:
+                self.xmlfile.seek(self._start)
+            elif self._consumed:
+                raise ValueError("The file object has already been read " +
+                                 "through, and isn't seekable.")
+            self._consumed = True
+        root = None
+        depth = 0
+        for event, elem in ET.iterparse(self.xmlfile, events=('start', 'end')):
+            if event == 'start':
+                if root is None:
+                    root = elem
+                depth += 1
+                continue
+            depth -= 1
+            if depth != 1:
+                continue
+            builder = builders.get(elem.tag)
+            if builder is not None:
+                yield builder(elem)
+            # Drop the finished subtree so the root never accumulates
+            # children.
+            elem.clear()
+            root.remove(elem)
+
+    def find_objects(self):
+        """
+        finds all of the objects in an xml record and builds Object PremisNodes
+        from them. Each call reads the document again.
+
+        __Returns__
+
+        * (generator): a generator of built PremisNode.Objects
+        """
+        return self.iter_nodes(tags=['{http://www.loc.gov/premis/v3}object'])
+
+    def find_agents(self):
+        """
+        finds all of the agents in an xml record and builds Agent PremisNodes
+        from them. Each call reads the document again.
+
+        __Returns__
+
+        * (generator): a generator of built PremisNode.Agents
+        """
+        return self.iter_nodes(tags=['{http://www.loc.gov/premis/v3}agent'])
+
+    def find_events(self):
+        """
+        finds all of the events in an xml record and builds Event PremisNodes
+        from them. Each call reads the document again.
+
+        __Returns__
+
+        * (generator): a generator of built PremisNode.Events
+        """
+        return self.iter_nodes(tags=['{http://www.loc.gov/premis/v3}event'])
+
+    def find_rights(self):
+        """
+        finds all of the rights in an xml record and builds Rights PremisNodes
+        from them. Each call reads the document again.
+
+        __Returns__
+
+        * (generator): a generator of built PremisNode.Rights
+        """
+        return self.iter_nodes(tags=['{http://www.loc.gov/premis/v3}rights'])
+
+
 class LinkingXIdentifierFactory(metaclass=ABCMeta):
 
     _input_node = None
     _output_node_type = None
+    # Describe the nodes a factory links to, for produce_linking_nodes():
+    # their class, the field holding their identifier and its type and value
+    # fields, and the field of the linking node which holds roles, if any.
+    _input_node_type = None
+    _identifier_fields = None
+    _role_field = None
 
     @abstractmethod
     def __init__(self, input_node):
@@ -1215,11 +1360,90 @@ class LinkingXIdentifierFactory(metaclass=ABCMeta):
             self.set_output_node_role(linking_node, role)
         return linking_node
 
+    @classmethod
+    def produce_linking_nodes(cls, input_nodes, role=None, target=None):
+        """
+        Produces a linking node for each of many input nodes, without
+        instantiating a factory for each. The class and identifier of each
+        input node are read directly, and the linking nodes are built
+        without running their setters.
+
+        __Args__
+
+        1. input_nodes (iterable): the nodes to link to, as would be passed
+        to the factory's __init__
+
+        __KWArgs__
+
+        * role (str or list): the role(s) given to every linking node
+        * target (PremisNode): a node, eg. an Event or Agent, to add the
+        linking nodes to, in a single change
+
+        __Returns__
+
+        * (list): the linking nodes, in the order of the input nodes
+        """
+        outputType = cls._output_node_type
+        inputType = cls._input_node_type
+        if outputType is None or inputType is None:
+            raise NotImplementedError(
+                "{} doesn't support producing linking nodes in bulk.".format(cls.__name__)
+            )
+        name = outputType.__name__[0].lower() + outputType.__name__[1:]
+        if target is not None and not hasattr(target, 'add_' + name):
+            raise ValueError(
+                "{} can't hold a {}.".format(type(target).__name__, name)
+            )
+        roles = None
+        if role is not None:
+            if cls._role_field is None:
+                raise NotImplementedError(
+                    "You can not set a role for a {}".format(name)
+                )
+            roles = role if isinstance(role, list) else [role]
+            for x in roles:
+                if not isinstance(x, str):
+                    raise TypeError("{} is not a str".format(str(x)))
+        identifierField, typeField, valueField = cls._identifier_fields
+        positions = outputType._field_positions
+        width = len(outputType.field_order)
+        typePosition = positions[name + 'Type']
+        valuePosition = positions[name + 'Value']
+        rolePosition = positions.get(cls._role_field)
+        build = outputType._from_values
+        result = []
+        for node in input_nodes:
+            if not isinstance(node, inputType):
+                raise ValueError(
+                    "{} is not a {}.".format(str(type(node)), inputType.__name__)
+                )
+            identifier = node._field_value(identifierField)
+            if isinstance(identifier, list):
+                identifier = identifier[0] if identifier else None
+            if identifier is None:
+                raise KeyError(identifierField)
+            values = [None] * width
+            values[typePosition] = identifier._field_value(typeField)
+            values[valuePosition] = identifier._field_value(valueField)
+            if values[typePosition] is None or values[valuePosition] is None:
+                raise KeyError(typeField if values[typePosition] is None else valueField)
+            if roles is not None:
+                values[rolePosition] = list(roles)
+            result.append(build(name, values, parent=target))
+        if target is not None and result:
+            target._extend_field(name, result)
+        return result
+
     input_node = property(get_input_node, set_input_node)
     output_node_type = property(get_output_node_type, set_output_node_type)
 
 
 class LinkingObjectIdentifierFactory(LinkingXIdentifierFactory):
+    _output_node_type = LinkingObjectIdentifier
+    _input_node_type = Object
+    _identifier_fields = ('objectIdentifier', 'objectIdentifierType', 'objectIdentifierValue')
+    _role_field = 'linkingObjectRole'
+
     def __init__(self, input_node):
         super().__init__(input_node)
         self.set_output_node_type(LinkingObjectIdentifier)
@@ -1242,6 +1466,11 @@ class LinkingObjectIdentifierFactory(LinkingXIdentifierFactory):
 
 
 class LinkingAgentIdentifierFactory(LinkingXIdentifierFactory):
+    _output_node_type = LinkingAgentIdentifier
+    _input_node_type = Agent
+    _identifier_fields = ('agentIdentifier', 'agentIdentifierType', 'agentIdentifierValue')
+    _role_field = 'linkingAgentRole'
+
     def __init__(self, input_node):
         super().__init__(input_node)
         self.set_output_node_type(LinkingAgentIdentifier)
@@ -1264,6 +1493,10 @@ class LinkingAgentIdentifierFactory(LinkingXIdentifierFactory):
 
 
 class LinkingEventIdentifierFactory(LinkingXIdentifierFactory):
+    _output_node_type = LinkingEventIdentifier
+    _input_node_type = Event
+    _identifier_fields = ('eventIdentifier', 'eventIdentifierType', 'eventIdentifierValue')
+
     def __init__(self, input_node):
         super().__init__(input_node)
         self.set_output_node_type(LinkingEventIdentifier)
@@ -1290,6 +1523,11 @@ class LinkingRightsStatementIdentifierFactory(LinkingXIdentifierFactory):
     # rightsStatement instead of just a rights entity.
     # I complained about incongruities like this on the PREMIS Implementors
     # Group mailing list - I guess we'll see if anything comes of it.
+    _output_node_type = LinkingRightsStatementIdentifier
+    _input_node_type = RightsStatement
+    _identifier_fields = ('rightsStatementIdentifier', 'rightsStatementIdentifierType',
+                          'rightsStatementIdentifierValue')
+
     def __init__(self, input_node):
         super().__init__(input_node)
         self.set_output_node_type(LinkingRightsStatementIdentifier)
@@ -1315,6 +1553,11 @@ class LinkingRightsStatementIdentifierFactory(LinkingXIdentifierFactory):
 
 
 class LinkingEnvironmentIdentifierFactory(LinkingXIdentifierFactory):
+    _output_node_type = LinkingEnvironmentIdentifier
+    _input_node_type = Object
+    _identifier_fields = ('objectIdentifier', 'objectIdentifierType', 'objectIdentifierValue')
+    _role_field = 'linkingEnvironmentRole'
+
     def __init__(self, input_node):
         super().__init__(input_node)
         self.set_output_node_type(LinkingEnvironmentIdentifier)
@@ -0,0 +1,609 @@
+from pypremis.nodes import *
+
+
+"""
+### Indexes over the entities held in a PremisRecord ###
+
+1. **IdentifierIndex** is a hash index from (identifierType, identifierValue)
+pairs to the entities in a list of Object, Event, Agent or Rights nodes,
+used by PremisRecord to look entities up by identifier in constant time.
+2. The ***_identifiers()** functions extract the identifier pairs of a single
+entity, either from a built PremisNode or from its unbuilt xml element.
+3. **LinkIndex** is a graph of the linking identifiers between the entities
+of a record, indexed in both directions, used by PremisRecord to find the
+entities linked to an entity, links which don't resolve, and orphaned
+entities.
+4. **entity_links()** extracts the linking identifiers of a single entity,
+built or unbuilt.
+5. **field_values()** and **field_value()** read a field of a node, or an
+empty list or None if it isn't set.
+"""
+
+
+def field_values(node, key):
+    """
+    Returns a field from a node, or an empty list if the field isn't set,
+    rather than raising a KeyError as the node's getters do. Like them, it
+    returns the node's own value, not a copy, so a list returned for a
+    repeatable field mustn't be changed.
+
+    __Args__
+
+    1. node (PremisNode): the node to read
+    2. key (str): the name of the field
+
+    __Returns__
+
+    * the value of the field, or an empty list
+    """
+    value = node._field_value(key)
+    return [] if value is None else value
+
+
+def field_value(node, key):
+    """
+    Returns a single valued field from a node, or None if the field isn't
+    set, eg. an eventType or a messageDigest.
+
+    __Args__
+
+    1. node (PremisNode): the node to read
+    2. key (str): the name of the field
+
+    __Returns__
+
+    * the value of the field, or None
+    """
+    return node._field_value(key)
+
+
+def _element_pairs(element, path, typeTag, valueTag):
+    """
+    Returns (type, value) pairs from the identifier elements found at [path]
+    in an unbuilt ElementTree Element.
+    """
+    premis = '{http://www.loc.gov/premis/v3}'
+    return [(x.findtext(premis+typeTag), x.findtext(premis+valueTag))
+            for x in element.iterfind(path)]
+
+
+def object_identifiers(obj):
+    """
+    Returns every (objectIdentifierType, objectIdentifierValue) pair of an
+    Object node.
+
+    __Args__
+
+    1. obj (Object or ET.Element): the object, built or unbuilt
+
+    __Returns__
+
+    * (list): a list of (type, value) tuples
+    """
+    if not isinstance(obj, PremisNode):
+        return _element_pairs(obj, '{http://www.loc.gov/premis/v3}objectIdentifier',
+                              'objectIdentifierType', 'objectIdentifierValue')
+    return [(x.get_objectIdentifierType(), x.get_objectIdentifierValue())
+            for x in field_values(obj, 'objectIdentifier')]
+
+
+def event_identifiers(event):
+    """
+    Returns the (eventIdentifierType, eventIdentifierValue) pair of an Event
+    node as a one item list.
+
+    __Args__
+
+    1. event (Event or ET.Element): the event, built or unbuilt
+
+    __Returns__
+
+    * (list): a list of (type, value) tuples
+    """
+    if not isinstance(event, PremisNode):
+        return _element_pairs(event, '{http://www.loc.gov/premis/v3}eventIdentifier',
+                              'eventIdentifierType', 'eventIdentifierValue')
+    x = event.get_eventIdentifier()
+    return [(x.get_eventIdentifierType(), x.get_eventIdentifierValue())]
+
+
+def agent_identifiers(agent):
+    """
+    Returns every (agentIdentifierType, agentIdentifierValue) pair of an
+    Agent node.
+
+    __Args__
+
+    1. agent (Agent or ET.Element): the agent, built or unbuilt
+
+    __Returns__
+
+    * (list): a list of (type, value) tuples
+    """
+    if not isinstance(agent, PremisNode):
+        return _element_pairs(agent, '{http://www.loc.gov/premis/v3}agentIdentifier',
+                              'agentIdentifierType', 'agentIdentifierValue')
+    return [(x.get_agentIdentifierType(), x.get_agentIdentifierValue())
+            for x in field_values(agent, 'agentIdentifier')]
+
+
+def rights_identifiers(rights):
+    """
+    Returns the (rightsStatementIdentifierType, rightsStatementIdentifierValue)
+    pair of every rightsStatement in a Rights node. Rights entities which
+    only contain rightsExtensions have no identifiers.
+
+    __Args__
+
+    1. rights (Rights or ET.Element): the rights, built or unbuilt
+
+    __Returns__
+
+    * (list): a list of (type, value) tuples
+    """
+    if not isinstance(rights, PremisNode):
+        return _element_pairs(rights,
+                              '{http://www.loc.gov/premis/v3}rightsStatement/'
+                              '{http://www.loc.gov/premis/v3}rightsStatementIdentifier',
+                              'rightsStatementIdentifierType',
+                              'rightsStatementIdentifierValue')
+    result = []
+    for x in field_values(rights, 'rightsStatement'):
+        identifier = x.get_rightsStatementIdentifier()
+        result.append((identifier.get_rightsStatementIdentifierType(),
+                       identifier.get_rightsStatementIdentifierValue()))
+    return result
+
+
+class IdentifierIndex(object):
+    """
+    A hash index over a list of entity nodes, keyed by identifier.
+
+    The index maps keys to positions in the list rather than to the nodes
+    themselves, so entries of a LazyNodeList can be indexed from their xml
+    without being built. Entries appended to the list are indexed the next
+    time the index is used, and every hit is checked against the node it
+    points at, so the index rebuilds itself if the list is reordered or
+    shrunk underneath it.
+
+    __Attributes__
+
+    1. nodes: the list (or LazyNodeList) being indexed
+    2. key_func: a function returning the (type, value) pairs of an entry
+    """
+    def __init__(self, nodes, key_func):
+        """
+        Initializes and builds an index
+
+        __Args__
+
+        1. nodes (list): see the nodes attribute
+        2. key_func (func): see the key_func attribute
+        """
+        self.nodes = nodes
+        self.key_func = key_func
+        self.reindex()
+
+    def _raw(self, index):
+        try:
+            return self.nodes.get_items()[index]
+        except AttributeError:
+            return self.nodes[index]
+
+    def _index(self, position, entry):
+        for key in self.key_func(entry):
+            self._by_key.setdefault(key, position)
+            self._by_value.setdefault(key[1], position)
+
+    def _catch_up(self):
+        length = len(self.nodes)
+        if length < self._indexed:
+            self.reindex()
+            return
+        for position in range(self._indexed, length):
+            self._index(position, self._raw(position))
+        self._indexed = length
+
+    def reindex(self):
+        """
+        Discards the index and rebuilds it from the current list contents.
+        Call this after changing the identifiers of nodes already in the list.
+        """
+        self._by_key = {}
+        self._by_value = {}
+        self._indexed = 0
+        self._catch_up()
+
+    def add(self, node):
+        """
+        Indexes a node which has just been appended to the list.
+
+        __Args__
+
+        1. node (PremisNode): the appended node
+        """
+        if self._indexed == len(self.nodes) - 1:
+            self._index(self._indexed, node)
+            self._indexed += 1
+        else:
+            self._catch_up()
+
+    def get(self, identifierValue, identifierType=None):
+        """
+        Returns the first entity with the given identifier.
+
+        __Args__
+
+        1. identifierValue (str): the identifier value to look up
+
+        __KWArgs__
+
+        * identifierType (str): the identifier type. If not provided any
+        entity with the given identifierValue matches.
+
+        __Returns__
+
+        * (PremisNode or None): the matching node, or None
+        """
+        self._catch_up()
+        for attempt in range(2):
+            if identifierType is None:
+                position = self._by_value.get(identifierValue)
+            else:
+                position = self._by_key.get((identifierType, identifierValue))
+            if position is None:
+                return None
+            node = self.nodes[position]
+            for key in self.key_func(node):
+                if key[1] == identifierValue and \
+                        (identifierType is None or key[0] == identifierType):
+                    return node
+            self.reindex()
+        return None
+
+
+# The linking identifier nodes, the kind of entity each refers to, and the
+# fields holding the identifier type and value.
+LINKING_IDENTIFIERS = {
+    LinkingObjectIdentifier: ('object', 'linkingObjectIdentifierType',
+                              'linkingObjectIdentifierValue'),
+    LinkingEventIdentifier: ('event', 'linkingEventIdentifierType',
+                             'linkingEventIdentifierValue'),
+    LinkingAgentIdentifier: ('agent', 'linkingAgentIdentifierType',
+                             'linkingAgentIdentifierValue'),
+    LinkingRightsStatementIdentifier: ('rights', 'linkingRightsStatementIdentifierType',
+                                       'linkingRightsStatementIdentifierValue')
+}
+
+_PREMIS = '{http://www.loc.gov/premis/v3}'
+
+
+_LINK_FIELDS = {}
+
+
+def _link_fields(cls):
+    """
+    Returns the fields of a node class which hold linking identifiers, or
+    nodes which (at any depth) hold linking identifiers, as (key, link)
+    tuples, where link is the LINKING_IDENTIFIERS entry of a linking
+    identifier field and None for other fields. Fields hold the node class
+    named after them, see pypremis.validation. Extension content isn't
+    searched.
+    """
+    fields = _LINK_FIELDS.get(cls)
+    if fields is None:
+        _LINK_FIELDS[cls] = ()
+        fields = []
+        for key in cls.field_order:
+            fieldType = globals().get(key[0].upper() + key[1:])
+            if not (isinstance(fieldType, type) and issubclass(fieldType, PremisNode)) or \
+                    issubclass(fieldType, (ExtendedNode, ExtensionNode)):
+                continue
+            if fieldType in LINKING_IDENTIFIERS:
+                fields.append((key, LINKING_IDENTIFIERS[fieldType]))
+            elif _link_fields(fieldType):
+                fields.append((key, None))
+        fields = _LINK_FIELDS[cls] = tuple(fields)
+    return fields
+
+
+def _link_tags(classes):
+    # The qualified tags of the linking identifiers, and of the elements
+    # which contain them, in the entities' xml.
+    links = {}
+    containers = set()
+    pending = list(classes)
+    while pending:
+        for key, link in _link_fields(pending.pop()):
+            if link is None:
+                containers.add(_PREMIS+key)
+                pending.append(globals()[key[0].upper() + key[1:]])
+            else:
+                links[_PREMIS+key] = (link[0], _PREMIS+link[1], _PREMIS+link[2])
+    return links, containers
+
+
+_LINKING_TAGS, _LINK_CONTAINER_TAGS = _link_tags([Object, Event, Agent, Rights])
+
+
+def _collect_links(node, result):
+    for key, link in _link_fields(type(node)):
+        value = field_values(node, key)
+        for x in value if isinstance(value, list) else (value,):
+            if link is None:
+                _collect_links(x, result)
+            else:
+                result.append((link[0], field_value(x, link[1]), field_value(x, link[2])))
+
+
+def _collect_element_links(element, result):
+    for x in element:
+        link = _LINKING_TAGS.get(x.tag)
+        if link is not None:
+            result.append((link[0], x.findtext(link[1]), x.findtext(link[2])))
+        elif x.tag in _LINK_CONTAINER_TAGS:
+            _collect_element_links(x, result)
+
+
+def entity_links(entity):
+    """
+    Returns the linking identifiers anywhere in an entity, eg. the
+    linkingObjectIdentifiers of an Event or of the rightsStatements in a
+    Rights, outside of extensions.
+
+    __Args__
+
+    1. entity (PremisNode or ET.Element): the entity, built or unbuilt
+
+    __Returns__
+
+    * (list): a list of (kind, type, value) tuples, where kind is the kind
+    of entity linked to: 'object', 'event', 'agent' or 'rights'
+    """
+    result = []
+    if isinstance(entity, PremisNode):
+        _collect_links(entity, result)
+    else:
+        _collect_element_links(entity, result)
+    return result
+
+
+class LinkIndex(object):
+    """
+    A graph of the links between the entities of a record, indexed in both
+    directions.
+
+    Each entity's linking identifiers (see entity_links()) are its outgoing
+    links. The index maps each entity identifier to the entities it
+    identifies, and each linked (kind, type, value) key to the entities
+    linking to it, so resolving links, finding the entities linking to an
+    entity, and reporting dangling links and orphaned entities are lookups
+    rather than nested scans of the record.
+
+    Like IdentifierIndex, the index refers to entities by their position in
+    their list, so unbuilt LazyNodeList entries are indexed from their xml,
+    and entries appended to the lists are indexed the next time the index is
+    used. Every entity a lookup returns is checked against the identifiers
+    it was indexed with, so the index rebuilds itself if a list is reordered
+    or shrunk underneath it. Call .reindex() after changing the links or
+    identifiers of entities which are already indexed.
+
+    __Attributes__
+
+    1. nodes: a dict of the lists (or LazyNodeLists) indexed, keyed by kind:
+    'object', 'event', 'agent' and 'rights'
+    """
+    key_funcs = {
+        'object': object_identifiers,
+        'event': event_identifiers,
+        'agent': agent_identifiers,
+        'rights': rights_identifiers
+    }
+
+    def __init__(self, nodes):
+        """
+        Initializes and builds an index
+
+        __Args__
+
+        1. nodes (dict): see the nodes attribute
+        """
+        self.nodes = nodes
+        self.reindex()
+
+    def _raw(self, kind, position):
+        try:
+            return self.nodes[kind].get_items()[position]
+        except AttributeError:
+            return self.nodes[kind][position]
+
+    def _index(self, kind, position, entry):
+        keys = self.key_funcs[kind](entry)
+        self._keys[kind].append(keys)
+        for identifierType, identifierValue in keys:
+            self._targets.setdefault((kind, identifierType, identifierValue), []).append(position)
+            self._targets.setdefault((kind, None, identifierValue), []).append(position)
+        links = entity_links(entry)
+        self._links[kind].append(links)
+        for link in links:
+            self._sources.setdefault(link, []).append((kind, position))
+            self._sources.setdefault((link[0], None, link[2]), []).append((kind, position))
+
+    def _catch_up(self):
+        for kind, nodes in self.nodes.items():
+            if len(nodes) < len(self._links[kind]):
+                self.reindex()
+                return
+        for kind, nodes in self.nodes.items():
+            for position in range(len(self._links[kind]), len(nodes)):
+                self._index(kind, position, self._raw(kind, position))
+
+    def reindex(self):
+        """
+        Discards the index and rebuilds it from the current list contents.
+        """
+        # (kind, type, value) -> positions of the entities with that
+        # identifier. A None type matches any.
+        self._targets = {}
+        # (kind, type, value) -> (kind, position) of each entity linking to
+        # that identifier. A None type matches any.
+        self._sources = {}
+        # kind -> the outgoing links of each entity, by position
+        self._links = {x: [] for x in self.nodes}
+        # kind -> the identifiers of each entity when it was indexed, by
+        # position
+        self._keys = {x: [] for x in self.nodes}
+        self._catch_up()
+
+    def _current(self, entries):
+        # Whether each (kind, position) still holds the entity indexed there.
+        return all(self.key_funcs[kind](self._raw(kind, position)) == self._keys[kind][position]
+                   for kind, position in entries)
+
+    def _positions(self, kind, identifierValue, identifierType):
+        # The positions of the entities with an identifier, reindexing first
+        # if any of them has moved.
+        self._catch_up()
+        key = (kind, identifierType, identifierValue)
+        positions = self._targets.get(key, [])
+        if not self._current((kind, x) for x in positions):
+            self.reindex()
+            positions = self._targets.get(key, [])
+        return positions
+
+    def _catch_up_all(self):
+        # Brings the index up to date and checks every entry, for the
+        # methods which report on the whole record.
+        self._catch_up()
+        if not self._current((kind, position) for kind, links in self._links.items()
+                             for position in range(len(links))):
+            self.reindex()
+
+    def add(self, kind, node):
+        """
+        Indexes an entity which has just been appended to one of the lists.
+
+        __Args__
+
+        1. kind (str): the kind of entity
+        2. node (PremisNode): the appended node
+        """
+        if len(self._links[kind]) == len(self.nodes[kind]) - 1:
+            self._index(kind, len(self._links[kind]), node)
+        else:
+            self._catch_up()
+
+    def _unique(self, pairs):
+        seen = set()
+        return [x for x in pairs if not (x in seen or seen.add(x))]
+
+    def resolve(self, kind, identifierValue, identifierType=None):
+        """
+        Returns the entities an identifier refers to.
+
+        __Args__
+
+        1. kind (str): the kind of entity
+        2. identifierValue (str): the identifier value
+
+        __KWArgs__
+
+        * identifierType (str): the identifier type. If not provided any
+        entity with the given identifierValue matches.
+
+        __Returns__
+
+        * (list): the matching entities, usually one
+        """
+        return [self.nodes[kind][x] for x in
+                self._positions(kind, identifierValue, identifierType)]
+
+    def get_links(self, kind, identifierValue, identifierType=None):
+        """
+        Returns the outgoing links of an entity.
+
+        __Args__
+
+        1. kind (str): the kind of entity
+        2. identifierValue (str): the entity's identifier value
+
+        __KWArgs__
+
+        * identifierType (str): the entity's identifier type
+
+        __Returns__
+
+        * (list): (kind, type, value) tuples, see entity_links()
+        """
+        result = []
+        for position in self._positions(kind, identifierValue, identifierType):
+            result.extend(self._links[kind][position])
+        return result
+
+    def get_linking_entities(self, kind, identifierValue, identifierType=None):
+        """
+        Returns the entities which link to an entity, eg. the events linked
+        to an object, through any of the entity's identifiers.
+
+        __Args__
+
+        1. kind (str): the kind of entity linked to
+        2. identifierValue (str): its identifier value
+
+        __KWArgs__
+
+        * identifierType (str): its identifier type
+
+        __Returns__
+
+        * (list): (kind, node) tuples of the linking entities
+        """
+        for attempt in range(2):
+            sources = []
+            for position in self._positions(kind, identifierValue, identifierType):
+                for key in self._keys[kind][position]:
+                    sources.extend(self._sources.get((kind,) + key, []))
+            sources = self._unique(sources)
+            if self._current(sources):
+                break
+            self.reindex()
+        return [(x, self.nodes[x][position]) for x, position in sources]
+
+    def dangling_links(self):
+        """
+        Returns every link which doesn't resolve to an entity in the record.
+
+        __Returns__
+
+        * (list): (kind, node, link) tuples of the linking entity and the
+        (kind, type, value) link which doesn't resolve
+        """
+        self._catch_up_all()
+        result = []
+        for kind, links in self._links.items():
+            for position, entityLinks in enumerate(links):
+                for link in entityLinks:
+                    if link not in self._targets:
+                        result.append((kind, self.nodes[kind][position], link))
+        return result
+
+    def orphans(self):
+        """
+        Returns every entity which neither links to another entity in the
+        record, nor is linked to by one.
+
+        __Returns__
+
+        * (list): (kind, node) tuples of the orphaned entities
+        """
+        self._catch_up_all()
+        result = []
+        for kind, links in self._links.items():
+            for position, entityLinks in enumerate(links):
+                if any(x in self._targets for x in entityLinks):
+                    continue
+                keys = self._keys[kind][position]
+                if any((kind,) + x in self._sources for x in keys):
+                    continue
+                result.append((kind, self.nodes[kind][position]))
+        return result
@@ -0,0 +1,248 @@
+import os
+import xml.etree.ElementTree as ET
+
+from pypremis.factories import XMLNodeFactory
+from pypremis.lib import PremisRecord, _standalone_xml, \
+    _unregister_premis_namespaces
+from pypremis.nodes import Event
+
+
+"""
+### Appending events to premis xml files on disk ###
+
+1. **EventJournal** logs new events for an existing premis xml file in a
+sidecar journal file, without reading or rewriting the record, and folds
+them back into the record with .compact().
+2. **splice_events()** writes events directly into an existing premis xml
+file, just before its closing tag.
+
+Both only ever write the new events, so logging an event costs time in the
+size of the event rather than the size of the record. The premis xml file
+must use an ascii compatible encoding, eg. the UTF-8 .write_to_file()
+writes by default.
+"""
+
+
+_TAIL_SIZE = 4096
+
+
+def _event_fragment(event):
+    """
+    Serializes an event as a standalone element, encoded as ascii so it can
+    be written into a file in any ascii compatible encoding.
+    """
+    if not isinstance(event, Event):
+        raise TypeError("Only Event nodes can be appended to a record.")
+    return (_standalone_xml(event) + '\n').encode('us-ascii', 'xmlcharrefreplace')
+
+
+def _splice(filepath, data):
+    """
+    Writes [data] into a premis xml file just before the closing tag of its
+    root element, reading and rewriting only the end of the file.
+    """
+    with open(filepath, 'r+b') as f:
+        f.seek(0, os.SEEK_END)
+        start = max(0, f.tell() - _TAIL_SIZE)
+        f.seek(start)
+        tail = f.read().rstrip()
+        if tail.endswith(b'/>'):
+            # An empty record: the root element is self-closing.
+            i = tail.rfind(b'<')
+            name = tail[i+1:-2].split(None, 1)[0] if i >= 0 else b''
+            offset = start + len(tail) - 2
+            closing = b'>\n' + data + b'</' + name + b'>\n'
+        else:
+            i = tail.rfind(b'</')
+            name = tail[i+2:-1].strip() if i >= 0 and tail.endswith(b'>') else b''
+            offset = start + i
+            closing = data + tail[i:] + b'\n'
+        if name.split(b':')[-1] != b'premis':
+            raise ValueError("{} doesn't end with the closing tag of a premis "
+                             "record.".format(filepath))
+        f.seek(offset)
+        f.write(closing)
+        f.truncate()
+
+
+def splice_events(filepath, events):
+    """
+    Adds events to a premis xml file on disk, by writing them just before
+    the closing tag of its root element. Nothing else in the file is read
+    or rewritten.
+
+    The events are written after every other entity in the record. pypremis
+    doesn't depend on the order of the entities when reading records.
+
+    __Args__
+
+    1. filepath (str): the path to the premis xml file
+    2. events (iterable): the Event nodes to add
+    """
+    data = b''.join(_event_fragment(x) for x in events)
+    if data:
+        _splice(filepath, data)
+
+
+class EventJournal(object):
+    """
+    An append-only log of new events for an existing premis xml file.
+
+    Events added to the journal are serialized to a sidecar file (by default
+    the record's path with .journal appended) as standalone premis:event
+    elements, one after the other, so adding an event never reads or
+    rewrites the record. .compact() later splices every journaled event into
+    the record and clears the journal.
+
+    __Attributes__
+
+    1. filepath is the location of the premis xml file on disk
+    2. journalpath is the location of its journal on disk
+    """
+    def __init__(self, filepath, journalpath=None):
+        """
+        Initializes a journal for a premis xml file. The journal file is
+        created when the first event is added.
+
+        __Args__
+
+        1. filepath (str): the path to an existing premis xml file
+
+        __KWArgs__
+
+        * journalpath (str): the path to the journal file. Defaults to the
+        filepath with .journal appended.
+        """
+        self.filepath = filepath
+        self.journalpath = journalpath if journalpath is not None \
+            else filepath + '.journal'
+
+    def __len__(self):
+        return len(self.get_event_list())
+
+    def get_filepath(self):
+        """
+        Returns the path to the premis xml file.
+
+        __Returns__
+
+        * (str): the path
+        """
+        return self.filepath
+
+    def get_journalpath(self):
+        """
+        Returns the path to the journal file.
+
+        __Returns__
+
+        * (str): the path
+        """
+        return self.journalpath
+
+    def add_event(self, event, sync=False):
+        """
+        Appends an event to the journal.
+
+        __Args__
+
+        1. event (Event): the event to log
+
+        __KWArgs__
+
+        * sync (bool): if True the journal is flushed to disk with fsync
+        before returning
+        """
+        self.add_events([event], sync=sync)
+
+    def add_events(self, events, sync=False):
+        """
+        Appends events to the journal, in a single write.
+
+        __Args__
+
+        1. events (iterable): the Event nodes to log
+
+        __KWArgs__
+
+        * sync (bool): if True the journal is flushed to disk with fsync
+        before returning
+        """
+        data = b''.join(_event_fragment(x) for x in events)
+        if not data:
+            return
+        with open(self.journalpath, 'ab') as f:
+            f.write(data)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _read(self):
+        try:
+            with open(self.journalpath, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return b''
+
+    def get_event_list(self):
+        """
+        Reads the events logged in the journal which haven't been compacted
+        into the record yet.
+
+        __Returns__
+
+        * (list): the journaled Event nodes, in the order they were added
+        """
+        data = self._read()
+        if not data.strip():
+            return []
+        root = ET.fromstring(b'<journal>' + data + b'</journal>')
+        factory = XMLNodeFactory(None)
+        events = [factory.buildEvent(x) for x in root]
+        _unregister_premis_namespaces()
+        return events
+
+    def to_record(self, lazy=False):
+        """
+        Reads the record along with its journaled events, without changing
+        either file.
+
+        __KWArgs__
+
+        * lazy (bool): see PremisRecord
+
+        __Returns__
+
+        * (PremisRecord): the record, with the journaled events added
+        """
+        record = PremisRecord(frompath=self.filepath, lazy=lazy)
+        for event in self.get_event_list():
+            record.add_event(event)
+        return record
+
+    def compact(self):
+        """
+        Folds the journal into the record: every journaled event is spliced
+        into the premis xml file before its closing tag, and the journal is
+        removed. Only the end of the record is rewritten.
+
+        The record is synced to disk before the journal is removed, so an
+        interruption can't lose events, though one between the two steps
+        leaves the events in both files.
+
+        __Returns__
+
+        * (int): the number of events compacted into the record
+        """
+        data = self._read()
+        if not data.strip():
+            if os.path.exists(self.journalpath):
+                os.remove(self.journalpath)
+            return 0
+        # Fail before touching the record if the journal doesn't parse.
+        count = len(ET.fromstring(b'<journal>' + data + b'</journal>'))
+        _splice(self.filepath, data)
+        with open(self.filepath, 'rb') as f:
+            os.fsync(f.fileno())
+        os.remove(self.journalpath)
+        return count
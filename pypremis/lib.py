@@ -1,6 +1,18 @@
+import io
+import json
+import os
 import xml.etree.ElementTree as ET
+from collections import deque
+from collections.abc import MutableSequence, Sequence
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import chain, islice
 from pypremis.factories import XMLNodeFactory
+from pypremis.indexes import IdentifierIndex, LinkIndex, entity_links, \
+    object_identifiers, event_identifiers, agent_identifiers, rights_identifiers, \
+    field_values
 from pypremis.nodes import *
+from pypremis.nodes import _unordered_equal, _escape_xml_attribute
+from pypremis.validation import validate_record
 
 
 """
@@ -8,9 +20,196 @@ from pypremis.nodes import *
 
 1. **PremisRecord** is a containing class meant to hold a list of sorted nodes
 and facilitate writing them to reading and writing serializations.
+2. **LazyNodeList** is a list-like container which holds unbuilt xml elements
+and only builds each PremisNode the first time it is accessed.
+3. **load_records()** parses many premis xml files in parallel across a
+pool of processes.
 """
 
 
+def _unregister_premis_namespaces():
+    # This fixes a weird bug where the premis xmlns was being written twice
+    # in the attributes of the root tag when calling .write_to_file() in
+    # cases where extension nodes contain children that are PremisNodes
+    ET.register_namespace('premis', "")
+    ET.register_namespace('xsi', "")
+
+
+class _ChunkedWriter(object):
+    """
+    Collects the many small strs produced by PremisNode.writeXML() and
+    writes them on to a file object in large chunks.
+    """
+    def __init__(self, fileobj, chunksize=1 << 16):
+        self.fileobj = fileobj
+        self.chunksize = chunksize
+        self._pieces = []
+        self._size = 0
+
+    def write(self, text):
+        self._pieces.append(text)
+        self._size += len(text)
+        if self._size >= self.chunksize:
+            self.flush()
+
+    def flush(self):
+        self.fileobj.write(''.join(self._pieces))
+        self._pieces = []
+        self._size = 0
+
+
+def _standalone_xml(node):
+    """
+    Serializes a node as a standalone element, which declares every
+    namespace it uses, so it can be parsed on its own or placed inside any
+    premis record.
+    """
+    qnames, namespaces = xml_qnames([node])
+    declarations = ''
+    for uri, prefix in sorted(namespaces.items(), key=lambda x: x[1]):
+        declarations += ' xmlns{}="{}"'.format(':'+prefix if prefix else '',
+                                               _escape_xml_attribute(uri))
+    declarations += ' xmlns:premis="http://www.loc.gov/premis/v3"' + \
+        ' xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"'
+    result = io.StringIO()
+    node.writeXML(result.write, qnames)
+    fragment = result.getvalue()
+    tag = '<' + node._xml_tag()
+    return tag + declarations + fragment[len(tag):]
+
+
+class _LazyXMLSource(object):
+    """
+    Parses a premis xml file the first time any of its entity lists is
+    needed and hands out the unbuilt top level elements, grouped by tag,
+    along with the factory method which builds them.
+    """
+    def __init__(self, filepath, factory=XMLNodeFactory):
+        self.filepath = filepath
+        self.factory = factory
+        self._elements = None
+        self._factory = None
+
+    def load(self, tag):
+        if self._elements is None:
+            self._factory = self.factory(self.filepath)
+            root = self._factory.xml
+            self._elements = {x: [] for x in self._factory.entity_builders}
+            for child in root:
+                if child.tag in self._elements:
+                    self._elements[child.tag].append(child)
+            # The lists now hold the only references to the entity elements,
+            # so each one can be freed as soon as it has been built.
+            root.clear()
+            _unregister_premis_namespaces()
+        return (self._elements.pop(tag, []),
+                getattr(self._factory, self._factory.entity_builders[tag]))
+
+
+class LazyNodeList(MutableSequence):
+    """
+    A list of PremisNodes which defers both parsing and node construction.
+
+    The backing xml is not read until the list is first used, and each
+    entry is only built into a PremisNode the first time it is indexed or
+    iterated over. Built nodes replace their elements, so every entry is
+    built at most once.
+
+    __Attributes__
+
+    1. loader: a callable returning a tuple of a list of ElementTree Elements
+    and a function which builds a PremisNode from one of them.
+    """
+    def __init__(self, loader, items=None):
+        """
+        Initializes a LazyNodeList
+
+        __Args__
+
+        1. loader (callable): see the loader attribute
+
+        __KWArgs__
+
+        * items (list): already built PremisNodes to place in front of the
+        lazily built entries
+        """
+        self.loader = loader
+        self._items = None
+        self._builder = None
+        self._head = list(items) if items else []
+
+    def _load(self):
+        if self._items is None:
+            elements, self._builder = self.loader()
+            self._items = self._head + elements
+            self._head = None
+        return self._items
+
+    def _build(self, index):
+        items = self._load()
+        x = items[index]
+        if not isinstance(x, PremisNode):
+            x = self._builder(x)
+            items[index] = x
+        return x
+
+    def get_items(self):
+        """
+        Returns the backing list, loading it if required. Entries which
+        haven't been accessed yet are still unbuilt ElementTree Elements.
+
+        __Returns__
+
+        * (list): a list of PremisNodes and ET.Elements
+        """
+        return self._load()
+
+    def is_loaded(self):
+        """
+        Returns whether or not the backing xml has been read yet.
+
+        __Returns__
+
+        * (bool): A bool denoting whether or not the list has been loaded
+        """
+        return self._items is not None
+
+    def __len__(self):
+        return len(self._load())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._build(i) for i in range(*index.indices(len(self)))]
+        return self._build(index)
+
+    def __setitem__(self, index, value):
+        self._load()[index] = value
+
+    def __delitem__(self, index):
+        del self._load()[index]
+
+    def insert(self, index, value):
+        self._load().insert(index, value)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._build(i)
+
+    def __eq__(self, other):
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        return list(other) + list(self)
+
+    def __repr__(self):
+        return repr(list(self))
+
+
 class PremisRecord(object):
     """
     A class for holding PremisNode objects. Facilitates reading and writing
@@ -24,10 +223,18 @@ class PremisRecord(object):
     4. rights_list is a list of instances of rights nodes
     5. filepath is a string which correlates to the location on disk
     of a premis.xml file.
+    6. cache_xml is a bool. If True, the xml text of each entity is kept
+    when the record is written, and written again as is until the entity is
+    changed, so writing the record repeatedly after small changes only
+    reserializes the changed entities. This costs about as much memory as
+    the written document.
     """
+    # A default for records pickled before cache_xml existed.
+    cache_xml = False
+
     def __init__(self,
                  objects=None, events=None, agents=None, rights=None,
-                 frompath=None):
+                 frompath=None, lazy=False, cache_xml=False):
         """
         Initializes a PremisRecord object from either a list of
         pre-existing nodes or an existing xml file on disk. Requires
@@ -41,6 +248,10 @@ class PremisRecord(object):
         * rights (list):  a list to initially populate rights_list
         * frompath (list): a string meant to set the location of an originating
         xml file
+        * lazy (bool): if True, and a frompath is supplied, the file isn't read
+        until one of the node lists is first used, and each node is only
+        built the first time it is accessed. See LazyNodeList.
+        * cache_xml (bool): see the cache_xml attribute
         """
 
         if (frompath and (objects or events or agents or rights)) \
@@ -54,10 +265,12 @@ class PremisRecord(object):
         self.agents_list = []
         self.rights_list = []
         self.filepath = None
+        self._indexes = {}
+        self.cache_xml = cache_xml
 
         if frompath:
             self.filepath = frompath
-            self.populate_from_file(XMLNodeFactory)
+            self.populate_from_file(XMLNodeFactory, lazy=lazy)
         else:
             if objects:
                 for x in objects:
@@ -80,14 +293,27 @@ class PremisRecord(object):
 
         * (generator): a generator of each node in the record
         """
-        for x in self.get_object_list() + self.get_event_list() + \
-                self.get_rights_list() + self.get_agent_list():
+        for x in chain(self.get_object_list(), self.get_event_list(),
+                       self.get_rights_list(), self.get_agent_list()):
             yield x
 
+    def __getstate__(self):
+        """
+        Returns the record's state for pickling, without its identifier
+        indexes, which are rebuilt on demand.
+        """
+        state = self.__dict__.copy()
+        state['_indexes'] = {}
+        return state
+
     def __eq__(self, other):
         """
         Computes equality between two PremisRecord objects.
 
+        Records are equal if they hold the same nodes, regardless of order.
+        The comparison buckets nodes by their cached hashes, so it runs in
+        linear time rather than comparing every pair of nodes.
+
         __Args__
 
         1. other: an object to compute equality with.
@@ -98,13 +324,7 @@ class PremisRecord(object):
         """
         if not isinstance(other, PremisRecord):
             return False
-        for x in self:
-            if x not in other:
-                return False
-        for x in other:
-            if x not in self:
-                return False
-        return True
+        return _unordered_equal(list(self), list(other))
 
     def add_event(self, event):
         """
@@ -115,8 +335,9 @@ class PremisRecord(object):
         1. event (PremisNode): an Event PremisNode instance.
         """
         self.events_list.append(event)
+        self._update_index('events_list', event)
 
-    def get_event(self, eventID):
+    def get_event(self, eventID, eventIDType=None):
         """
         Returns the event node with the corresponding eventID.
 
@@ -125,11 +346,18 @@ class PremisRecord(object):
         1. eventID (str): A string which corresponds to one of the
         eventIdentifierValue's specified in an Event PremisNode instance.
 
+        __KWArgs__
+
+        * eventIDType (str): A string which corresponds to the
+        eventIdentifierType. If not provided the first event with a matching
+        eventIdentifierValue is returned.
+
         __Returns__
 
         * (PremisNode or None): an event PremisNode, or None
         """
-        pass
+        return self._get_index('events_list', event_identifiers).get(
+            eventID, eventIDType)
 
     def get_event_list(self):
         """
@@ -150,8 +378,9 @@ class PremisRecord(object):
         1. obj (PremisNode): an Object PremisNode instance
         """
         self.objects_list.append(obj)
+        self._update_index('objects_list', obj)
 
-    def get_object(self, objID):
+    def get_object(self, objID, objIDType=None):
         """
         Returns the object node with the corresponding objectID
 
@@ -160,11 +389,18 @@ class PremisRecord(object):
         1. objID (str): A string which corresponds with one of the
         objectIdentifierValue's specified in an Object PremisNode instance
 
+        __KWArgs__
+
+        * objIDType (str): A string which corresponds to the
+        objectIdentifierType. If not provided the first object with a matching
+        objectIdentifierValue is returned.
+
         __Returns__
 
         * (PremisNode or None): an object PremisNode, or None
         """
-        pass
+        return self._get_index('objects_list', object_identifiers).get(
+            objID, objIDType)
 
     def get_object_list(self):
         """
@@ -185,8 +421,9 @@ class PremisRecord(object):
         1. agent (PremisNode): an Agent PremisNode instance
         """
         self.agents_list.append(agent)
+        self._update_index('agents_list', agent)
 
-    def get_agent(self, agentID):
+    def get_agent(self, agentID, agentIDType=None):
         """
         Returns the agent node with the corresponding agentID.
 
@@ -195,11 +432,18 @@ class PremisRecord(object):
         1. agentID (str): A string which corresponds with one of the
         agentIdentifierValue's specified in an Agent PremisNode instance
 
+        __KWArgs__
+
+        * agentIDType (str): A string which corresponds to the
+        agentIdentifierType. If not provided the first agent with a matching
+        agentIdentifierValue is returned.
+
         __Returns__
 
         * (PremisNode or None): an event PremisNode, or None
         """
-        pass
+        return self._get_index('agents_list', agent_identifiers).get(
+            agentID, agentIDType)
 
     def get_agent_list(self):
         """
@@ -220,21 +464,30 @@ class PremisRecord(object):
         1. rights (PremisNode): a Rights PremisNode instance
         """
         self.rights_list.append(rights)
+        self._update_index('rights_list', rights)
 
-    def get_rights(self, rightsID):
+    def get_rights(self, rightsID, rightsIDType=None):
         """
         Returns the rights node with the corresponding rightsID
 
         __Args__
 
         1. rightsID (str): A string which corresponds with one of the
-        rightsIdentifierValue's specified in a Rights PremisNode instance.
+        rightsStatementIdentifierValue's specified in one of the
+        rightsStatements of a Rights PremisNode instance.
+
+        __KWArgs__
+
+        * rightsIDType (str): A string which corresponds to the
+        rightsStatementIdentifierType. If not provided the first rights with
+        a matching rightsStatementIdentifierValue is returned.
 
         __Returns__
 
         * (PremisNode or None): a rights PremisNode, or None
         """
-        pass
+        return self._get_index('rights_list', rights_identifiers).get(
+            rightsID, rightsIDType)
 
     def get_rights_list(self):
         """
@@ -246,6 +499,164 @@ class PremisRecord(object):
         """
         return self.rights_list
 
+    def _get_index(self, listName, key_func):
+        """
+        Returns the IdentifierIndex for one of the node lists, building it
+        on first use or if the list attribute has been replaced.
+        """
+        index = self._indexes.get(listName)
+        nodes = getattr(self, listName)
+        if index is None or index.nodes is not nodes:
+            index = IdentifierIndex(nodes, key_func)
+            self._indexes[listName] = index
+        return index
+
+    def _update_index(self, listName, node):
+        """
+        Keeps already built indexes current as a node is added.
+        """
+        index = self._indexes.get(listName)
+        if index is not None and index.nodes is getattr(self, listName):
+            index.add(node)
+        links = self._indexes.get('links')
+        if links is not None and \
+                links.nodes[self._link_kinds[listName]] is getattr(self, listName):
+            links.add(self._link_kinds[listName], node)
+
+    # The kind of entity in each list, as a LinkIndex names them.
+    _link_kinds = {
+        'objects_list': 'object',
+        'events_list': 'event',
+        'agents_list': 'agent',
+        'rights_list': 'rights'
+    }
+
+    def get_link_index(self):
+        """
+        Returns the LinkIndex of the links between the record's entities,
+        building it on first use. Entities added to the record are indexed
+        as they are added.
+
+        __Returns__
+
+        * (LinkIndex): the index
+        """
+        index = self._indexes.get('links')
+        if index is None or any(index.nodes[kind] is not getattr(self, listName)
+                                for listName, kind in self._link_kinds.items()):
+            index = LinkIndex({kind: getattr(self, listName)
+                               for listName, kind in self._link_kinds.items()})
+            self._indexes['links'] = index
+        return index
+
+    def get_dangling_links(self):
+        """
+        Returns every linking identifier in the record which doesn't refer
+        to an entity in the record.
+
+        __Returns__
+
+        * (list): (kind, node, link) tuples, see LinkIndex.dangling_links()
+        """
+        return self.get_link_index().dangling_links()
+
+    def get_orphans(self):
+        """
+        Returns every entity in the record which isn't linked to or from any
+        other entity in the record.
+
+        __Returns__
+
+        * (list): (kind, node) tuples, see LinkIndex.orphans()
+        """
+        return self.get_link_index().orphans()
+
+    def get_provenance(self, objID, objIDType=None, follow_relationships=True,
+                       relationshipTypes=None):
+        """
+        Returns the provenance chain of an object: every event linked to it,
+        in eventDateTime order, along with the agents of each event.
+
+        Events are found through the link index, whether the event links to
+        the object or the object links to the event, so no list is scanned.
+        Related objects (the relatedObjectIdentifiers of the object's
+        relationships) are followed transitively, and their events included.
+
+        __Args__
+
+        1. objID (str): the object's objectIdentifierValue
+
+        __KWArgs__
+
+        * objIDType (str): the object's objectIdentifierType
+        * follow_relationships (bool): if True include the events of related
+        objects, transitively
+        * relationshipTypes (iterable): if given, only follow relationships
+        whose relationshipType is one of these, eg. ['derivation']
+
+        __Returns__
+
+        * (list): (event, agents, obj) tuples, where agents is a list of the
+        Agents the event links to and obj is the object (the given object or
+        a related one) the event is linked to. Events are ordered by
+        eventDateTime, which sorts correctly when the dates are written
+        consistently, eg. as ISO 8601 in one timezone.
+        """
+        index = self.get_link_index()
+        if relationshipTypes is not None:
+            relationshipTypes = set(relationshipTypes)
+        objects = index.resolve('object', objID, objIDType)[:1]
+        seen = set(id(x) for x in objects)
+        events = []
+        found = set()
+        for obj in objects:
+            identifiers = object_identifiers(obj)
+            if not identifiers:
+                continue
+            identifierType, identifierValue = identifiers[0]
+            linked = [x for kind, x in index.get_linking_entities(
+                'object', identifierValue, identifierType) if kind == 'event']
+            for kind, linkType, linkValue in index.get_links(
+                    'object', identifierValue, identifierType):
+                if kind == 'event':
+                    linked.extend(index.resolve('event', linkValue, linkType))
+            for event in linked:
+                if id(event) not in found:
+                    found.add(id(event))
+                    events.append((event, obj))
+            if not follow_relationships:
+                continue
+            for relationship in field_values(obj, 'relationship'):
+                if relationshipTypes is not None and \
+                        relationship.get_relationshipType() not in relationshipTypes:
+                    continue
+                for related in field_values(relationship, 'relatedObjectIdentifier'):
+                    for x in index.resolve('object', related.get_relatedObjectIdentifierValue(),
+                                           related.get_relatedObjectIdentifierType()):
+                        if id(x) not in seen:
+                            seen.add(id(x))
+                            objects.append(x)
+        result = []
+        for event, obj in events:
+            agents = []
+            for kind, linkType, linkValue in entity_links(event):
+                if kind == 'agent':
+                    agents.extend(x for x in index.resolve('agent', linkValue, linkType)
+                                  if not any(x is y for y in agents))
+            result.append((event, agents, obj))
+        result.sort(key=lambda x: x[0].get_eventDateTime())
+        return result
+
+    def reindex(self):
+        """
+        Rebuilds the identifier indexes used by .get_object(), .get_event(),
+        .get_agent() and .get_rights(), and the link index. Only required
+        after changing the identifiers or links of nodes which are already
+        in the record.
+        """
+        for index in self._indexes.values():
+            index.reindex()
+
     def set_filepath(self, filepath):
         """
         Sets the filepath attribute.
@@ -267,17 +678,39 @@ class PremisRecord(object):
         """
         return self.filepath
 
-    def validate(self):
+    def validate(self, check_links=True):
         """
         Validates the contained record against the PREMIS specification.
 
+        __KWArgs__
+
+        * check_links (bool): if True every linking identifier must refer to
+        an entity in the record. See pypremis.validation.validate_record().
+
         __Returns__
 
         * (bool): A bool denoting validity
         """
-        pass
+        return not self.get_validation_errors(check_links)
+
+    def get_validation_errors(self, check_links=True):
+        """
+        Validates the contained record against the PREMIS specification,
+        returning every problem found.
+
+        __KWArgs__
+
+        * check_links (bool): see .validate()
+
+        __Returns__
+
+        * (list): a list of pypremis.validation.ValidationErrors, empty if
+        the record is valid
+        """
+        return validate_record(self, check_links)
 
-    def populate_from_file(self, factory=XMLNodeFactory, filepath=None):
+    def populate_from_file(self, factory=XMLNodeFactory, filepath=None,
+                           lazy=False):
         """
         Populates the object, event, agent, and rights lists from an existing
         premis xml file
@@ -294,11 +727,26 @@ class PremisRecord(object):
         * filepath (str): A string which specifies the location of a serialization
         supported by the given factory class. If not provided the instances
         filepath attribute is assumed.
+        * lazy (bool): if True replace each list with a LazyNodeList, deferring
+        reading the file and building nodes until they are accessed. The
+        factory must provide the XMLNodeFactory .build* methods.
         """
         if filepath is None:
             if self.get_filepath() is None:
                 raise ValueError("No supplied filepath.")
             filepath = self.get_filepath()
+        if lazy:
+            source = _LazyXMLSource(filepath, factory)
+            premis = '{http://www.loc.gov/premis/v3}'
+            self.events_list = LazyNodeList(
+                lambda: source.load(premis+'event'), self.events_list)
+            self.agents_list = LazyNodeList(
+                lambda: source.load(premis+'agent'), self.agents_list)
+            self.rights_list = LazyNodeList(
+                lambda: source.load(premis+'rights'), self.rights_list)
+            self.objects_list = LazyNodeList(
+                lambda: source.load(premis+'object'), self.objects_list)
+            return
         factory = factory(filepath)
         for event in factory.find_events():
             self.add_event(event)
@@ -308,11 +756,7 @@ class PremisRecord(object):
             self.add_rights(rights)
         for obj in factory.find_objects():
             self.add_object(obj)
-        # This fixes a weird bug where the premis xmlns was being written twice
-        # in the attributes of the root tag when calling .write_to_file() in
-        # cases where extension nodes contain children that are PremisNodes
-        ET.register_namespace('premis', "")
-        ET.register_namespace('xsi', "")
+        _unregister_premis_namespaces()
 
     def write(self, targetpath, xml_declaration=True,
                       encoding="UTF-8", method='xml'):
@@ -343,12 +787,75 @@ class PremisRecord(object):
             root.append(entry.toXML())
         return tree
 
+    def write_xml(self, write, short_empty_elements=True):
+        """
+        Writes the record as an xml document (without a declaration) by
+        passing str chunks to [write]. Nodes are serialized directly with
+        PremisNode.writeXML(), so no ElementTree is ever built, and the
+        output is identical to serializing .to_tree() with ElementTree.
+
+        __Args__
+
+        1. write (func): a function accepting str, eg. a file's .write()
+
+        __KWArgs__
+
+        * short_empty_elements (bool): if True elements without content are
+        written as a single self-closing tag
+        """
+        qnames, namespaces = xml_qnames(self)
+        root = '<premis:premis'
+        for uri, prefix in sorted(namespaces.items(), key=lambda x: x[1]):
+            root += ' xmlns{}="{}"'.format(':'+prefix if prefix else '',
+                                           _escape_xml_attribute(uri))
+        root += ' xmlns:premis="http://www.loc.gov/premis/v3"' + \
+            ' xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"' + \
+            ' version="3.0"'
+        empty = True
+        for entry in self:
+            if empty:
+                write(root + '>')
+                empty = False
+            if self.cache_xml:
+                entry._write_cached_xml(write, qnames, short_empty_elements)
+            else:
+                entry.writeXML(write, qnames, short_empty_elements)
+        if not empty:
+            write('</premis:premis>')
+        elif short_empty_elements:
+            write(root + ' />')
+        else:
+            write(root + '></premis:premis>')
+
     def to_xml(self, encoding='UTF-8', method='xml',
                short_empty_elements=True):
-        tree = self.to_tree()
-        return ET.tostring(tree.getroot(), encoding=encoding,
-                           method=method,
-                           short_empty_elements=short_empty_elements)
+        """
+        Returns the record serialized as xml, as ET.tostring() would
+        serialize .to_tree().
+
+        __KWArgs__
+
+        * encoding (str): the encoding of the result, or 'unicode' for a str
+        * method (str): the ElementTree serialization method
+        * short_empty_elements (bool): if True elements without content are
+        written as a single self-closing tag
+
+        __Returns__
+
+        * (bytes or str): the serialized record
+        """
+        if method != 'xml':
+            tree = self.to_tree()
+            return ET.tostring(tree.getroot(), encoding=encoding,
+                               method=method,
+                               short_empty_elements=short_empty_elements)
+        result = io.StringIO()
+        if encoding.lower() not in ('unicode', 'utf-8', 'us-ascii'):
+            result.write("<?xml version='1.0' encoding='{}'?>\n".format(encoding))
+        self.write_xml(result.write, short_empty_elements)
+        if encoding.lower() == 'unicode':
+            return result.getvalue()
+        return result.getvalue().encode(encoding, 'xmlcharrefreplace')
 
     def write_to_file(self, targetpath, xml_declaration=True,
                       encoding="UTF-8", method='xml'):
@@ -356,13 +863,209 @@ class PremisRecord(object):
         Writes the contained premis data structure out to disk as the
         specified path as an xml document.
 
+        The document is streamed to disk in chunks as each node is
+        serialized, see .write_xml().
+
         __Args__
 
         1. targetpath (str): a str corresponding to the intended location on disk
-        to write the premis xml file to.
+        to write the premis xml file to, or a file object.
+        """
+        if hasattr(targetpath, 'write'):
+            if isinstance(targetpath, io.TextIOBase):
+                self._write_xml_file(targetpath, encoding)
+            else:
+                f = io.TextIOWrapper(targetpath, encoding=encoding,
+                                     errors='xmlcharrefreplace', newline='\n')
+                try:
+                    self._write_xml_file(f, encoding)
+                    f.flush()
+                finally:
+                    f.detach()
+            return
+        with open(targetpath, 'w', encoding=encoding,
+                  errors='xmlcharrefreplace', newline='\n') as f:
+            self._write_xml_file(f, encoding)
+
+    def _write_xml_file(self, f, encoding):
+        writer = _ChunkedWriter(f)
+        writer.write("<?xml version='1.0' encoding='{}'?>\n".format(encoding))
+        self.write_xml(writer.write)
+        writer.flush()
+
+    # The keys of the lists of entities in the record's JSON serialization.
+    json_keys = (('objects', 'get_object_list'), ('events', 'get_event_list'),
+                 ('agents', 'get_agent_list'), ('rights', 'get_rights_list'))
+
+    def to_dict(self):
         """
-        tree = self.to_tree()
-        tree.write(targetpath,
-                   xml_declaration=True,
-                   encoding=encoding,
-                   method='xml')
+        Returns the record as a dict of JSON compatible values, with a list
+        of the dicts of each kind of entity. See PremisNode.to_dict()
+
+        __Returns__
+
+        * (dict): the record
+        """
+        return {key: [x.to_dict() for x in getattr(self, getter)()]
+                for key, getter in self.json_keys}
+
+    def write_json(self, write):
+        """
+        Writes the record as JSON by passing str chunks to [write], one
+        entity at a time, so the dict of the whole record is never built.
+        The output is identical to .to_json()
+
+        __Args__
+
+        1. write (func): a function accepting str, eg. a file's .write()
+        """
+        for i, (key, getter) in enumerate(self.json_keys):
+            write(('{' if i == 0 else '], ') + json.dumps(key) + ': [')
+            for j, x in enumerate(getattr(self, getter)()):
+                if j:
+                    write(', ')
+                write(json.dumps(x.to_dict()))
+        write(']}')
+
+    def to_json(self, **kwargs):
+        """
+        Returns the record serialized as JSON. See .to_dict()
+
+        __KWArgs__
+
+        * see json.dumps(). Without any, the record is serialized
+        with .write_json()
+
+        __Returns__
+
+        * (str): the serialized record
+        """
+        if kwargs:
+            return json.dumps(self.to_dict(), **kwargs)
+        result = io.StringIO()
+        writer = _ChunkedWriter(result)
+        self.write_json(writer.write)
+        writer.flush()
+        return result.getvalue()
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Builds a record from a dict returned by .to_dict()
+
+        __Args__
+
+        1. data (dict): the record
+
+        __Returns__
+
+        * (PremisRecord): the built record
+        """
+        if not isinstance(data, dict):
+            raise TypeError("{} is not a dict".format(str(data)))
+        for key in data:
+            if key not in ('objects', 'events', 'agents', 'rights'):
+                raise ValueError("{} is not a list of entities".format(key))
+        return cls(objects=[Object.from_dict(x) for x in data.get('objects', [])],
+                   events=[Event.from_dict(x) for x in data.get('events', [])],
+                   agents=[Agent.from_dict(x) for x in data.get('agents', [])],
+                   rights=[Rights.from_dict(x) for x in data.get('rights', [])])
+
+    @classmethod
+    def from_json(cls, text):
+        """
+        Builds a record from JSON written by .to_json()
+
+        __Args__
+
+        1. text (str or bytes): the serialized record
+
+        __Returns__
+
+        * (PremisRecord): the built record
+        """
+        return cls.from_dict(json.loads(text))
+
+
+def _load_chunk(paths, projection):
+    # Runs in a worker process: parses each file in a chunk of paths.
+    results = []
+    for path in paths:
+        record = PremisRecord(frompath=path)
+        results.append(record if projection is None else projection(record))
+    return results
+
+
+def load_records(paths, max_workers=None, chunksize=16, ordered=True,
+                 projection=None, executor=None):
+    """
+    Parses many premis xml files in parallel, across a pool of processes.
+
+    Paths are sent to the workers in chunks, so the cost of handing work to
+    a process is spread over many small files, and only a few chunks per
+    worker are in flight at a time, so arbitrarily long iterables of paths
+    can be consumed without holding every result in memory.
+
+    __Args__
+
+    1. paths (iterable): the paths of the premis xml files to parse
+
+    __KWArgs__
+
+    * max_workers (int): the number of worker processes. Defaults to the
+    number of processors on the machine. If an executor is given, it should
+    be the number of its workers, as it sets how many chunks are submitted
+    to it at a time.
+    * chunksize (int): the number of files parsed per task
+    * ordered (bool): if True results are yielded in the order of [paths],
+    otherwise as soon as each chunk is complete
+    * projection (func): a picklable (module level) function, called in the
+    worker with each PremisRecord, whose return value is sent back in place
+    of the record. Use it to return a summary rather than whole records.
+    * executor (concurrent.futures.Executor): an existing executor to submit
+    the work to, rather than starting a new ProcessPoolExecutor
+
+    __Returns__
+
+    * (generator): a generator of (path, result) tuples, where result is a
+    PremisRecord or the return value of projection
+    """
+    if not isinstance(chunksize, int) or chunksize < 1:
+        raise ValueError("chunksize must be a positive integer")
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+    # Keep a couple of chunks queued per worker, so workers never wait on
+    # the consumer, without submitting the whole iterable up front.
+    window = 2 * max_workers
+    paths = iter(paths)
+    pending = deque()
+
+    def submit():
+        chunk = list(islice(paths, chunksize))
+        if not chunk:
+            return False
+        pending.append((chunk, executor.submit(_load_chunk, chunk, projection)))
+        return True
+
+    try:
+        while len(pending) < window and submit():
+            pass
+        while pending:
+            if ordered:
+                chunk, future = pending.popleft()
+            else:
+                wait([x[1] for x in pending], return_when=FIRST_COMPLETED)
+                chunk, future = next(x for x in pending if x[1].done())
+                pending.remove((chunk, future))
+            results = future.result()
+            submit()
+            for item in zip(chunk, results):
+                yield item
+    finally:
+        for chunk, future in pending:
+            future.cancel()
+        if own_executor:
+            executor.shutdown(wait=True)
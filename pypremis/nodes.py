@@ -1,5 +1,13 @@
+import hashlib
+import inspect
+import json
+import mmap
+import weakref
 import xml.etree.ElementTree as ET
 from collections import OrderedDict
+from collections.abc import MutableMapping
+from copy import deepcopy
+from itertools import chain
 
 
 """
@@ -18,6 +26,17 @@ uncontrolled nodes used in specific places to extend the PREMIS data model.
 for their contained nodes which inherit from either PremisNode or
 ExtendedNode as appropriate. There __init__'s represent the stated requirements
 of the PREMIS data model.
+5. ** compute_fixity() ** computes digests of a file with several algorithms
+in a single read, returning them as Fixity nodes.
+6. ** InternTable ** is a bounded table of shared str values, which the
+factories intern parsed values through, as do node setters while one is
+set with set_intern_table().
+7. ** FieldList ** is the list getters return a repeatable field's values
+in, which keeps the node's caches current when it is changed in place.
+
+Every node can be converted to and from JSON with .to_json() and
+.from_json(), or to and from a dict of JSON compatible values with
+.to_dict() and .from_dict().
 """
 
 
@@ -33,8 +52,38 @@ class PremisNode(object):
     value. Value's may be strings or PremisNode instances where nesting occurs.
     3. name: The name of the specific type of PremisNode being implemented
     by the instance.
+
+    Nodes are compact: they have no instance __dict__, and field values are
+    kept in a list with one slot per field_order position, rather than in a
+    dictionary. Fields outside field_order (set with override) are kept in a
+    separate dict, created only when one is set. The fields attribute is a
+    live mapping over this storage, iterating in field_order order followed
+    by any other fields in the order they were set. Subclasses should define
+    __slots__ = () to stay compact.
+
+    Nodes are hashable. The hash is computed from the node's contents and
+    cached, and the cache is cleared whenever the node, or any node nested
+    inside it, is changed, whether through its setters or in place through
+    a list returned by a getter (a FieldList). Changing a node while it is
+    being used as a set member or dictionary key isn't supported.
+
+    Nodes also cache their last serialization: the Element returned by
+    toXML(), or the xml text of a record's entity (see
+    PremisRecord.cache_xml). It is cleared along with the hash, so
+    serializing again after a change only rebuilds the changed node and the
+    nodes containing it.
     """
+    __slots__ = ('name', '_values', '_extra', '_hash', '_xml', '_parents', '__weakref__')
     field_order = []
+    _field_positions = {}
+
+    def __init_subclass__(cls, **kwargs):
+        # Precompute each class' map of field_order keys to their positions,
+        # which index the slots the node's field values are kept in.
+        super().__init_subclass__(**kwargs)
+        cls._field_positions = {}
+        for i, key in enumerate(cls.field_order):
+            cls._field_positions.setdefault(key, i)
 
     def __init__(self, nodeName):
         """
@@ -46,10 +95,135 @@ class PremisNode(object):
         1. nodeName (str): a string which corresponds to the intended value
         of the name attribute.
         """
-
-        self._set_fields(OrderedDict())
+        self._hash = None
+        self._xml = None
+        self._parents = None
+        self._values = [None] * len(self.field_order)
+        self._extra = None
         self._set_name(nodeName)
 
+    @classmethod
+    def _from_values(cls, name, values, extra=None, parent=None):
+        """
+        Builds a node of the class directly from its field slots, without
+        running __init__ or any setters, for code which builds many nodes
+        from values it has already checked (unpickling, binary loading, bulk
+        linking node production).
+
+        __Args__
+
+        1. name (str): the node's name
+        2. values (list): the node's values, one per field_order position,
+        None where a field isn't set. The node keeps the list. Nodes in it
+        aren't adopted.
+
+        __KWArgs__
+
+        * extra (dict): fields outside field_order, or None
+        * parent (PremisNode): the node the new node is a field value of
+
+        __Returns__
+
+        * (PremisNode): the new node
+        """
+        node = cls.__new__(cls)
+        node._hash = None
+        node._xml = None
+        node._parents = None if parent is None else weakref.ref(parent)
+        node.name = name
+        node._values = values
+        node._extra = extra
+        return node
+
+    def _to_values(self):
+        """
+        Returns the node's name and field slots, as _from_values() takes
+        them. The lists returned are the node's own, and mustn't be changed.
+
+        __Returns__
+
+        * (tuple): the name, the list of values in field_order positions
+        and the dict of fields outside field_order (or None)
+        """
+        return self.name, self._values, self._extra
+
+    def __getstate__(self):
+        """
+        Returns the instance's state, without its caches or the
+        (unpicklable) weak references to parent nodes. Nodes are pickled
+        with __reduce__() and copied with __copy__() and __deepcopy__().
+        """
+        return {'name': self.name, '_values': self._values, '_extra': self._extra}
+
+    def __setstate__(self, state):
+        """
+        Restores a pickled or copied instance, re-registering it as the
+        parent of the nodes it contains.
+        """
+        self._hash = None
+        self._xml = None
+        self._parents = None
+        self.name = state['name']
+        if 'fields' in state:
+            # Pickled before nodes stored their fields in slots
+            self._values = [None] * len(self.field_order)
+            self._extra = None
+            self._set_fields(state['fields'])
+            return
+        self._values = state['_values']
+        self._extra = state['_extra']
+        for key, value in self._field_items():
+            self._adopt(value)
+
+    def __reduce__(self):
+        """
+        Pickles the instance as a call to _rebuild_node() with its class,
+        name and field values, which is much more compact than its state
+        dict and rebuilds it without running any setters. Older pickles are
+        still restored through __setstate__().
+        """
+        name, values, extra = self._to_values()
+        if extra is None:
+            return (_rebuild_node, (self.__class__, name, values))
+        return (_rebuild_node, (self.__class__, name, values, extra))
+
+    def __copy__(self):
+        """
+        Returns a shallow copy of the instance: a new node holding the same
+        values, with its own lists for repeatable fields so adding to one
+        node doesn't change the other.
+        """
+        result = self.__class__.__new__(self.__class__)
+        result._hash = self._hash
+        result._xml = None
+        result._parents = None
+        result.name = self.name
+        result._values = [list(x) if isinstance(x, list) else x for x in self._values]
+        result._extra = None if self._extra is None else \
+            {k: list(x) if isinstance(x, list) else x for k, x in self._extra.items()}
+        for key, value in result._field_items():
+            result._adopt(value)
+        return result
+
+    def __deepcopy__(self, memo):
+        """
+        Returns a deep copy of the instance. Its strs are shared, being
+        immutable, and nested nodes are copied directly rather than through
+        the copy module's generic dispatch. The copy keeps the instance's
+        cached hash, as its contents are equal.
+        """
+        result = self.__class__.__new__(self.__class__)
+        memo[id(self)] = result
+        result._hash = self._hash
+        result._xml = None
+        result._parents = None
+        result.name = self.name
+        result._values = [x if x is None or x.__class__ is str
+                          else _deepcopy_value(x, result, memo) for x in self._values]
+        result._extra = None if self._extra is None else \
+            {k: _deepcopy_value(x, result, memo) for k, x in self._extra.items()}
+        return result
+
     def __repr__(self):
         """
         Return an xml representation of the node object. This XML may
@@ -65,6 +239,11 @@ class PremisNode(object):
         """
         Recursively test equality to another PremisNode instance.
 
+        Nodes are equal if they have the same name and the same fields with
+        equal values. The order of entries in repeatable fields is not
+        significant. Nodes with different hashes are never equal, so most
+        unequal comparisons return without recursing.
+
         __Args__
 
         1. other (any): an object to test equality against.
@@ -73,27 +252,119 @@ class PremisNode(object):
 
         * (bool): a boolean denoting equality
         """
+        if self is other:
+            return True
         if not isinstance(other, PremisNode):
             return False
-        if len(self.fields) != len(other.fields):
+        if hash(self) != hash(other):
             return False
-        if set(self.fields) != set(other.fields):
+        if self.name != other.name:
             return False
-        for entry in self._get_fields():
-            if isinstance(self._get_fields()[entry], str):
-                if self._get_fields()[entry] != other._get_fields()[entry]:
-                    return False
-            elif isinstance(self._get_fields()[entry], PremisNode):
-                if self._get_fields()[entry] not in other._get_fields().values():
-                    return False
-            elif isinstance(self._get_fields()[entry], list):
-                for x in self._get_fields()[entry]:
-                    if x not in other._get_fields()[entry]:
-                        return False
-            else:
+        fields = self._field_items()
+        other_fields = dict(other._field_items())
+        if len(fields) != len(other_fields):
+            return False
+        for entry, value in fields:
+            if entry not in other_fields:
+                return False
+            other_value = other_fields[entry]
+            if not isinstance(value, (str, PremisNode, list)):
                 raise ValueError
+            if not _value_equal(value, other_value):
+                return False
         return True
 
+    def __hash__(self):
+        """
+        Returns a hash of the node's name and contents, consistent with
+        __eq__. The hash is cached until the node or one of its descendants
+        is changed.
+
+        __Returns__
+
+        * (int): the hash
+        """
+        if self._hash is None:
+            self._hash = hash((self.name, frozenset(
+                (key, _value_hash(value)) for key, value in self._field_items()
+            )))
+        return self._hash
+
+    def _adopt(self, value):
+        """
+        Registers the instance as a parent of any PremisNodes in [value], so
+        that changes to them clear the instance's cached hash.
+
+        __Args__
+
+        1. value (str or list or PremisNode): a field value
+        """
+        if isinstance(value, PremisNode):
+            value._add_parent(self)
+        elif isinstance(value, list):
+            for x in value:
+                self._adopt(x)
+
+    def _add_parent(self, parent):
+        """
+        Records a weak reference to a node which contains the instance.
+
+        A node with a single parent, the common case, holds a plain weak
+        reference to it. A node shared between several parents holds a
+        WeakValueDictionary of them keyed by id, so adding a parent takes
+        constant time however many the node already has.
+
+        __Args__
+
+        1. parent (PremisNode): the containing node
+        """
+        parents = self._parents
+        if parents is None:
+            self._parents = weakref.ref(parent)
+        elif isinstance(parents, weakref.WeakValueDictionary):
+            parents[id(parent)] = parent
+        else:
+            first = parents()
+            if first is None:
+                self._parents = weakref.ref(parent)
+            elif first is not parent:
+                parents = weakref.WeakValueDictionary()
+                parents[id(first)] = first
+                parents[id(parent)] = parent
+                self._parents = parents
+
+    def _get_parents(self):
+        """
+        Returns the nodes which contain the instance and are still alive.
+
+        __Returns__
+
+        * (list): a list of PremisNodes
+        """
+        parents = self._parents
+        if parents is None:
+            return []
+        if isinstance(parents, weakref.WeakValueDictionary):
+            return list(parents.values())
+        parent = parents()
+        return [] if parent is None else [parent]
+
+    def _invalidate(self):
+        """
+        Clears the cached hash and serialization of the instance and every
+        node containing it. A node's caches are only ever filled after those
+        of its children (a cached entity's xml text along with its hash), so
+        propagation can stop at any node without a cache.
+        """
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node._hash is None and node._xml is None:
+                continue
+            node._hash = None
+            node._xml = None
+            stack.extend(node._get_parents())
+
     def _notApplicable(self):
         """
         Raise a preformatted error when attempting to add an inapplicable
@@ -112,7 +383,12 @@ class PremisNode(object):
         """
         if not isinstance(fields, OrderedDict):
             raise TypeError
-        self.fields = fields
+        self._values = [None] * len(self.field_order)
+        self._extra = None
+        for key, value in fields.items():
+            self._store_field(key, value)
+            self._adopt(value)
+        self._invalidate()
 
     def _get_fields(self):
         """
@@ -120,9 +396,58 @@ class PremisNode(object):
 
         __Returns__
 
-        * (dict): the self.fields attribute
+        * (NodeFields): the self.fields attribute
+        """
+        return NodeFields(self)
+
+    fields = property(_get_fields, _set_fields)
+
+    def _store_field(self, key, value):
         """
-        return self.fields
+        puts a value in the slot for [key], without any checks.
+        """
+        position = self._field_positions.get(key)
+        if position is not None:
+            self._values[position] = value
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def _remove_field(self, key):
+        """
+        empties the slot for [key], raising a KeyError if it is empty.
+        """
+        position = self._field_positions.get(key)
+        if position is not None and self._values[position] is not None:
+            self._values[position] = None
+        elif self._extra is not None and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+        self._invalidate()
+
+    def _field_value(self, key):
+        """
+        returns the value in the slot for [key], or None if it is empty.
+        """
+        position = self._field_positions.get(key)
+        if position is not None:
+            return self._values[position]
+        if self._extra is not None:
+            return self._extra.get(key)
+        return None
+
+    def _field_items(self):
+        """
+        returns the node's (key, value) pairs, in field_order order followed
+        by any fields outside field_order in the order they were set.
+        """
+        order = self.field_order
+        result = [(order[i], x) for i, x in enumerate(self._values) if x is not None]
+        if self._extra:
+            result.extend(self._extra.items())
+        return result
 
     def _set_name(self, name):
         """
@@ -136,6 +461,7 @@ class PremisNode(object):
         if not isinstance(name, str):
             raise TypeError
         self.name = name
+        self._invalidate()
 
     def _set_field(self, key, value, override=False):
         """
@@ -160,17 +486,30 @@ class PremisNode(object):
                      isinstance(value, list))
         if not valueType:
             raise TypeError
-        if key not in self.field_order and not override:
+        if key not in self._field_positions and not override:
             raise ValueError("You have attempted to set a field ({})".format(key) +
                              "which is not documented in the PREMISv3 " +
                              "specification.\n To bypass this error pass " +
                              "the override flag to the setter.")
-        self.fields[key] = value
+        if value.__class__ is FieldList:
+            # Another node's list, see _get_field()
+            value = list(value)
+        if _intern_table is not None:
+            value = _intern_table.intern_value(value)
+        self._store_field(key, value)
+        if not isinstance(value, str):
+            self._adopt(value)
+        if self._hash is not None or self._xml is not None:
+            self._invalidate()
 
     def _get_field(self, key):
         """
         returns a field value from the internal dict data structure.
 
+        Repeatable fields are returned as a FieldList, which the field's
+        list is converted into the first time it is returned, so changes
+        made to it in place are seen by the node's caches.
+
         __Args__
 
         1. key (str): the key of the desired dictionary entry.
@@ -179,7 +518,13 @@ class PremisNode(object):
 
         * (list): A fields contents
         """
-        return self.fields[key]
+        value = self._field_value(key)
+        if value is None:
+            raise KeyError(key)
+        if value.__class__ is list:
+            value = FieldList(self, value)
+            self._store_field(key, value)
+        return value
 
     def _add_to_field(self, key, value, override=False):
         """
@@ -197,20 +542,47 @@ class PremisNode(object):
         * override: A boolean which allows setting/appending to fields not
         specified in the PREMIS data dictionary.
         """
-        if key not in self.fields:
-            if key not in self.field_order and not override:
+        values = self._field_value(key)
+        if values is None:
+            if key not in self._field_positions and not override:
                 raise ValueError("You have attempted to set a field ({})".format(key) +
                                  "which is not documented in the PREMISv3 " +
                                  "specification.\n To bypass this error pass " +
                                  "the override flag to the setter.")
-            self.fields[key] = []
-        if not isinstance(self.fields[key], list):
+            values = []
+            self._store_field(key, values)
+        if not isinstance(values, list):
             raise KeyError
         valueType = (isinstance(value, str) or isinstance(value, PremisNode) or
                      isinstance(value, list))
         if not valueType:
             raise TypeError
-        self.fields[key].append(value)
+        if _intern_table is not None:
+            value = _intern_table.intern_value(value)
+        list.append(values, value)
+        if not isinstance(value, str):
+            self._adopt(value)
+        if self._hash is not None or self._xml is not None:
+            self._invalidate()
+
+    def _extend_field(self, key, values):
+        """
+        Appends several values to a repeatable field in a single change,
+        without checking or adopting them: nodes among them must already
+        have the instance as their parent, eg. built by _from_values() with
+        it as their parent.
+
+        __Args__
+
+        1. key (str): the key of the field
+        2. values (list): the values to append
+        """
+        existing = self._field_value(key)
+        if existing is None:
+            self._store_field(key, list(values))
+        else:
+            list.extend(existing, values)
+        self._invalidate()
 
     def _listify(self, x):
         """
@@ -252,9 +624,9 @@ class PremisNode(object):
         a field at some key represented as a list.
         """
         if index is None:
-            return self.fields[key]
+            return self._get_field(key)
         else:
-            return self.fields[key][index]
+            return self._get_field(key)[index]
 
     def _type_check(self, x, type_it_should_be):
         """
@@ -289,40 +661,811 @@ class PremisNode(object):
         return an ElementTree.Element object which models the node as PREMIS
         xml.
 
+        The Element is cached, and returned again until the node or one of
+        its descendants is changed through its setters, when only the changed
+        nodes' Elements are rebuilt. It is shared, so copy it before changing
+        it.
+
         __Returns__
 
         * (ET.Element): an ElementTree Element which models the node.
         """
-        root = ET.Element('premis:'+self.name)
-        for key in self.field_order:
-            if key not in self.fields:
-                continue
-            values = [self.fields[x] for x in self.fields if x is key]
-            for value in values:
-                if isinstance(value, str):
-                    e = ET.Element('premis:'+key)
-                    e.text = value
-                    root.append(e)
-                elif isinstance(value, PremisNode):
-                    e = value.toXML()
-                    root.append(e)
-                elif isinstance(value, list):
-                    for x in value:
-                        if isinstance(x, str):
-                            e = ET.Element('premis:'+key)
-                            e.text = x
-                            root.append(e)
-                        elif isinstance(x, PremisNode):
-                            e = x.toXML()
-                            root.append(e)
-                        else:
-                            raise ValueError('{} is not a str or node'.format(str(x)))
-                else:
-                    raise ValueError
+        root = self._xml
+        if root.__class__ is not ET.Element:
+            root = self._build_xml()
+            self._xml = root
+        return root
+
+    def _build_xml(self):
+        """
+        return a new Element modelling the node. See toXML().
+        """
+        root = ET.Element(self._xml_tag())
+        self._append_xml_children(root)
         return root
 
+    def _append_xml_children(self, root):
+        """
+        Append an Element for each of the node's children to [root], in a
+        single pass over _xml_values(). See toXML().
+        """
+        for key, value in self._xml_values():
+            if isinstance(value, str):
+                e = ET.Element('premis:'+key)
+                e.text = value
+                root.append(e)
+            elif isinstance(value, PremisNode):
+                root.append(value.toXML())
+            elif isinstance(value, list):
+                for x in value:
+                    if isinstance(x, str):
+                        e = ET.Element('premis:'+key)
+                        e.text = x
+                        root.append(e)
+                    elif isinstance(x, PremisNode):
+                        root.append(x.toXML())
+                    else:
+                        raise ValueError('{} is not a str or node'.format(str(x)))
+            else:
+                raise ValueError
+
+    def _xml_tag(self):
+        """
+        return the tag the node is serialized as.
+        """
+        return 'premis:'+self.name
+
+    def _xml_values(self):
+        """
+        return the (key, value) pairs serialized as the node's children, in
+        serialization order. Fields which aren't in field_order aren't
+        serialized.
+        """
+        order = self.field_order
+        return [(order[i], x) for i, x in enumerate(self._values) if x is not None]
+
+    def _xml_is_empty(self):
+        """
+        return whether the node's element has no children.
+        """
+        for key, value in self._xml_values():
+            if value or not isinstance(value, list):
+                return False
+        return True
+
+    def _collect_xml_qnames(self, add):
+        """
+        Pass every tag which the node's children are serialized with to
+        [add], in document order. See xml_qnames().
+        """
+        for key, value in self._xml_values():
+            for x in value if isinstance(value, list) else [value]:
+                if isinstance(x, PremisNode):
+                    add(x._xml_tag())
+                    x._collect_xml_qnames(add)
+
+    def _write_xml_content(self, write, qnames, short_empty_elements):
+        """
+        Write the node's children as xml text. See writeXML().
+        """
+        for key, value in self._xml_values():
+            for x in value if isinstance(value, list) else [value]:
+                if isinstance(x, str):
+                    _write_xml_leaf(write, 'premis:'+key, x, short_empty_elements)
+                elif isinstance(x, PremisNode):
+                    x.writeXML(write, qnames, short_empty_elements)
+                else:
+                    raise ValueError('{} is not a str or node'.format(str(x)))
+
+    def writeXML(self, write, qnames=None, short_empty_elements=True):
+        """
+        Write the node as xml text, producing the same output ElementTree
+        would when serializing .toXML(), without building any Elements.
+
+        __Args__
+
+        1. write (func): a function accepting str, eg. a file's .write()
+
+        __KWArgs__
+
+        * qnames (dict): the serialized names of any namespace qualified
+        ({uri}local) tags in the node, as returned by xml_qnames()
+        * short_empty_elements (bool): if True elements without content are
+        written as a single self-closing tag
+        """
+        if qnames is None:
+            qnames = xml_qnames([self])[0]
+        _write_xml_element(write, self, qnames.get(self._xml_tag(), self._xml_tag()),
+                           '', qnames, short_empty_elements)
+
+    def _write_cached_xml(self, write, qnames, short_empty_elements=True):
+        """
+        Write the node as writeXML() does, reusing the text written last
+        time if neither the node nor the serialized names of its namespace
+        qualified tags have changed since. The node's hash is computed along
+        with the text, so that changes to any nested node clear it.
+
+        __Args__
+
+        1. write (func): a function accepting str
+        2. qnames (dict): see writeXML()
+
+        __KWArgs__
+
+        * short_empty_elements (bool): see writeXML()
+        """
+        cache = self._xml
+        if cache.__class__ is _XMLText and cache.short_empty_elements == short_empty_elements \
+                and all(qnames.get(tag) == qname for tag, qname in cache.qnames):
+            write(cache.text)
+            return
+        chunks = []
+        self.writeXML(chunks.append, qnames, short_empty_elements)
+        tags = []
+
+        def add(tag):
+            if tag[:1] == '{' and tag not in tags:
+                tags.append(tag)
+
+        add(self._xml_tag())
+        self._collect_xml_qnames(add)
+        hash(self)
+        cache = _XMLText(''.join(chunks), short_empty_elements,
+                         tuple((tag, qnames[tag]) for tag in tags))
+        self._xml = cache
+        write(cache.text)
+
+    def to_dict(self):
+        """
+        return the node as a dict of JSON compatible values: its fields, in
+        field_order, mapped to strs, dicts (for nested nodes) or lists (for
+        repeatable fields). Like toXML(), fields which aren't in field_order
+        are left out.
+
+        __Returns__
+
+        * (dict): the node's fields
+        """
+        order = self.field_order
+        return {order[i]: _json_value(x) for i, x in enumerate(self._values)
+                if x is not None}
+
+    def to_json(self, **kwargs):
+        """
+        return the node serialized as JSON. See to_dict().
+
+        __KWArgs__
+
+        * see json.dumps()
+
+        __Returns__
+
+        * (str): the serialized node
+        """
+        return json.dumps(self.to_dict(), **kwargs)
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        build a node from a dict returned by to_dict(), through the node
+        class' __init__ so the same checks apply as when building a node by
+        hand. Nested nodes' classes are the ones named after their fields.
+
+        Called on PremisNode itself, the dict must name the node's class
+        under an '@type' key.
+
+        __Args__
+
+        1. data (dict): the node's fields
+
+        __Returns__
+
+        * (PremisNode): the built node
+        """
+        if not isinstance(data, dict):
+            raise TypeError("{} is not a dict".format(str(data)))
+        if cls is PremisNode:
+            if '@type' not in data:
+                raise ValueError("The node's class must be given as @type.")
+            return _json_node_class(data['@type']).from_dict(data)
+        arguments = _json_arguments(cls)
+        kwargs = {}
+        for key, value in data.items():
+            if key == '@type':
+                continue
+            if key not in arguments:
+                raise ValueError("{} is not a field of {}".format(key, cls.__name__))
+            kwargs[arguments[key]] = _json_field_value(key, value)
+        return cls(**kwargs)
+
+    @classmethod
+    def from_json(cls, text):
+        """
+        build a node from JSON written by to_json(). See from_dict().
+
+        __Args__
+
+        1. text (str or bytes): the serialized node
+
+        __Returns__
+
+        * (PremisNode): the built node
+        """
+        return cls.from_dict(json.loads(text))
+
+
+def _escape_xml_text(text):
+    """
+    Escape character data the same way ElementTree does.
+    """
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    return text
+
+
+def _escape_xml_attribute(text):
+    """
+    Escape an attribute value the same way ElementTree does.
+    """
+    text = _escape_xml_text(text)
+    if "\"" in text:
+        text = text.replace("\"", "&quot;")
+    if "\r" in text:
+        text = text.replace("\r", "&#13;")
+    if "\n" in text:
+        text = text.replace("\n", "&#10;")
+    if "\t" in text:
+        text = text.replace("\t", "&#09;")
+    return text
+
+
+def _write_xml_leaf(write, tag, text, short_empty_elements):
+    """
+    Write an element containing only text.
+    """
+    if text or not short_empty_elements:
+        write('<'+tag+'>'+_escape_xml_text(text)+'</'+tag+'>')
+    else:
+        write('<'+tag+' />')
+
+
+def _write_xml_element(write, node, tag, attributes, qnames, short_empty_elements):
+    """
+    Write an element whose children are the serialized contents of [node].
+    """
+    if short_empty_elements and node._xml_is_empty():
+        write('<'+tag+attributes+' />')
+        return
+    write('<'+tag+attributes+'>')
+    node._write_xml_content(write, qnames, short_empty_elements)
+    write('</'+tag+'>')
+
+
+def xml_qnames(nodes):
+    """
+    Work out how namespace qualified ({uri}local) tags in a set of nodes will
+    be serialized, assigning prefixes exactly as ElementTree does: registered
+    prefixes where they exist, otherwise ns0, ns1... in document order.
+
+    Only extension content ever has qualified tags, typically from parsing
+    extensions which contain namespaced elements.
+
+    __Args__
+
+    1. nodes (iterable): the PremisNodes to be serialized, in order
+
+    __Returns__
+
+    * (tuple): a dict mapping qualified tags to their serialized names and
+    a dict mapping the namespace uris used to their prefixes
+    """
+    qnames = {}
+    namespaces = {}
+
+    def add(tag):
+        if tag[:1] != "{" or tag in qnames:
+            return
+        uri, local = tag[1:].rsplit("}", 1)
+        prefix = namespaces.get(uri)
+        if prefix is None:
+            prefix = ET._namespace_map.get(uri)
+            if prefix is None:
+                prefix = "ns%d" % len(namespaces)
+            if prefix != "xml":
+                namespaces[uri] = prefix
+        qnames[tag] = "%s:%s" % (prefix, local) if prefix else local
+
+    for node in nodes:
+        cache = node._xml
+        if cache.__class__ is _XMLText:
+            for tag, qname in cache.qnames:
+                add(tag)
+            continue
+        add(node._xml_tag())
+        node._collect_xml_qnames(add)
+    return qnames, namespaces
+
+
+class _XMLText(object):
+    """
+    A node's cached xml text, see PremisNode._write_cached_xml(). qnames are
+    the (tag, serialized name) pairs of the namespace qualified tags in the
+    node, in document order.
+    """
+    __slots__ = ('text', 'short_empty_elements', 'qnames')
+
+    def __init__(self, text, short_empty_elements, qnames):
+        self.text = text
+        self.short_empty_elements = short_empty_elements
+        self.qnames = qnames
+
+
+def _rebuild_node(cls, name, values, extra=None):
+    """
+    Rebuilds a node pickled by PremisNode.__reduce__()
+    """
+    node = cls._from_values(name, values, extra)
+    ref = weakref.ref(node)
+    for value in values if extra is None else chain(values, extra.values()):
+        if value is None or value.__class__ is str:
+            continue
+        for x in value if isinstance(value, list) else (value,):
+            if isinstance(x, PremisNode) and x._parents is None:
+                # The common case: a node only ever pickled inside this one.
+                x._parents = ref
+            elif x.__class__ is not str:
+                node._adopt(x)
+    return node
+
+
+def _deepcopy_value(value, parent, memo):
+    """
+    Deep copies a field value for PremisNode.__deepcopy__(), registering
+    [parent] as the parent of the copied nodes.
+    """
+    if value.__class__ is str:
+        return value
+    if isinstance(value, PremisNode):
+        copied = memo.get(id(value))
+        if copied is None:
+            copied = value.__deepcopy__(memo)
+        copied._add_parent(parent)
+        return copied
+    if isinstance(value, list):
+        return [_deepcopy_value(x, parent, memo) for x in value]
+    return deepcopy(value, memo)
+
+
+def _json_value(value):
+    """
+    Convert a field value to JSON compatible values. See PremisNode.to_dict()
+    """
+    if isinstance(value, str):
+        return value
+    if isinstance(value, PremisNode):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_json_value(x) for x in value]
+    raise ValueError('{} is not a str, node or list'.format(str(value)))
+
+
+def _json_extension_value(value):
+    """
+    Convert a value of extension content to JSON compatible values. Nested
+    PremisNodes, whose class can't be known from their field, name it under
+    an '@type' key.
+    """
+    if isinstance(value, str):
+        return value
+    if isinstance(value, ExtensionNode):
+        return value.to_dict()
+    if isinstance(value, PremisNode):
+        result = {'@type': type(value).__name__}
+        result.update(value.to_dict())
+        return result
+    if isinstance(value, list):
+        return [_json_extension_value(x) for x in value]
+    raise ValueError('{} is not a str, node or list'.format(str(value)))
+
+
+def _json_node_class(name):
+    """
+    return the node class with a name, from an '@type' key.
+    """
+    cls = globals().get(name)
+    if not (isinstance(cls, type) and issubclass(cls, PremisNode)) or cls is PremisNode:
+        raise ValueError("{} is not a PremisNode class".format(name))
+    return cls
+
+
+# The __init__ arguments whose names misspell the field they set.
+ARGUMENT_ALIASES = {'linkingEventIdentifierType': 'linkingEventIdentiferType'}
+
+
+_JSON_ARGUMENTS = {}
+
+
+def _json_arguments(cls):
+    """
+    return a dict mapping each field of a node class to the name of its
+    __init__ argument, which only differ where ARGUMENT_ALIASES says so.
+    """
+    arguments = _JSON_ARGUMENTS.get(cls)
+    if arguments is None:
+        parameters = list(inspect.signature(cls.__init__).parameters)[1:]
+        arguments = {}
+        for key in cls.field_order:
+            argument = ARGUMENT_ALIASES.get(key, key)
+            if argument in parameters:
+                arguments[key] = argument
+        _JSON_ARGUMENTS[cls] = arguments
+    return arguments
+
+
+def _json_field_value(key, value):
+    """
+    Convert a JSON field value back to a field value. dicts are built into
+    the node class named after the field.
+    """
+    if isinstance(value, str):
+        return value
+    if isinstance(value, list):
+        return [_json_field_value(key, x) for x in value]
+    if isinstance(value, dict):
+        cls = globals().get(key[0].upper() + key[1:])
+        if not (isinstance(cls, type) and issubclass(cls, PremisNode)):
+            raise ValueError("{} holds a str, not a node".format(key))
+        return cls.from_dict(value)
+    raise ValueError('{} is not a str, dict or list'.format(str(value)))
+
+
+def _json_extension_field_value(value):
+    """
+    Convert a JSON value of extension content back to a field value. dicts
+    are built into ExtensionNodes, unless they name a class as '@type'.
+    """
+    if isinstance(value, str):
+        return value
+    if isinstance(value, list):
+        return [_json_extension_field_value(x) for x in value]
+    if isinstance(value, dict):
+        if '@type' in value:
+            return _json_node_class(value['@type']).from_dict(value)
+        return ExtensionNode.from_dict(value)
+    raise ValueError('{} is not a str, dict or list'.format(str(value)))
+
+
+def _value_hash(value):
+    """
+    Hashes a field value. Lists are hashed without regard to order.
+    """
+    if isinstance(value, list):
+        return hash((len(value), sum(_value_hash(x) for x in value) & 0xFFFFFFFFFFFFFFFF))
+    return hash(value)
+
+
+def _unordered_equal(a, b):
+    """
+    Compares two lists as multisets. Entries are bucketed by hash so only
+    entries with matching hashes are ever compared with ==.
+
+    __Args__
+
+    1. a (list): a list of strs and/or PremisNodes
+    2. b (list): a list of strs and/or PremisNodes
+
+    __Returns__
+
+    * (bool): a boolean denoting equality
+    """
+    if len(a) != len(b):
+        return False
+    buckets = {}
+    for x in b:
+        buckets.setdefault(_value_hash(x), []).append(x)
+    for x in a:
+        bucket = buckets.get(_value_hash(x))
+        if not bucket:
+            return False
+        for i, y in enumerate(bucket):
+            if _value_equal(x, y):
+                del bucket[i]
+                break
+        else:
+            return False
+    return True
+
+
+def _value_equal(a, b):
+    """
+    Compares two field values, treating lists as multisets.
+    """
+    if isinstance(a, list):
+        return isinstance(b, list) and _unordered_equal(a, b)
+    return a == b
+
+
+class InternTable(object):
+    """
+    A bounded table of str values, used to share one str object between
+    every field holding an equal value, eg. the eventType, identifier types
+    and messageDigestAlgorithm repeated throughout a parsed record.
+
+    The table is cleared whenever it grows past maxsize, so values which
+    are never repeated (identifier values, digests...) can't grow it
+    without bound or crowd out the values which are. A repeated value is
+    stored again at most once per clear.
+
+    __Attributes__
+
+    1. maxsize is the most values the table holds
+    2. hits is the number of values found in the table
+    3. misses is the number of values added to it
+    """
+    __slots__ = ('maxsize', 'hits', 'misses', '_table')
+
+    def __init__(self, maxsize=1 << 16):
+        """
+        Initializes an empty table.
+
+        __KWArgs__
+
+        * maxsize (int): the most values the table holds
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be a positive integer")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._table = {}
+
+    def __len__(self):
+        return len(self._table)
+
+    def intern(self, value):
+        """
+        Returns the str in the table equal to [value], adding [value] if
+        there isn't one. Anything other than a str is returned unchanged.
+
+        __Args__
+
+        1. value (str): the value
+
+        __Returns__
+
+        * (str): an equal, shared, str
+        """
+        if value.__class__ is not str:
+            return value
+        table = self._table
+        result = table.get(value)
+        if result is not None:
+            self.hits += 1
+            return result
+        if len(table) >= self.maxsize:
+            table.clear()
+        table[value] = value
+        self.misses += 1
+        return value
+
+    def intern_value(self, value):
+        """
+        Interns a field value: a str, or each str in a list (in place).
+        Anything else is returned unchanged.
+
+        __Args__
+
+        1. value (str or list or PremisNode): the value
+
+        __Returns__
+
+        * (str or list or PremisNode): the value, with its strs interned
+        """
+        if value.__class__ is str:
+            return self.intern(value)
+        if isinstance(value, list):
+            for i, x in enumerate(value):
+                if x.__class__ is str:
+                    list.__setitem__(value, i, self.intern(x))
+        return value
+
+    def clear(self):
+        """
+        Empties the table.
+        """
+        self._table.clear()
+
+
+_intern_table = None
+
+
+def set_intern_table(table):
+    """
+    Sets the InternTable every node setter interns str values through, or
+    None (the default) to stop interning. While it is set, factories don't
+    use tables of their own, as every value they build passes through the
+    setters.
+
+    __Args__
+
+    1. table (InternTable): the table, or None
+
+    __Returns__
+
+    * (InternTable): the table previously set, or None
+    """
+    global _intern_table
+    if table is not None and not isinstance(table, InternTable):
+        raise TypeError("{} is not an InternTable".format(str(table)))
+    previous = _intern_table
+    _intern_table = table
+    return previous
+
+
+def get_intern_table():
+    """
+    Returns the InternTable node setters intern str values through.
+
+    __Returns__
+
+    * (InternTable): the table, or None if values aren't being interned
+    """
+    return _intern_table
+
+
+class NodeFields(MutableMapping):
+    """
+    The mapping returned by PremisNode.fields. A live view of a node's field
+    slots: changes made through it are made to the node.
+
+    __Attributes__
+
+    1. node: the PremisNode whose fields are viewed
+    """
+    __slots__ = ('node',)
+
+    def __init__(self, node):
+        """
+        Initializes a view of a node's fields
+
+        __Args__
+
+        1. node (PremisNode): see the node attribute
+        """
+        self.node = node
+
+    def __getitem__(self, key):
+        return self.node._get_field(key)
+
+    def __setitem__(self, key, value):
+        self.node._store_field(key, value)
+        self.node._adopt(value)
+        self.node._invalidate()
+
+    def __delitem__(self, key):
+        self.node._remove_field(key)
+
+    def __iter__(self):
+        return iter([key for key, value in self.node._field_items()])
+
+    def __len__(self):
+        return len(self.node._field_items())
+
+    def __repr__(self):
+        return 'NodeFields({!r})'.format(OrderedDict(self.node._field_items()))
+
+
+class FieldList(list):
+    """
+    The list a repeatable field's values are kept in once a getter has
+    returned it. Changing it in place adopts any nodes added to it and
+    clears the cached hash and serialization of the node it belongs to, as
+    the node's setters do.
+
+    FieldLists pickle and copy as plain lists.
+
+    __Attributes__
+
+    1. node: the PremisNode whose field the list holds, or None once it has
+    been garbage collected
+    """
+    __slots__ = ('_node',)
+
+    def __init__(self, node, values=()):
+        """
+        Initializes the list of a node's field
+
+        __Args__
+
+        1. node (PremisNode): see the node attribute
+
+        __KWArgs__
+
+        * values (iterable): the values in the field
+        """
+        list.__init__(self, values)
+        self._node = weakref.ref(node)
+
+    @property
+    def node(self):
+        return self._node()
+
+    def _changed(self, values=()):
+        node = self._node()
+        if node is None:
+            return
+        for x in values:
+            if x.__class__ is not str:
+                node._adopt(x)
+        node._invalidate()
+
+    def __reduce__(self):
+        return (list, (list(self),))
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            value = list(value)
+            list.__setitem__(self, index, value)
+            self._changed(value)
+        else:
+            list.__setitem__(self, index, value)
+            self._changed((value,))
+
+    def __delitem__(self, index):
+        list.__delitem__(self, index)
+        self._changed()
+
+    def __iadd__(self, values):
+        self.extend(values)
+        return self
+
+    def __imul__(self, n):
+        list.__imul__(self, n)
+        self._changed()
+        return self
+
+    def append(self, value):
+        list.append(self, value)
+        self._changed((value,))
+
+    def extend(self, values):
+        values = list(values)
+        list.extend(self, values)
+        self._changed(values)
+
+    def insert(self, index, value):
+        list.insert(self, index, value)
+        self._changed((value,))
+
+    def remove(self, value):
+        list.remove(self, value)
+        self._changed()
+
+    def pop(self, index=-1):
+        value = list.pop(self, index)
+        self._changed()
+        return value
+
+    def clear(self):
+        list.clear(self)
+        self._changed()
+
+    def sort(self, **kwargs):
+        list.sort(self, **kwargs)
+        self._changed()
+
+    def reverse(self):
+        list.reverse(self)
+        self._changed()
+
 
 class ExtendedNode(PremisNode):
+    __slots__ = ()
+
     def __init__(self, rootName):
         """
         See documentation in PremisNode.__init__()
@@ -357,19 +1500,60 @@ class ExtendedNode(PremisNode):
         """
         self._add_to_field(key, value, override)
 
-    def toXML(self):
+    def _build_xml(self):
         """
-        wraps ExtensionNode.toXML(). Temporarily sets self.name to include
-        premis: namespace.
+        wraps ExtensionNode._build_xml(). Temporarily sets self.name to
+        include premis: namespace.
         """
         orig_name = self.name
         self.name = 'premis:'+self.name
-        result = ExtensionNode.toXML(self)
+        result = ExtensionNode._build_xml(self)
         self.name = orig_name
         return result
 
+    def _xml_values(self):
+        """
+        wraps ExtensionNode._xml_values()
+        """
+        return ExtensionNode._xml_values(self)
+
+    def _collect_xml_qnames(self, add):
+        """
+        wraps ExtensionNode._collect_xml_qnames()
+        """
+        ExtensionNode._collect_xml_qnames(self, add)
+
+    def _write_xml_content(self, write, qnames, short_empty_elements):
+        """
+        wraps ExtensionNode._write_xml_content()
+        """
+        ExtensionNode._write_xml_content(self, write, qnames, short_empty_elements)
+
+    def to_dict(self):
+        """
+        return the node's extension content as a dict. Every field is
+        included, in the order they were set. See PremisNode.to_dict()
+        """
+        return {key: _json_extension_value(value) for key, value in self._field_items()}
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        build the node from a dict returned by to_dict(). See
+        PremisNode.from_dict()
+        """
+        if not isinstance(data, dict):
+            raise TypeError("{} is not a dict".format(str(data)))
+        result = cls()
+        for key, value in data.items():
+            if key != '@type':
+                result._set_field(key, _json_extension_field_value(value), override=True)
+        return result
+
 
 class ExtensionNode(PremisNode):
+    __slots__ = ()
+
     def __init__(self):
         """
         Initialize an extension node whose name is dictated by the key of the
@@ -406,14 +1590,13 @@ class ExtensionNode(PremisNode):
         """
         self._set_name(name)
 
-    def toXML(self):
+    def _build_xml(self):
         """
-        return an ElementTree.Element object which models the node as xml.
+        return a new Element object which models the node as xml.
         see PremisNode.toXML()
         """
         root = ET.Element(self.name)
-        for key in self.fields:
-            value = self.fields[key]
+        for key, value in self._field_items():
             if isinstance(value, str):
                 e = ET.Element(key)
                 e.text = value
@@ -446,6 +1629,85 @@ class ExtensionNode(PremisNode):
                 raise ValueError
         return root
 
+    def to_dict(self):
+        """
+        return the node's content as a dict. Every field is included, in the
+        order they were set, along with the node's name as '@name' if it has
+        been changed with set_name(). See PremisNode.to_dict()
+        """
+        result = {} if self.name == 'root' else {'@name': self.name}
+        for key, value in self._field_items():
+            result[key] = _json_extension_value(value)
+        return result
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        build the node from a dict returned by to_dict(). See
+        PremisNode.from_dict()
+        """
+        if not isinstance(data, dict):
+            raise TypeError("{} is not a dict".format(str(data)))
+        result = cls()
+        for key, value in data.items():
+            if key == '@name':
+                result.set_name(value)
+            elif key != '@type':
+                result._set_field(key, _json_extension_field_value(value), override=True)
+        return result
+
+    def _xml_tag(self):
+        """
+        return the tag the node is serialized as, which for uncontrolled
+        nodes is just their name.
+        """
+        return self.name
+
+    def _xml_values(self):
+        """
+        return the (key, value) pairs serialized as the node's children.
+        Uncontrolled nodes serialize every field, in the order they were set.
+        """
+        return self._field_items()
+
+    def _collect_xml_qnames(self, add):
+        """
+        See PremisNode._collect_xml_qnames()
+        """
+        for key, value in self._xml_values():
+            for x in value if isinstance(value, list) else [value]:
+                if isinstance(x, str):
+                    add(key)
+                elif isinstance(x, ExtensionNode):
+                    add(key)
+                    x._collect_xml_qnames(add)
+                elif isinstance(x, PremisNode):
+                    add(x._xml_tag())
+                    x._collect_xml_qnames(add)
+
+    def _write_xml_content(self, write, qnames, short_empty_elements):
+        """
+        See PremisNode._write_xml_content(). Nested ExtensionNodes are written
+        as an element named for the field which holds them.
+        """
+        for key, value in self._xml_values():
+            if isinstance(value, list):
+                entries = value
+            elif isinstance(value, (str, PremisNode)):
+                entries = [value]
+            else:
+                raise ValueError
+            for x in entries:
+                if isinstance(x, str):
+                    _write_xml_leaf(write, qnames.get(key, key), x, short_empty_elements)
+                elif isinstance(x, ExtensionNode):
+                    _write_xml_element(write, x, qnames.get(key, key), '',
+                                       qnames, short_empty_elements)
+                elif isinstance(x, PremisNode):
+                    x.writeXML(write, qnames, short_empty_elements)
+                else:
+                    raise ValueError
+
 # From here on out classes for every possible PREMISv3 node are defined.
 # Their field order dictates the order things get serialized in in cases
 # where it matters (assuming the serializer implements things correctly).
@@ -470,61 +1732,84 @@ class ExtensionNode(PremisNode):
 
 
 class SignificantPropertiesExtension(ExtendedNode):
+    __slots__ = ()
+
     def __init__(self):
         ExtendedNode.__init__(self, 'significantPropertiesExtension')
 
 
 class CreatingApplicationExtension(ExtendedNode):
+    __slots__ = ()
+
     def __init__(self):
         ExtendedNode.__init__(self, 'creatingApplicationExtension')
 
 
 class ObjectCharacteristicsExtension(ExtendedNode):
+    __slots__ = ()
+
     def __init__(self):
         ExtendedNode.__init__(self, 'objectCharacteristicsExtension')
 
 
 class KeyInformation(ExtendedNode):
+    __slots__ = ()
+
     def __init__(self):
         ExtendedNode.__init__(self, 'keyInformation')
 
 
 class SignatureInformationExtension(ExtendedNode):
+    __slots__ = ()
+
     def __init__(self):
         ExtendedNode.__init__(self, 'signatureInformationExtension')
 
 
 class EnvironmentDesignationExtension(ExtendedNode):
+    __slots__ = ()
+
     def __init__(self):
         ExtendedNode.__init__(self, 'environmentDesignationExtension')
 
 
 class EnvironmentExtension(ExtendedNode):
+    __slots__ = ()
+
     def __init__(self):
         ExtendedNode.__init__(self, 'environmentExtension')
 
 
 class EventDetailExtension(ExtendedNode):
+    __slots__ = ()
+
     def __init__(self):
         ExtendedNode.__init__(self, 'eventDetailExtension')
 
 
 class EventOutcomeDetailExtension(ExtendedNode):
+    __slots__ = ()
+
     def __init__(self):
         ExtendedNode.__init__(self, 'eventOutcomeDetailExtension')
 
 
 class AgentExtension(ExtendedNode):
+    __slots__ = ()
+
     def __init__(self):
         ExtendedNode.__init__(self, 'agentExtension')
 
 
 class RightsExtension(ExtendedNode):
+    __slots__ = ()
+
     def __init__(self):
         ExtendedNode.__init__(self, 'rightsExtension')
 
 
 class Object(PremisNode):
+    __slots__ = ()
     field_order = ['objectIdentifier',
                    'objectCategory',
                    'preservationLevel',
@@ -791,40 +2076,26 @@ class Object(PremisNode):
         self._type_check(linkingRightsStatementIdentifier, LinkingRightsStatementIdentifier)
         self._add_to_field('linkingRightsStatementIdentifier', linkingRightsStatementIdentifier)
 
-    def toXML(self):
-        # Object nodes need their own .toXML(), because they are the singular
+    def _build_xml(self):
+        # Object nodes need their own ._build_xml(), because they are the singular
         # case where something gets written into the XML specific attribute
         # space rather than into a key-value pair.
         root = ET.Element('premis:'+self.name)
         root.set("xsi:type", 'premis:'+self.get_objectCategory())
-        for key in self.field_order:
-            if key is "objectCategory":
-                continue
-            if key not in self.fields:
-                continue
-            value = self.fields[key]
-            if isinstance(value, str):
-                e = ET.Element('premis:'+key)
-                e.text = value
-                root.append(e)
-            elif isinstance(value, PremisNode):
-                e = value.toXML()
-                root.append(e)
-            elif isinstance(value, list):
-                for x in value:
-                    if isinstance(x, str):
-                        e = ET.Element('premis:'+key)
-                        e.text = x
-                        root.append(e)
-                    elif isinstance(x, PremisNode):
-                        e = x.toXML()
-                        root.append(e)
-                    else:
-                        raise ValueError
-            else:
-                raise ValueError
+        self._append_xml_children(root)
         return root
 
+    def _xml_values(self):
+        # The objectCategory is written as an attribute, not a child.
+        return [x for x in PremisNode._xml_values(self) if x[0] != 'objectCategory']
+
+    def writeXML(self, write, qnames=None, short_empty_elements=True):
+        if qnames is None:
+            qnames = xml_qnames([self])[0]
+        attributes = ' xsi:type="' + _escape_xml_attribute('premis:'+self.get_objectCategory()) + '"'
+        _write_xml_element(write, self, 'premis:'+self.name, attributes,
+                           qnames, short_empty_elements)
+
     objectIdentifier = property(get_objectIdentifier, set_objectIdentifier)
     objectCategory = property(get_objectCategory, set_objectCategory)
     preservationLevel = property(get_preservationLevel, set_preservationLevel)
@@ -843,6 +2114,7 @@ class Object(PremisNode):
 
 
 class ObjectIdentifier(PremisNode):
+    __slots__ = ()
     field_order = ['objectIdentifierType',
                    'objectIdentifierValue'
                    ]
@@ -875,6 +2147,7 @@ class ObjectIdentifier(PremisNode):
 
 
 class LinkingObjectIdentifier(PremisNode):
+    __slots__ = ()
     field_order = ['linkingObjectIdentifierType',
                    'linkingObjectIdentifierValue',
                    'linkingObjectRole'
@@ -926,6 +2199,7 @@ class LinkingObjectIdentifier(PremisNode):
 
 
 class EventIdentifier(PremisNode):
+    __slots__ = ()
     field_order = ['eventIdentifierType',
                    'eventIdentifierValue'
                    ]
@@ -958,6 +2232,7 @@ class EventIdentifier(PremisNode):
 
 
 class LinkingEventIdentifier(PremisNode):
+    __slots__ = ()
     field_order = ['linkingEventIdentifierType',
                    'linkingEventIdentifierValue'
                    ]
@@ -990,6 +2265,7 @@ class LinkingEventIdentifier(PremisNode):
 
 
 class LinkingRightsStatementIdentifier(PremisNode):
+    __slots__ = ()
     field_order = ['linkingRightsStatementIdentifierType',
                    'linkingRightsStatementIdentifierValue'
                    ]
@@ -1022,6 +2298,7 @@ class LinkingRightsStatementIdentifier(PremisNode):
 
 
 class Relationship(PremisNode):
+    __slots__ = ()
     field_order = ['relationshipType',
                    'relationshipSubType',
                    'relatedObjectIdentifier',
@@ -1120,6 +2397,7 @@ class Relationship(PremisNode):
 
 
 class RelatedEventIdentifier(PremisNode):
+    __slots__ = ()
     field_order = ['relatedEventIdentifierType',
                    'relatedEventIdentifierValue',
                    'relatedEventSequence'
@@ -1165,6 +2443,7 @@ class RelatedEventIdentifier(PremisNode):
 
 
 class RelatedObjectIdentifier(PremisNode):
+    __slots__ = ()
     field_order = ['relatedObjectIdentifierType',
                    'relatedObjectIdentifierValue',
                    'relatedObjectSequence'
@@ -1210,6 +2489,7 @@ class RelatedObjectIdentifier(PremisNode):
 
 
 class EnvironmentRegistry(PremisNode):
+    __slots__ = ()
     field_order = ['environmentRegistryName',
                    'environmentRegistryKey',
                    'environmentRegistryRole'
@@ -1255,6 +2535,7 @@ class EnvironmentRegistry(PremisNode):
 
 
 class EnvironmentDesignation(PremisNode):
+    __slots__ = ()
     field_order = ['environmentName',
                    'environmentVersion',
                    'environmentOrigin',
@@ -1337,6 +2618,7 @@ class EnvironmentDesignation(PremisNode):
 
 
 class EnvironmentFunction(PremisNode):
+    __slots__ = ()
     field_order = ['environmentFunctionType',
                    'environmentFunctionLevel'
                    ]
@@ -1369,6 +2651,7 @@ class EnvironmentFunction(PremisNode):
 
 
 class SignatureInformation(PremisNode):
+    __slots__ = ()
     field_order = ['signature',
                    'signatureInformationExtension'
                    ]
@@ -1420,6 +2703,7 @@ class SignatureInformation(PremisNode):
 
 
 class Signature(PremisNode):
+    __slots__ = ()
     field_order = ['signatureEncoding',
                    'signer',
                    'signatureMethod',
@@ -1517,6 +2801,7 @@ class Signature(PremisNode):
 
 
 class Storage(PremisNode):
+    __slots__ = ()
     field_order = ['contentLocation',
                    'storageMedium'
                    ]
@@ -1555,6 +2840,7 @@ class Storage(PremisNode):
 
 
 class ContentLocation(PremisNode):
+    __slots__ = ()
     field_order = ['contentLocationType',
                    'contentLocationValue'
                    ]
@@ -1587,6 +2873,7 @@ class ContentLocation(PremisNode):
 
 
 class ObjectCharacteristics(PremisNode):
+    __slots__ = ()
     field_order = ['compositionLevel',
                    'fixity',
                    'size',
@@ -1712,6 +2999,7 @@ class ObjectCharacteristics(PremisNode):
 
 
 class Inhibitors(PremisNode):
+    __slots__ = ()
     field_order = ['inhibitorType',
                    'inhibitorTarget',
                    'inhibitorKey'
@@ -1764,6 +3052,7 @@ class Inhibitors(PremisNode):
 
 
 class CreatingApplication(PremisNode):
+    __slots__ = ()
     field_order = ['creatingApplicationName',
                    'creatingApplicationVersion',
                    'dateCreatedByApplication',
@@ -1833,6 +3122,7 @@ class CreatingApplication(PremisNode):
 
 
 class Format(PremisNode):
+    __slots__ = ()
     field_order = ['formatDesignation',
                    'formatRegistry',
                    'formatNote'
@@ -1888,6 +3178,7 @@ class Format(PremisNode):
 
 
 class FormatDesignation(PremisNode):
+    __slots__ = ()
     field_order = ['formatName',
                    'formatVersion'
                    ]
@@ -1921,6 +3212,7 @@ class FormatDesignation(PremisNode):
 
 
 class FormatRegistry(PremisNode):
+    __slots__ = ()
     field_order = ['formatRegistryName',
                    'formatRegistryKey',
                    'formatRegistryRole'
@@ -1965,6 +3257,7 @@ class FormatRegistry(PremisNode):
 
 
 class Fixity(PremisNode):
+    __slots__ = ()
     field_order = ['messageDigestAlgorithm',
                    'messageDigest',
                    'messageDigestOriginator'
@@ -2008,7 +3301,94 @@ class Fixity(PremisNode):
     messageDigestOriginator = property(get_messageDigestOriginator, set_messageDigestOriginator)
 
 
+# The messageDigestAlgorithm values (from the LOC cryptographic hash
+# functions vocabulary) compute_fixity() supports, and their hashlib names.
+FIXITY_ALGORITHMS = OrderedDict([
+    ('MD5', 'md5'),
+    ('SHA-1', 'sha1'),
+    ('SHA-256', 'sha256'),
+    ('SHA-512', 'sha512')
+])
+
+
+def compute_fixity(source, algorithms=('MD5', 'SHA-1', 'SHA-256', 'SHA-512'),
+                   messageDigestOriginator=None, chunksize=1 << 20,
+                   use_mmap=False):
+    """
+    Computes digests of a file with several algorithms at once, reading the
+    file a single time and feeding each chunk to every hasher, and returns
+    them as Fixity nodes.
+
+    __Args__
+
+    1. source: the path to a file, or a file object opened in binary mode,
+    which is read from its current position
+
+    __KWArgs__
+
+    * algorithms (iterable): the messageDigestAlgorithms to compute, keys of
+    FIXITY_ALGORITHMS
+    * messageDigestOriginator (str): set on every Fixity built
+    * chunksize (int): the size of the chunks read from the file
+    * use_mmap (bool): if True and source is a path the file is memory
+    mapped rather than read into a buffer
+
+    __Returns__
+
+    * (list): a Fixity node per algorithm, in the order given
+    """
+    hashers = []
+    for algorithm in algorithms:
+        if algorithm not in FIXITY_ALGORITHMS:
+            raise ValueError("Unsupported messageDigestAlgorithm: {}. Use one "
+                             "of {}".format(algorithm, ", ".join(FIXITY_ALGORITHMS)))
+        hashers.append((algorithm, hashlib.new(FIXITY_ALGORITHMS[algorithm])))
+    if not hashers:
+        raise ValueError("At least one messageDigestAlgorithm is required")
+    if chunksize < 1:
+        raise ValueError("chunksize must be a positive integer")
+    updates = [x[1].update for x in hashers]
+    if hasattr(source, 'readinto'):
+        _hash_file(source, updates, chunksize)
+    else:
+        with open(source, 'rb') as f:
+            if use_mmap:
+                _hash_mmap(f, updates, chunksize)
+            else:
+                _hash_file(f, updates, chunksize)
+    return [Fixity(algorithm, hasher.hexdigest(), messageDigestOriginator)
+            for algorithm, hasher in hashers]
+
+
+def _hash_file(f, updates, chunksize):
+    # Read into a single reused buffer, so no bytes object is allocated per
+    # chunk.
+    buf = bytearray(chunksize)
+    view = memoryview(buf)
+    while True:
+        size = f.readinto(buf)
+        if not size:
+            break
+        chunk = view[:size]
+        for update in updates:
+            update(chunk)
+
+
+def _hash_mmap(f, updates, chunksize):
+    try:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:
+        # Empty files can't be mapped.
+        return _hash_file(f, updates, chunksize)
+    with mapped, memoryview(mapped) as view:
+        for start in range(0, len(mapped), chunksize):
+            with view[start:start+chunksize] as chunk:
+                for update in updates:
+                    update(chunk)
+
+
 class SignificantProperties(PremisNode):
+    __slots__ = ()
     field_order = ['significantPropertiesType',
                    'significantPropertiesValue',
                    'significantPropertiesExtension'
@@ -2064,6 +3444,7 @@ class SignificantProperties(PremisNode):
 
 
 class PreservationLevel(PremisNode):
+    __slots__ = ()
     field_order = ['preservationLevelType',
                    'preservationLevelValue',
                    'preservationLevelRole',
@@ -2140,6 +3521,7 @@ class PreservationLevel(PremisNode):
 
 
 class Event(PremisNode):
+    __slots__ = ()
     field_order = ['eventIdentifier',
                    'eventType',
                    'eventDateTime',
@@ -2256,6 +3638,7 @@ class Event(PremisNode):
 
 
 class EventOutcomeInformation(PremisNode):
+    __slots__ = ()
     field_order = ['eventOutcome',
                    'eventOutcomeDetail'
                    ]
@@ -2299,6 +3682,7 @@ class EventOutcomeInformation(PremisNode):
 
 
 class EventDetailInformation(PremisNode):
+    __slots__ = ()
     field_order = ['eventDetail',
                    'eventDetailExtension'
                    ]
@@ -2341,6 +3725,7 @@ class EventDetailInformation(PremisNode):
 
 
 class EventOutcomeDetail(PremisNode):
+    __slots__ = ()
     field_order = ['eventOutcomeDetailNote',
                    'eventOutcomeDetailExtension'
                    ]
@@ -2385,6 +3770,7 @@ class EventOutcomeDetail(PremisNode):
 
 
 class Agent(PremisNode):
+    __slots__ = ()
     field_order = ['agentIdentifier',
                    'agentName',
                    'agentType',
@@ -2544,6 +3930,7 @@ class Agent(PremisNode):
 
 
 class AgentIdentifier(PremisNode):
+    __slots__ = ()
     field_order = ['agentIdentifierType',
                    'agentIdentifierValue'
                    ]
@@ -2576,6 +3963,7 @@ class AgentIdentifier(PremisNode):
 
 
 class LinkingEnvironmentIdentifier(PremisNode):
+    __slots__ = ()
     field_order = ['linkingEnvironmentIdentifierType',
                    'linkingEnvironmentIdentifierValue',
                    'linkingEnvironmentRole'
@@ -2627,6 +4015,7 @@ class LinkingEnvironmentIdentifier(PremisNode):
 
 
 class LinkingAgentIdentifier(PremisNode):
+    __slots__ = ()
     field_order = ['linkingAgentIdentifierType',
                    'linkingAgentIdentifierValue',
                    'linkingAgentRole'
@@ -2678,6 +4067,7 @@ class LinkingAgentIdentifier(PremisNode):
 
 
 class Rights(PremisNode):
+    __slots__ = ()
     field_order = ['rightsStatement',
                    'rightsExtension'
                    ]
@@ -2726,6 +4116,7 @@ class Rights(PremisNode):
 
 
 class RightsStatement(PremisNode):
+    __slots__ = ()
     field_order = ['rightsStatementIdentifier',
                    'rightsBasis',
                    'copyrightInformation',
@@ -2867,6 +4258,7 @@ class RightsStatement(PremisNode):
 
 
 class RightsGranted(PremisNode):
+    __slots__ = ()
     field_order = ['act',
                    'restriction',
                    'termOfGrant',
@@ -2949,6 +4341,7 @@ class RightsGranted(PremisNode):
 
 
 class TermOfRestriction(PremisNode):
+    __slots__ = ()
     field_order = ['startDate',
                    'endDate'
                    ]
@@ -2983,6 +4376,7 @@ class TermOfRestriction(PremisNode):
 
 
 class TermOfGrant(PremisNode):
+    __slots__ = ()
     field_order = ['startDate',
                    'endDate'
                    ]
@@ -3017,6 +4411,7 @@ class TermOfGrant(PremisNode):
 
 
 class OtherRightsInformation(PremisNode):
+    __slots__ = ()
     field_order = ['otherRightsDocumentationIdentifier',
                    'otherRightsBasis',
                    'otherRightsApplicableDates',
@@ -3087,6 +4482,7 @@ class OtherRightsInformation(PremisNode):
 
 
 class OtherRightsApplicableDates(PremisNode):
+    __slots__ = ()
     field_order = ['startDate',
                    'endDate'
                    ]
@@ -3121,6 +4517,7 @@ class OtherRightsApplicableDates(PremisNode):
 
 
 class OtherRightsDocumentationIdentifier(PremisNode):
+    __slots__ = ()
     field_order = ['otherRightsDocumentationIdentifierType',
                    'otherRightsDocumentationIdentifierValue',
                    'otherRightsDocumentationRole'
@@ -3166,6 +4563,7 @@ class OtherRightsDocumentationIdentifier(PremisNode):
 
 
 class StatuteInformation(PremisNode):
+    __slots__ = ()
     field_order = ['statuteJurisdiction',
                    'statuteCitation',
                    'statuteInformationDeterminationDate',
@@ -3259,6 +4657,7 @@ class StatuteInformation(PremisNode):
 
 
 class StatuteApplicableDates(PremisNode):
+    __slots__ = ()
     field_order = ['startDate',
                    'endDate'
                    ]
@@ -3289,6 +4688,7 @@ class StatuteApplicableDates(PremisNode):
 
 
 class StatuteDocumentationIdentifier(PremisNode):
+    __slots__ = ()
     field_order = ['statuteDocumentationIdentifierType',
                    'statuteDocumentationIdentifierValue',
                    'statuteDocumentationRole'
@@ -3334,6 +4734,7 @@ class StatuteDocumentationIdentifier(PremisNode):
 
 
 class LicenseInformation(PremisNode):
+    __slots__ = ()
     field_order = ['licenseDocumentationIdentifier',
                    'licenseTerms',
                    'licenseNote',
@@ -3404,6 +4805,7 @@ class LicenseInformation(PremisNode):
 
 
 class LicenseApplicableDates(PremisNode):
+    __slots__ = ()
     field_order = ['startDate',
                    'endDate'
                    ]
@@ -3439,6 +4841,7 @@ class LicenseApplicableDates(PremisNode):
 
 
 class LicenseDocumentationIdentifier(PremisNode):
+    __slots__ = ()
     field_order = ['licenseDocumentationIdentifierType',
                    'licenseDocumentationIdentifierValue',
                    'licenseDocumentationRole'
@@ -3484,6 +4887,7 @@ class LicenseDocumentationIdentifier(PremisNode):
 
 
 class CopyrightInformation(PremisNode):
+    __slots__ = ()
     field_order = ['copyrightStatus',
                    'copyrightJurisdiction',
                    'copyrightStatusDeterminationDate',
@@ -3506,7 +4910,7 @@ class CopyrightInformation(PremisNode):
         self.set_copyrightJurisdiction(copyrightJurisdiction)
         # Optionals
         if copyrightStatusDeterminationDate is not None:
-            self.set_copyrightStatutsDeterminationDate(copyrightStatusDeterminationDate)
+            self.set_copyrightStatusDeterminationDate(copyrightStatusDeterminationDate)
         if copyrightNote is not None:
             self.set_copyrightNote(copyrightNote)
         if copyrightDocumentationIdentifier is not None:
@@ -3577,6 +4981,7 @@ class CopyrightInformation(PremisNode):
 
 
 class CopyrightApplicableDates(PremisNode):
+    __slots__ = ()
     field_order = ['startDate',
                    'endDate']
 
@@ -3611,6 +5016,7 @@ class CopyrightApplicableDates(PremisNode):
 
 
 class CopyrightDocumentationIdentifier(PremisNode):
+    __slots__ = ()
     field_order = ['copyrightDocumentationIdentifierType',
                    'copyrightDocumentationIdentifierValue',
                    'copyrightDocumentationRole'
@@ -3656,6 +5062,7 @@ class CopyrightDocumentationIdentifier(PremisNode):
 
 
 class RightsStatementIdentifier(PremisNode):
+    __slots__ = ()
     field_order = ['rightsStatementIdentifierType',
                    'rightsStatementIdentifierValue'
                    ]
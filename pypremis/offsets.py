@@ -0,0 +1,550 @@
+import mmap
+import os
+import re
+import sqlite3
+import xml.etree.ElementTree as ET
+from xml.parsers import expat
+
+from pypremis.factories import XMLNodeFactory
+from pypremis.indexes import object_identifiers, event_identifiers, \
+    agent_identifiers, rights_identifiers
+from pypremis.lib import _standalone_xml, _unregister_premis_namespaces
+from pypremis.nodes import Object, Event, Agent, Rights
+
+
+"""
+### Random access to the entities of large premis xml files ###
+
+1. **OffsetIndex** records where every top level object, event, agent and
+rights element of a premis xml file starts and ends, along with its
+identifiers, in a sidecar SQLite file. It is built from a single scan of
+the file which builds no nodes. Any one entity can then be built by
+identifier from just its own bytes, read through an mmap of the file,
+however large the file is, and replaced with .replace() by rewriting only
+the entity and the rest of the file after it.
+2. **scan_offsets()** performs the scan.
+
+The premis xml file must use an ascii compatible encoding, eg. the UTF-8
+.write_to_file() writes by default.
+"""
+
+
+_PREMIS = 'http://www.loc.gov/premis/v3'
+
+# For each kind of entity: the path (below the entity) of the elements
+# holding its identifiers, and the tags of their type and value.
+_IDENTIFIER_PATHS = {
+    'object': (('objectIdentifier',), 'objectIdentifierType', 'objectIdentifierValue'),
+    'event': (('eventIdentifier',), 'eventIdentifierType', 'eventIdentifierValue'),
+    'agent': (('agentIdentifier',), 'agentIdentifierType', 'agentIdentifierValue'),
+    'rights': (('rightsStatement', 'rightsStatementIdentifier'),
+               'rightsStatementIdentifierType', 'rightsStatementIdentifierValue')
+}
+
+# The kind of entity each node class is, and the functions returning their
+# identifiers.
+_ENTITY_KINDS = {Object: 'object', Event: 'event', Agent: 'agent', Rights: 'rights'}
+_IDENTIFIER_FUNCTIONS = {
+    'object': object_identifiers,
+    'event': event_identifiers,
+    'agent': agent_identifiers,
+    'rights': rights_identifiers
+}
+
+# A start tag, whose attribute values may contain '>'.
+_START_TAG = re.compile(
+    rb'<[^\s/>]+(?:\s+[^\s=/>]+\s*=\s*(?:"[^"]*"|\'[^\']*\'))*\s*/?>')
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS source (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    root_start INTEGER NOT NULL,
+    body_start INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entities (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    length INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entities_start ON entities(start);
+CREATE TABLE IF NOT EXISTS identifiers (
+    entity_id INTEGER NOT NULL REFERENCES entities(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    type TEXT,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS identifiers_value ON identifiers(kind, value, type);
+CREATE INDEX IF NOT EXISTS identifiers_entity ON identifiers(entity_id);
+'''
+
+
+def _tag_end(data, pos):
+    """
+    Returns the offset just after the start tag beginning at [pos].
+    """
+    match = _START_TAG.match(data, pos)
+    if match is None:
+        raise ValueError("No start tag at byte {}.".format(pos))
+    return match.end()
+
+
+def scan_offsets(filepath):
+    """
+    Scans a premis xml file once, with expat, for the byte range and
+    identifiers of each of its top level entities. No Elements or nodes are
+    built.
+
+    __Args__
+
+    1. filepath (str): the path to the premis xml file
+
+    __Returns__
+
+    * (tuple): the offset of the root element's start tag, the offset just
+    after it, and a list with a (kind, start, end, identifiers) tuple for
+    each entity in document order, where kind is 'object', 'event', 'agent'
+    or 'rights', data[start:end] is the entity's element and identifiers is
+    a list of its (type, value) pairs
+    """
+    with open(filepath, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError("{} is empty.".format(filepath))
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return _scan(data, f)
+
+
+def _scan(data, f):
+    parser = expat.ParserCreate(namespace_separator=' ')
+    parser.buffer_text = True
+    entities = []
+    root = []
+    depth = 0
+    # The entity being read: its kind, start and identifiers, the path to
+    # the current element below it, and the text being collected, if any.
+    entity = None
+    path = []
+    text = None
+    target = None
+
+    def start(name, attributes):
+        nonlocal depth, entity, text, target
+        depth += 1
+        if depth == 1:
+            root.append(parser.CurrentByteIndex)
+            root.append(_tag_end(data, parser.CurrentByteIndex))
+            return
+        uri, _, local = name.rpartition(' ')
+        if depth == 2:
+            if uri == _PREMIS and local in _IDENTIFIER_PATHS:
+                entity = (local, parser.CurrentByteIndex, [])
+                path.clear()
+            return
+        if entity is None:
+            return
+        path.append(local if uri == _PREMIS else name)
+        container, typeTag, valueTag = _IDENTIFIER_PATHS[entity[0]]
+        if len(path) == len(container) and tuple(path) == container:
+            entity[2].append([None, None])
+        elif len(path) == len(container) + 1 and tuple(path[:-1]) == container:
+            if local == typeTag:
+                target = 0
+            elif local == valueTag:
+                target = 1
+            else:
+                return
+            text = []
+
+    def end(name):
+        nonlocal depth, entity, text
+        depth -= 1
+        if entity is None:
+            return
+        if depth > 1:
+            if text is not None:
+                entity[2][-1][target] = ''.join(text)
+                text = None
+            path.pop()
+            return
+        stop = parser.CurrentByteIndex
+        if data[stop:stop+2] == b'</':
+            stop = data.find(b'>', stop) + 1
+        # Otherwise the element was empty and the index is already past it.
+        kind, startOffset, identifiers = entity
+        entities.append((kind, startOffset, stop, [tuple(x) for x in identifiers]))
+        entity = None
+
+    def character_data(content):
+        if text is not None:
+            text.append(content)
+
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    parser.CharacterDataHandler = character_data
+    try:
+        parser.ParseFile(f)
+    except expat.ExpatError as e:
+        raise ValueError("The file isn't well formed xml: {}".format(e))
+    return root[0], root[1], entities
+
+
+class OffsetIndex(object):
+    """
+    An index of the byte ranges of the entities in a premis xml file, kept
+    in a sidecar SQLite file (by default the record's path with .offsets
+    appended), for loading single entities by identifier without parsing
+    the rest of the file.
+
+    The index is built when it is opened if it doesn't exist yet, or if the
+    file's size or modification time have changed since it was built, and
+    checked again the same way before every lookup. A lookup is an indexed
+    query for the entity's byte range, followed by parsing just those bytes
+    from an mmap of the file and building them with XMLNodeFactory, so it
+    takes time in the size of the entity, not of the file.
+
+    __Attributes__
+
+    1. filepath is the location of the premis xml file on disk
+    2. indexpath is the location of the index on disk
+    3. connection is the sqlite3 Connection to the index
+    """
+    # The factory methods which build each kind of entity.
+    builders = {
+        'object': 'buildObject',
+        'event': 'buildEvent',
+        'agent': 'buildAgent',
+        'rights': 'buildRights'
+    }
+
+    def __init__(self, filepath, indexpath=None):
+        """
+        Opens the index of a premis xml file, building it if it is missing or
+        out of date.
+
+        __Args__
+
+        1. filepath (str): the path to an existing premis xml file
+
+        __KWArgs__
+
+        * indexpath (str): the path to the index. Defaults to the filepath
+        with .offsets appended.
+        """
+        self.filepath = filepath
+        self.indexpath = indexpath if indexpath is not None \
+            else filepath + '.offsets'
+        self.connection = sqlite3.connect(self.indexpath)
+        self.connection.execute('PRAGMA foreign_keys = ON')
+        self.connection.executescript(_SCHEMA)
+        self._factory = XMLNodeFactory(None)
+        _unregister_premis_namespaces()
+        self._source = None
+        if not self.is_current():
+            self.build()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        self._check()
+        return self.connection.execute('SELECT COUNT(*) FROM entities').fetchone()[0]
+
+    def close(self):
+        """
+        Closes the index.
+        """
+        self.connection.close()
+
+    def get_filepath(self):
+        """
+        Returns the path to the premis xml file.
+
+        __Returns__
+
+        * (str): the path
+        """
+        return self.filepath
+
+    def get_indexpath(self):
+        """
+        Returns the path to the index.
+
+        __Returns__
+
+        * (str): the path
+        """
+        return self.indexpath
+
+    def is_current(self):
+        """
+        Returns whether the index was built from the file as it is now, going
+        by its size and modification time.
+
+        __Returns__
+
+        * (bool): True if the index is up to date
+        """
+        stat = os.stat(self.filepath)
+        row = self.connection.execute(
+            'SELECT size, mtime_ns, root_start, body_start FROM source').fetchone()
+        if row is None or row[:2] != (stat.st_size, stat.st_mtime_ns):
+            return False
+        self._source = row
+        return True
+
+    def _check(self):
+        if not self.is_current():
+            self.build()
+
+    def build(self):
+        """
+        Scans the file and replaces the contents of the index.
+
+        __Returns__
+
+        * (int): the number of entities indexed
+        """
+        stat = os.stat(self.filepath)
+        rootStart, bodyStart, entities = scan_offsets(self.filepath)
+        with self.connection:
+            self.connection.execute('DELETE FROM source')
+            self.connection.execute('DELETE FROM identifiers')
+            self.connection.execute('DELETE FROM entities')
+            self._source = (stat.st_size, stat.st_mtime_ns, rootStart, bodyStart)
+            self.connection.execute('INSERT INTO source VALUES (0, ?, ?, ?, ?)',
+                                    self._source)
+            for entityID, (kind, start, stop, identifiers) in enumerate(entities):
+                self.connection.execute('INSERT INTO entities VALUES (?, ?, ?, ?)',
+                                        (entityID, kind, start, stop - start))
+                self.connection.executemany(
+                    'INSERT INTO identifiers VALUES (?, ?, ?, ?)',
+                    [(entityID, kind) + x for x in identifiers])
+        return len(entities)
+
+    def get_range(self, kind, ID, IDType=None):
+        """
+        Returns the byte range of an entity in the file.
+
+        __Args__
+
+        1. kind (str): 'object', 'event', 'agent' or 'rights'
+        2. ID (str): the value of one of the entity's identifiers
+
+        __KWArgs__
+
+        * IDType (str): the type of the identifier. If not provided the first
+        entity in the file with a matching identifier value is found.
+
+        __Returns__
+
+        * (tuple or None): the (start, end) offsets of the entity's element,
+        or None if there is no such entity
+        """
+        row = self._find(kind, ID, IDType)
+        if row is None:
+            return None
+        return row[1], row[1] + row[2]
+
+    def _find(self, kind, ID, IDType):
+        # Returns the (id, start, length) of an entity, or None.
+        if kind not in self.builders:
+            raise ValueError("{} isn't a kind of premis entity.".format(kind))
+        self._check()
+        query = 'SELECT e.id, e.start, e.length FROM identifiers i ' + \
+            'JOIN entities e ON e.id = i.entity_id WHERE i.kind = ? AND i.value = ?'
+        parameters = [kind, ID]
+        if IDType is not None:
+            query += ' AND i.type = ?'
+            parameters.append(IDType)
+        return self.connection.execute(query + ' ORDER BY e.start LIMIT 1',
+                                       parameters).fetchone()
+
+    def _load(self, kind, ID, IDType):
+        offsets = self.get_range(kind, ID, IDType)
+        if offsets is None:
+            return None
+        rootStart, bodyStart = self._source[2:]
+        # The file is only mapped for the lookup, so it is never left mapped
+        # while something else rewrites it.
+        with open(self.filepath, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            prolog = data[:bodyStart]
+            fragment = data[offsets[0]:offsets[1]]
+        rootName = prolog[rootStart+1:].split(None, 1)[0].rstrip(b'/>')
+        # The entity is parsed inside the file's own prolog and root start
+        # tag, so the encoding and namespace declarations still apply.
+        element = ET.fromstring(prolog + fragment + b'</' + rootName + b'>')[0]
+        return getattr(self._factory, self.builders[kind])(element)
+
+    def get_object(self, objID, objIDType=None):
+        """
+        Builds the object with the corresponding objectIdentifierValue from
+        the file.
+
+        __Args__
+
+        1. objID (str): the objectIdentifierValue
+
+        __KWArgs__
+
+        * objIDType (str): the objectIdentifierType. If not provided the
+        first object with a matching objectIdentifierValue is returned.
+
+        __Returns__
+
+        * (Object or None): the object, or None
+        """
+        return self._load('object', objID, objIDType)
+
+    def get_event(self, eventID, eventIDType=None):
+        """
+        Builds the event with the corresponding eventIdentifierValue from the
+        file.
+
+        __Args__
+
+        1. eventID (str): the eventIdentifierValue
+
+        __KWArgs__
+
+        * eventIDType (str): the eventIdentifierType. If not provided the
+        first event with a matching eventIdentifierValue is returned.
+
+        __Returns__
+
+        * (Event or None): the event, or None
+        """
+        return self._load('event', eventID, eventIDType)
+
+    def get_agent(self, agentID, agentIDType=None):
+        """
+        Builds the agent with the corresponding agentIdentifierValue from the
+        file.
+
+        __Args__
+
+        1. agentID (str): the agentIdentifierValue
+
+        __KWArgs__
+
+        * agentIDType (str): the agentIdentifierType. If not provided the
+        first agent with a matching agentIdentifierValue is returned.
+
+        __Returns__
+
+        * (Agent or None): the agent, or None
+        """
+        return self._load('agent', agentID, agentIDType)
+
+    def get_rights(self, rightsID, rightsIDType=None):
+        """
+        Builds the rights entity containing the rightsStatement with the
+        corresponding rightsStatementIdentifierValue from the file.
+
+        __Args__
+
+        1. rightsID (str): the rightsStatementIdentifierValue
+
+        __KWArgs__
+
+        * rightsIDType (str): the rightsStatementIdentifierType. If not
+        provided the first rights with a matching
+        rightsStatementIdentifierValue is returned.
+
+        __Returns__
+
+        * (Rights or None): the rights, or None
+        """
+        return self._load('rights', rightsID, rightsIDType)
+
+    def replace(self, node, ID=None, IDType=None, sync=False):
+        """
+        Replaces an entity in the file with [node], rewriting only the entity
+        and the part of the file after it, and updates the index to match.
+
+        The entity is serialized as a standalone element, as EventJournal
+        does, and written over the old one's byte range. If its length has
+        changed, the rest of the file is first moved to make room with a
+        single copy through an mmap of the file. The time taken is in the
+        size of the entity plus the size of the file after it, so entities
+        near the end of the file are the cheapest to replace.
+
+        The file is changed in place, so an interruption part way through
+        the move can leave it corrupt. The index is updated after the file,
+        so an interruption between the two only leaves it out of date, and
+        it is rebuilt on its next use.
+
+        __Args__
+
+        1. node (Object, Event, Agent or Rights): the new entity
+
+        __KWArgs__
+
+        * ID (str): the identifier value of the entity to replace. Defaults
+        to the node's own (first) identifier, so it needs to be given when
+        the identifier itself has changed.
+        * IDType (str): the identifier type of the entity to replace. Defaults
+        to the type of the node's own identifier when ID isn't given.
+        * sync (bool): if True the file is flushed to disk with fsync before
+        the index is updated
+
+        __Returns__
+
+        * (tuple): the (start, end) offsets of the new entity's element
+        """
+        kind = _ENTITY_KINDS.get(type(node))
+        if kind is None:
+            raise TypeError("Only Object, Event, Agent and Rights nodes can "
+                            "replace entities in a file.")
+        identifiers = _IDENTIFIER_FUNCTIONS[kind](node)
+        if ID is None:
+            if not identifiers:
+                raise ValueError("The node has no identifier, so the entity "
+                                 "it replaces must be given.")
+            IDType, ID = identifiers[0]
+        row = self._find(kind, ID, IDType)
+        if row is None:
+            raise KeyError(ID)
+        entityID, start, length = row
+        data = _standalone_xml(node).encode('us-ascii', 'xmlcharrefreplace')
+        delta = len(data) - length
+        end = start + length
+        with open(self.filepath, 'r+b') as f:
+            size = os.fstat(f.fileno()).st_size
+            f.seek(start)
+            first = f.read(1)
+            f.seek(end - 1)
+            if first != b'<' or f.read(1) != b'>':
+                raise ValueError("The index doesn't match {}.".format(self.filepath))
+            if delta > 0:
+                f.truncate(size + delta)
+            with mmap.mmap(f.fileno(), 0) as mapped:
+                if delta:
+                    mapped.move(end + delta, end, size - end)
+                mapped[start:start+len(data)] = data
+                mapped.flush()
+            if delta < 0:
+                f.truncate(size + delta)
+            if sync:
+                os.fsync(f.fileno())
+        stat = os.stat(self.filepath)
+        with self.connection:
+            self.connection.execute('UPDATE entities SET length = ? WHERE id = ?',
+                                    (len(data), entityID))
+            if delta:
+                self.connection.execute('UPDATE entities SET start = start + ? '
+                                        'WHERE start > ?', (delta, start))
+            self.connection.execute('DELETE FROM identifiers WHERE entity_id = ?',
+                                    (entityID,))
+            self.connection.executemany(
+                'INSERT INTO identifiers VALUES (?, ?, ?, ?)',
+                [(entityID, kind) + tuple(x) for x in identifiers])
+            self.connection.execute('UPDATE source SET size = ?, mtime_ns = ?',
+                                    (stat.st_size, stat.st_mtime_ns))
+        self._source = (stat.st_size, stat.st_mtime_ns) + self._source[2:]
+        return start, start + len(data)
@@ -0,0 +1,443 @@
+import sqlite3
+import xml.etree.ElementTree as ET
+
+from pypremis.audit import normalize_algorithm
+from pypremis.factories import XMLNodeFactory
+from pypremis.indexes import entity_links, object_identifiers, \
+    event_identifiers, agent_identifiers, rights_identifiers, field_values, \
+    field_value
+from pypremis.lib import PremisRecord, load_records, _standalone_xml, \
+    _unregister_premis_namespaces
+from pypremis.nodes import *
+
+
+"""
+### A persistent store of premis records ###
+
+1. **PremisStore** keeps the entities of many PremisRecords in a SQLite
+database, along with indexed tables of their identifiers, links, event
+types and dates, and fixity values, so collections of records can be
+queried without reparsing their xml.
+"""
+
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS entities (
+    id INTEGER PRIMARY KEY,
+    record_id INTEGER NOT NULL REFERENCES records(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    xml TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entities_record ON entities(record_id, kind, position);
+CREATE TABLE IF NOT EXISTS identifiers (
+    entity_id INTEGER NOT NULL REFERENCES entities(id) ON DELETE CASCADE,
+    record_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    type TEXT,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS identifiers_value ON identifiers(kind, value, type);
+CREATE INDEX IF NOT EXISTS identifiers_entity ON identifiers(entity_id);
+CREATE TABLE IF NOT EXISTS links (
+    entity_id INTEGER NOT NULL REFERENCES entities(id) ON DELETE CASCADE,
+    record_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    type TEXT,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS links_value ON links(kind, value, type);
+CREATE INDEX IF NOT EXISTS links_entity ON links(entity_id);
+CREATE TABLE IF NOT EXISTS events (
+    entity_id INTEGER PRIMARY KEY REFERENCES entities(id) ON DELETE CASCADE,
+    event_type TEXT,
+    event_datetime TEXT
+);
+CREATE INDEX IF NOT EXISTS events_type ON events(event_type, event_datetime);
+CREATE INDEX IF NOT EXISTS events_datetime ON events(event_datetime);
+CREATE TABLE IF NOT EXISTS fixity (
+    entity_id INTEGER NOT NULL REFERENCES entities(id) ON DELETE CASCADE,
+    algorithm TEXT,
+    digest TEXT,
+    originator TEXT
+);
+CREATE INDEX IF NOT EXISTS fixity_algorithm ON fixity(algorithm, digest);
+CREATE INDEX IF NOT EXISTS fixity_digest ON fixity(digest);
+CREATE INDEX IF NOT EXISTS fixity_entity ON fixity(entity_id);
+'''
+
+
+def _algorithm_key(algorithm):
+    """
+    Returns the form a messageDigestAlgorithm is stored and queried in: its
+    FIXITY_ALGORITHMS name if it is supported, so 'md5' and 'MD5' match,
+    otherwise the casefolded algorithm.
+    """
+    if algorithm is None:
+        return None
+    return normalize_algorithm(algorithm) or algorithm.strip().casefold()
+
+
+class PremisStore(object):
+    """
+    A SQLite database of premis records.
+
+    Each record is stored under a path (usually the path of its xml file).
+    Every entity is stored as a standalone xml element, which is built back
+    into a PremisNode when it is read, and its identifiers, links, event
+    type and date and fixity are stored in indexed tables for querying.
+
+    Adding a record under a path which is already stored replaces it.
+    Queries return (path, node) tuples, where path is the path of the
+    record the node was found in.
+
+    eventDateTimes are compared as strings, which orders them correctly
+    when they are written consistently, eg. as ISO 8601 in one timezone.
+    messageDigestAlgorithms are matched regardless of case and spelling,
+    see pypremis.audit.normalize_algorithm().
+
+    __Attributes__
+
+    1. connection is the sqlite3 Connection to the database
+    """
+    # The factory methods which build each kind of entity.
+    builders = {
+        'object': 'buildObject',
+        'event': 'buildEvent',
+        'agent': 'buildAgent',
+        'rights': 'buildRights'
+    }
+
+    def __init__(self, dbpath=':memory:'):
+        """
+        Opens a store, creating its database if it doesn't exist.
+
+        __KWArgs__
+
+        * dbpath (str): the path to the SQLite database file. Defaults to an
+        in memory database.
+        """
+        self.connection = sqlite3.connect(dbpath)
+        self.connection.execute('PRAGMA foreign_keys = ON')
+        self.connection.executescript(_SCHEMA)
+        self._factory = XMLNodeFactory(None)
+        _unregister_premis_namespaces()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return self.connection.execute('SELECT COUNT(*) FROM records').fetchone()[0]
+
+    def __contains__(self, path):
+        return self._record_id(path) is not None
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        self.connection.close()
+
+    def _record_id(self, path):
+        row = self.connection.execute('SELECT id FROM records WHERE path = ?',
+                                      (path,)).fetchone()
+        return row[0] if row is not None else None
+
+    def _insert_entity(self, recordID, kind, position, node, key_func):
+        cursor = self.connection.execute(
+            'INSERT INTO entities (record_id, kind, position, xml) VALUES (?, ?, ?, ?)',
+            (recordID, kind, position, _standalone_xml(node)))
+        entityID = cursor.lastrowid
+        self.connection.executemany(
+            'INSERT INTO identifiers VALUES (?, ?, ?, ?, ?)',
+            [(entityID, recordID, kind) + x for x in key_func(node)])
+        self.connection.executemany(
+            'INSERT INTO links VALUES (?, ?, ?, ?, ?)',
+            [(entityID, recordID) + x for x in entity_links(node)])
+        if kind == 'event':
+            self.connection.execute('INSERT INTO events VALUES (?, ?, ?)', (
+                entityID, field_value(node, 'eventType'), field_value(node, 'eventDateTime')))
+        elif kind == 'object':
+            self.connection.executemany('INSERT INTO fixity VALUES (?, ?, ?, ?)', [
+                (entityID, _algorithm_key(field_value(x, 'messageDigestAlgorithm')),
+                 field_value(x, 'messageDigest'), field_value(x, 'messageDigestOriginator'))
+                for objectCharacteristics in field_values(node, 'objectCharacteristics')
+                for x in field_values(objectCharacteristics, 'fixity')])
+
+    def add_record(self, record, path=None):
+        """
+        Stores a record, replacing any record already stored under its path.
+
+        __Args__
+
+        1. record (PremisRecord): the record to store
+
+        __KWArgs__
+
+        * path (str): the path to store the record under. Defaults to the
+        record's filepath.
+        """
+        if path is None:
+            path = record.get_filepath()
+        if path is None:
+            raise ValueError("A record without a filepath must be stored with a path.")
+        with self.connection:
+            self._add_record(record, path)
+
+    def _add_record(self, record, path):
+        self.connection.execute('DELETE FROM records WHERE path = ?', (path,))
+        recordID = self.connection.execute(
+            'INSERT INTO records (path) VALUES (?)', (path,)).lastrowid
+        for kind, nodes, key_func in (
+                ('object', record.get_object_list(), object_identifiers),
+                ('event', record.get_event_list(), event_identifiers),
+                ('agent', record.get_agent_list(), agent_identifiers),
+                ('rights', record.get_rights_list(), rights_identifiers)):
+            for position, node in enumerate(nodes):
+                self._insert_entity(recordID, kind, position, node, key_func)
+
+    def add_files(self, paths, **kwargs):
+        """
+        Parses premis xml files in parallel, with load_records(), and stores
+        each under its path, in a single transaction.
+
+        __Args__
+
+        1. paths (iterable): the paths of the premis xml files
+
+        __KWArgs__
+
+        * see load_records()
+
+        __Returns__
+
+        * (int): the number of records stored
+        """
+        count = 0
+        with self.connection:
+            for path, record in load_records(paths, **kwargs):
+                self._add_record(record, path)
+                count += 1
+        return count
+
+    def remove_record(self, path):
+        """
+        Removes the record stored under a path.
+
+        __Args__
+
+        1. path (str): the path the record is stored under
+        """
+        with self.connection:
+            cursor = self.connection.execute('DELETE FROM records WHERE path = ?', (path,))
+        if cursor.rowcount == 0:
+            raise KeyError(path)
+
+    def get_paths(self):
+        """
+        Returns the paths of every stored record.
+
+        __Returns__
+
+        * (list): the paths, in the order the records were stored
+        """
+        return [x[0] for x in self.connection.execute('SELECT path FROM records ORDER BY id')]
+
+    def _build(self, kind, xml):
+        node = getattr(self._factory, self.builders[kind])(ET.fromstring(xml))
+        _unregister_premis_namespaces()
+        return node
+
+    def _entities(self, query, params=()):
+        # Builds the (path, node) results of a query selecting
+        # (path, kind, xml) rows.
+        return [(path, self._build(kind, xml))
+                for path, kind, xml in self.connection.execute(query, params)]
+
+    def get_record(self, path):
+        """
+        Rebuilds a stored record.
+
+        __Args__
+
+        1. path (str): the path the record is stored under
+
+        __Returns__
+
+        * (PremisRecord): the record
+        """
+        recordID = self._record_id(path)
+        if recordID is None:
+            raise KeyError(path)
+        lists = {x: [] for x in self.builders}
+        for kind, xml in self.connection.execute(
+                'SELECT kind, xml FROM entities WHERE record_id = ? ORDER BY kind, position',
+                (recordID,)):
+            lists[kind].append(self._build(kind, xml))
+        record = PremisRecord(objects=lists['object'], events=lists['event'],
+                              agents=lists['agent'], rights=lists['rights'])
+        record.set_filepath(path)
+        return record
+
+    def get_entities(self, kind, identifierValue, identifierType=None):
+        """
+        Finds the entities of a kind with an identifier, in every record.
+
+        __Args__
+
+        1. kind (str): 'object', 'event', 'agent' or 'rights'
+        2. identifierValue (str): the identifier value
+
+        __KWArgs__
+
+        * identifierType (str): the identifier type. If not provided any
+        identifier with the given value matches.
+
+        __Returns__
+
+        * (list): (path, node) tuples
+        """
+        query = 'SELECT DISTINCT r.path, e.kind, e.xml, e.id FROM identifiers i ' \
+            'JOIN entities e ON e.id = i.entity_id JOIN records r ON r.id = e.record_id ' \
+            'WHERE i.kind = ? AND i.value = ?'
+        params = [kind, identifierValue]
+        if identifierType is not None:
+            query += ' AND i.type = ?'
+            params.append(identifierType)
+        return self._entities('SELECT path, kind, xml FROM ({}) ORDER BY id'.format(query), params)
+
+    def find_events(self, eventType=None, since=None, before=None):
+        """
+        Finds events, in every record, by type and date.
+
+        __KWArgs__
+
+        * eventType (str): only events of this eventType
+        * since (str): only events whose eventDateTime is on or after this
+        * before (str): only events whose eventDateTime is before this
+
+        __Returns__
+
+        * (list): (path, Event) tuples, ordered by eventDateTime
+        """
+        conditions = []
+        params = []
+        for condition, value in (('v.event_type = ?', eventType),
+                                 ('v.event_datetime >= ?', since),
+                                 ('v.event_datetime < ?', before)):
+            if value is not None:
+                conditions.append(condition)
+                params.append(value)
+        query = 'SELECT r.path, e.kind, e.xml FROM events v ' \
+            'JOIN entities e ON e.id = v.entity_id JOIN records r ON r.id = e.record_id'
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        return self._entities(query + ' ORDER BY v.event_datetime, e.id', params)
+
+    def find_objects_by_fixity(self, messageDigest=None, messageDigestAlgorithm=None):
+        """
+        Finds objects, in every record, by their recorded fixity.
+
+        __KWArgs__
+
+        * messageDigest (str): only objects with this digest
+        * messageDigestAlgorithm (str): only objects with a digest computed
+        with this algorithm
+
+        __Returns__
+
+        * (list): (path, Object) tuples
+        """
+        conditions = []
+        params = []
+        for condition, value in (('f.digest = ?', messageDigest),
+                                 ('f.algorithm = ?', _algorithm_key(messageDigestAlgorithm))):
+            if value is not None:
+                conditions.append(condition)
+                params.append(value)
+        query = 'SELECT DISTINCT r.path, e.kind, e.xml, e.id FROM fixity f ' \
+            'JOIN entities e ON e.id = f.entity_id JOIN records r ON r.id = e.record_id'
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        return self._entities('SELECT path, kind, xml FROM ({}) ORDER BY id'.format(query), params)
+
+    def find_objects_not_checked_since(self, date, messageDigestAlgorithm=None,
+                                       eventType='fixity check'):
+        """
+        Finds objects with recorded fixity which haven't been checked since
+        a date: objects without an event of [eventType], linked to or from
+        the object, whose eventDateTime is on or after [date].
+
+        __Args__
+
+        1. date (str): the eventDateTime objects must have been checked since
+
+        __KWArgs__
+
+        * messageDigestAlgorithm (str): only objects with a digest computed
+        with this algorithm, eg. 'MD5'
+        * eventType (str): the eventType of the checks
+
+        __Returns__
+
+        * (list): (path, Object) tuples
+        """
+        # Each NOT EXISTS follows the links in one direction from the
+        # object, through the indexes. CROSS JOIN fixes the join order, so
+        # SQLite doesn't start from every event of [eventType] instead.
+        query = 'SELECT DISTINCT r.path, e.kind, e.xml, e.id FROM fixity f ' \
+            'JOIN entities e ON e.id = f.entity_id JOIN records r ON r.id = e.record_id ' \
+            'WHERE NOT EXISTS (SELECT 1 FROM identifiers i CROSS JOIN links l ' \
+            'ON l.kind = \'object\' AND l.value = i.value AND l.type = i.type ' \
+            'AND l.record_id = i.record_id CROSS JOIN events v ON v.entity_id = l.entity_id ' \
+            'WHERE i.entity_id = e.id AND v.event_type = ? AND v.event_datetime >= ?) ' \
+            'AND NOT EXISTS (SELECT 1 FROM links l CROSS JOIN identifiers i ' \
+            'ON i.kind = \'event\' AND i.value = l.value AND i.type = l.type ' \
+            'AND i.record_id = l.record_id CROSS JOIN events v ON v.entity_id = i.entity_id ' \
+            'WHERE l.entity_id = e.id AND l.kind = \'event\' ' \
+            'AND v.event_type = ? AND v.event_datetime >= ?)'
+        params = [eventType, date, eventType, date]
+        if messageDigestAlgorithm is not None:
+            query += ' AND f.algorithm = ?'
+            params.append(_algorithm_key(messageDigestAlgorithm))
+        return self._entities('SELECT path, kind, xml FROM ({}) ORDER BY id'.format(query), params)
+
+    def get_object_events(self, objID, objIDType=None):
+        """
+        Finds the events linked to or from an object, in every record.
+
+        __Args__
+
+        1. objID (str): the object's objectIdentifierValue
+
+        __KWArgs__
+
+        * objIDType (str): the object's objectIdentifierType
+
+        __Returns__
+
+        * (list): (path, Event) tuples, ordered by eventDateTime
+        """
+        condition = 'o.kind = \'object\' AND o.value = ?'
+        params = [objID]
+        if objIDType is not None:
+            condition += ' AND o.type = ?'
+            params.append(objIDType)
+        query = 'SELECT l.entity_id AS event_id FROM identifiers o JOIN links l ' \
+            'ON l.kind = \'object\' AND l.value = o.value AND l.type = o.type ' \
+            'AND l.record_id = o.record_id WHERE {0} ' \
+            'UNION SELECT i.entity_id FROM identifiers o JOIN links l ' \
+            'ON l.entity_id = o.entity_id AND l.kind = \'event\' JOIN identifiers i ' \
+            'ON i.kind = \'event\' AND i.value = l.value AND i.type = l.type ' \
+            'AND i.record_id = l.record_id WHERE {0}'.format(condition)
+        return self._entities(
+            'SELECT r.path, e.kind, e.xml FROM ({}) x JOIN events v ON v.entity_id = x.event_id '
+            'JOIN entities e ON e.id = x.event_id JOIN records r ON r.id = e.record_id '
+            'ORDER BY v.event_datetime, e.id'.format(query), params * 2)
@@ -0,0 +1,285 @@
+import inspect
+
+import pypremis.nodes
+from pypremis.indexes import LINKING_IDENTIFIERS, object_identifiers, \
+    event_identifiers, agent_identifiers, rights_identifiers
+from pypremis.nodes import *
+
+
+"""
+### Validating PremisNodes against the PREMIS data model ###
+
+1. **ValidationError** describes a single problem found in a node or record.
+2. **validate_node()** checks a node, and every node it contains, against
+rules compiled from the node classes.
+3. **validate_record()** checks every entity in a PremisRecord, and that
+the linking identifiers in the record point to entities it contains.
+
+The rules for each node class are compiled once, when this module is
+imported, from the classes themselves, following the conventions every node
+class follows:
+
+* a field is required if its __init__ argument has no default
+* a field is repeatable if the class has an add_ method for it
+* a field holds the node class named after it (objectIdentifier holds
+ObjectIdentifier nodes), or a str if there is no such class
+
+Validating a node then only walks its stored values, without calling any
+accessors, so validating a record is much cheaper than serializing it.
+"""
+
+
+class ValidationError(ValueError):
+    """
+    A problem found while validating a node or record.
+
+    Errors are collected and returned, rather than raised, by
+    validate_node() and validate_record().
+
+    __Attributes__
+
+    1. path is the location of the problem, eg. object[0]/objectIdentifier[0]
+    2. message describes the problem
+    3. node is the PremisNode the problem was found in
+    4. field is the name of the field at fault, or None
+    """
+    def __init__(self, path, message, node=None, field=None):
+        ValueError.__init__(self, '{}: {}'.format(path, message))
+        self.path = path
+        self.message = message
+        self.node = node
+        self.field = field
+
+    def __repr__(self):
+        return 'ValidationError({!r}, {!r})'.format(self.path, self.message)
+
+
+# Fields which aren't applicable to an Object of a given objectCategory, as
+# enforced by the Object setters.
+OBJECT_CATEGORY_FIELDS = {
+    'bitstream': ('preservationLevel', 'environmentFunction'),
+    'file': ('environmentFunction',),
+    'representation': ('objectCharacteristics', 'storage', 'signatureInformation', 'environmentFunction'),
+    'intellectual entity': ('objectCharacteristics', 'storage', 'signatureInformation'),
+}
+
+# Groups of fields of which at least one must be set, which are enforced by
+# the node __init__s rather than by required arguments.
+ONE_OF_FIELDS = {
+    Format: ('formatDesignation', 'formatRegistry'),
+    SignificantProperties: ('significantPropertiesValue', 'significantPropertiesExtension'),
+    EventOutcomeInformation: ('eventOutcome', 'eventOutcomeDetail'),
+    EventDetailInformation: ('eventDetail', 'eventDetailExtension'),
+    EventOutcomeDetail: ('eventOutcomeDetailNote', 'eventOutcomeDetailExtension'),
+    Rights: ('rightsStatement', 'rightsExtension'),
+}
+
+
+class _Rules(object):
+    """
+    The compiled rules for one node class.
+    """
+    __slots__ = ('fields', 'required', 'one_of')
+
+    def __init__(self, fields, required, one_of):
+        # (key, type, repeatable, nested, link) per field, in field_order
+        self.fields = fields
+        # (position, key) per required field
+        self.required = required
+        # the positions of a ONE_OF_FIELDS group, or None
+        self.one_of = one_of
+
+
+def _compile_rules(cls):
+    """
+    Compiles the rules for a node class from its __init__ signature, its
+    add_ methods and the node classes named after its fields.
+    """
+    order = cls.field_order
+    fields_by_argument = {ARGUMENT_ALIASES.get(x, x): x for x in order}
+    required = set()
+    for parameter in list(inspect.signature(cls.__init__).parameters.values())[1:]:
+        if parameter.default is not parameter.empty or \
+                parameter.kind in (parameter.VAR_POSITIONAL, parameter.VAR_KEYWORD):
+            continue
+        if parameter.name in fields_by_argument:
+            required.add(fields_by_argument[parameter.name])
+    fields = []
+    for key in order:
+        fieldType = getattr(pypremis.nodes, key[0].upper() + key[1:], None)
+        if not (isinstance(fieldType, type) and issubclass(fieldType, PremisNode)):
+            fieldType = str
+        fields.append((key, fieldType, hasattr(cls, 'add_' + key),
+                       fieldType is not str, fieldType in LINKING_IDENTIFIERS))
+    one_of = ONE_OF_FIELDS.get(cls)
+    if one_of is not None:
+        one_of = tuple(order.index(x) for x in one_of)
+    return _Rules(tuple(fields),
+                  tuple((i, x) for i, x in enumerate(order) if x in required),
+                  one_of)
+
+
+def _compile_all():
+    rules = {}
+    for cls in vars(pypremis.nodes).values():
+        if isinstance(cls, type) and issubclass(cls, PremisNode) and \
+                not issubclass(cls, (ExtendedNode, ExtensionNode)) and \
+                cls.field_order:
+            rules[cls] = _compile_rules(cls)
+    return rules
+
+
+RULES = _compile_all()
+
+
+def _render(path):
+    """
+    Renders a path, which is kept as nested (parent, key, index) tuples while
+    validating so that only the paths of problems are ever formatted.
+    """
+    parts = []
+    while isinstance(path, tuple):
+        path, key, index = path
+        parts.append('{}[{}]'.format(key, index) if index is not None else key)
+    parts.append(path)
+    return '/'.join(reversed(parts))
+
+
+def _error(errors, path, message, node, field=None):
+    errors.append(ValidationError(_render(path), message, node, field))
+
+
+def _check(node, path, errors, links):
+    """
+    Appends the problems found in [node] and its children to [errors], and
+    collects the (path, node) of each linking identifier found to [links].
+    """
+    rules = RULES.get(type(node))
+    if rules is None:
+        if isinstance(node, (ExtendedNode, ExtensionNode)):
+            for key, value in node._field_items():
+                for i, x in enumerate(value if isinstance(value, list) else [value]):
+                    if isinstance(x, PremisNode):
+                        _check(x, (path, key, i), errors, links)
+                    elif not isinstance(x, str):
+                        _error(errors, (path, key, i), 'extension content must be a '
+                               'str or node, not {}'.format(type(x).__name__), node, key)
+            return
+        _error(errors, path, '{} is not a PremisNode'.format(type(node).__name__), node)
+        return
+    values = node._values
+    if len(values) != len(rules.fields):
+        _error(errors, path, 'the node has been corrupted', node)
+        return
+    if rules.one_of is not None and all(values[x] is None for x in rules.one_of):
+        _error(errors, path, 'at least one of {} is required'.format(
+            ', '.join(node.field_order[x] for x in rules.one_of)), node)
+    inapplicable = ()
+    if type(node) is Object:
+        category = values[node._field_positions['objectCategory']]
+        inapplicable = OBJECT_CATEGORY_FIELDS.get(category, ())
+        if isinstance(category, str) and category not in OBJECT_CATEGORY_FIELDS:
+            _error(errors, (path, 'objectCategory', None),
+                   'unknown objectCategory: {}'.format(category), node, 'objectCategory')
+    for position, key in rules.required:
+        value = values[position]
+        if (value is None or value == []) and key not in inapplicable:
+            _error(errors, (path, key, None), 'required field is missing', node, key)
+    for value, (key, fieldType, repeatable, nested, link) in zip(values, rules.fields):
+        if value is None:
+            continue
+        if inapplicable and key in inapplicable:
+            _error(errors, (path, key, None), 'not applicable to objects of '
+                   'category {}'.format(category), node, key)
+        if isinstance(value, list):
+            if not repeatable and len(value) > 1:
+                _error(errors, (path, key, None), 'field is not repeatable but '
+                       'holds {} values'.format(len(value)), node, key)
+                continue
+            items = enumerate(value)
+        else:
+            items = ((None, value),)
+        for i, x in items:
+            if x.__class__ is not fieldType and not isinstance(x, fieldType):
+                _error(errors, (path, key, i), 'expected {}, not {}'.format(
+                    'str' if fieldType is str else fieldType.__name__,
+                    type(x).__name__), node, key)
+            elif nested:
+                if link:
+                    links.append(((path, key, i), x))
+                _check(x, (path, key, i), errors, links)
+    if node._extra:
+        for key in node._extra:
+            _error(errors, (path, key, None), 'field is not part of {}'.format(node.name), node, key)
+
+
+def validate_node(node, path=None):
+    """
+    Validates a node, and every node it contains, against the PREMIS data
+    model.
+
+    __Args__
+
+    1. node (PremisNode): the node to validate
+
+    __KWArgs__
+
+    * path (str): the path reported for the node. Defaults to its name.
+
+    __Returns__
+
+    * (list): a list of ValidationErrors, empty if the node is valid
+    """
+    errors = []
+    _check(node, path if path is not None else getattr(node, 'name', ''), errors, [])
+    return errors
+
+
+def validate_record(record, check_links=True):
+    """
+    Validates every entity in a PremisRecord against the PREMIS data model,
+    and optionally that every linking identifier in the record refers to an
+    entity in the record.
+
+    __Args__
+
+    1. record (PremisRecord): the record to validate
+
+    __KWArgs__
+
+    * check_links (bool): if True linkingObjectIdentifiers,
+    linkingEventIdentifiers, linkingAgentIdentifiers and
+    linkingRightsStatementIdentifiers must resolve to an entity in the record
+
+    __Returns__
+
+    * (list): a list of ValidationErrors, empty if the record is valid
+    """
+    errors = []
+    links = []
+    identifiers = {}
+    for name, nodes, entityType, key_func in (
+            ('object', record.get_object_list(), Object, object_identifiers),
+            ('event', record.get_event_list(), Event, event_identifiers),
+            ('agent', record.get_agent_list(), Agent, agent_identifiers),
+            ('rights', record.get_rights_list(), Rights, rights_identifiers)):
+        keys = set()
+        for i, node in enumerate(nodes):
+            path = '{}[{}]'.format(name, i)
+            if not isinstance(node, entityType):
+                _error(errors, path, 'expected {}, not {}'.format(
+                    entityType.__name__, type(node).__name__), node)
+                continue
+            _check(node, path, errors, links)
+            if check_links:
+                keys.update(key_func(node))
+        # Untyped links match any identifier with the same value.
+        identifiers[name] = keys | {(None, x[1]) for x in keys}
+    if check_links:
+        for path, link in links:
+            name, typeField, valueField = LINKING_IDENTIFIERS[type(link)]
+            key = (link._field_value(typeField), link._field_value(valueField))
+            if key not in identifiers[name]:
+                _error(errors, path, '{} {} {} does not refer to any {} in the record'.format(
+                    link.name, key[0], key[1], name), link)
+    return errors
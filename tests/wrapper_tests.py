@@ -1,11 +1,66 @@
+import hashlib
+import json
+import pickle
 import unittest
+from io import BytesIO
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import xml.etree.ElementTree as ET
 import xml.dom.minidom
-from copy import deepcopy
-from os import getcwd
+from copy import copy, deepcopy
+from os import getcwd, remove
 
 from pypremis.nodes import *
-from pypremis.lib import PremisRecord
+from pypremis.lib import PremisRecord, LazyNodeList, load_records
+from pypremis.factories import XMLNodeFactory, StreamingXMLNodeFactory, LinkingObjectIdentifierFactory, \
+    LinkingAgentIdentifierFactory, LinkingEventIdentifierFactory
+from pypremis.journal import EventJournal, splice_events
+from pypremis.audit import FixityAudit, normalize_algorithm
+from pypremis.validation import validate_node, validate_record, ValidationError
+from pypremis.store import PremisStore
+from pypremis.offsets import OffsetIndex, scan_offsets
+from pypremis import binary
+
+
+def build_example_record():
+    # A small record with every entity type, linked together, for the tests
+    # which exercise whole records rather than individual nodes.
+    objects = []
+    for i in range(2):
+        objectIdentifier = ObjectIdentifier('local', 'object_{}'.format(i))
+        formatDesignation = FormatDesignation('format_name')
+        objectCharacteristics = ObjectCharacteristics(Format(formatDesignation=formatDesignation))
+        objectCharacteristics.set_fixity(Fixity('MD5', 'digest_{}'.format(i)))
+        obj = Object(objectIdentifier, 'file', objectCharacteristics)
+        obj.set_storage(Storage(contentLocation=ContentLocation('filepath', 'file_{}.txt'.format(i))))
+        obj.set_linkingEventIdentifier(LinkingEventIdentifier('local', 'event_{}'.format(i)))
+        objects.append(obj)
+    events = []
+    for i in range(3):
+        event = Event(EventIdentifier('local', 'event_{}'.format(i)), 'ingestion', '2016-01-0{}T00:00:00'.format(i + 1))
+        event.set_linkingObjectIdentifier(LinkingObjectIdentifier('local', 'object_{}'.format(i % 2)))
+        event.set_linkingAgentIdentifier(LinkingAgentIdentifier('local', 'agent_0'))
+        events.append(event)
+    agent = Agent(AgentIdentifier('local', 'agent_0'))
+    agent.set_agentName('agent_name')
+    agentExtension = AgentExtension()
+    agentExtension.set_field('child', 'value')
+    agent.set_agentExtension(agentExtension)
+    rightsStatement = RightsStatement(RightsStatementIdentifier('local', 'rights_0'), 'license')
+    rightsStatement.set_linkingObjectIdentifier(LinkingObjectIdentifier('local', 'object_0'))
+    rights = Rights(rightsStatement=rightsStatement)
+    return PremisRecord(objects=objects, events=events, agents=[agent], rights=[rights])
+
+
+def count_events(record):
+    # A projection for load_records(), which must be defined at module level
+    return len(record.get_event_list())
+
+
+class UnseekableBytesIO(BytesIO):
+    # A stand in for a pipe or socket, which can only be read through once
+    def seekable(self):
+        return False
 
 
 class Test(unittest.TestCase):
@@ -956,10 +1011,811 @@ class Test(unittest.TestCase):
         record_2.write_to_file(getcwd() + '/testrights2.xml')
 
         self.assertEqual(record, record_2)
+        self.assertEqual(PremisRecord.from_json(record_2.to_json()), record_2)
+        self.assertEqual(PremisRecord.from_json(record.to_json()), record)
 
 #        record_2.get_rights_list()[0].add_rightsExtension('a')
 
 #        self.assertFalse(record == record_2)
 
+    def testStreamingFactory(self):
+        record = build_example_record()
+        path = getcwd() + '/teststreaming.xml'
+        record.write_to_file(path)
+        self.addCleanup(remove, path)
+
+        streamed = list(StreamingXMLNodeFactory(path))
+        self.assertEqual([x.get_name() for x in streamed], ['object', 'object', 'event', 'event', 'event', 'rights', 'agent'])
+        self.assertEqual(streamed, list(record))
+
+        factory = StreamingXMLNodeFactory(path)
+        self.assertEqual(list(factory.find_objects()), record.get_object_list())
+        self.assertEqual(list(factory.find_events()), record.get_event_list())
+        self.assertEqual(list(factory.find_agents()), record.get_agent_list())
+        self.assertEqual(list(factory.find_rights()), record.get_rights_list())
+
+        # A seekable file object is rewound for each read, others can only be read once
+        with open(path, 'rb') as f:
+            factory = StreamingXMLNodeFactory(f)
+            self.assertEqual(list(factory.find_objects()), record.get_object_list())
+            self.assertEqual(list(factory.find_events()), record.get_event_list())
+        with open(path, 'rb') as f:
+            factory = StreamingXMLNodeFactory(UnseekableBytesIO(f.read()))
+        self.assertEqual(list(factory.find_objects()), record.get_object_list())
+        self.assertRaises(ValueError, list, factory.find_events())
+
+    def testNodeHashing(self):
+        record = build_example_record()
+        record_2 = build_example_record()
+        obj = record.get_object_list()[0]
+        obj_2 = record_2.get_object_list()[0]
+        self.assertEqual(hash(obj), hash(obj_2))
+        self.assertEqual(len({obj, obj_2}), 1)
+        self.assertIn(obj_2, set(record))
+
+        # Changes to nested nodes clear the cached hashes of their parents
+        h = hash(obj)
+        obj.get_objectCharacteristics(0).get_fixity(0).set_messageDigest('changed')
+        self.assertNotEqual(hash(obj), h)
+        self.assertNotEqual(obj, obj_2)
+        self.assertFalse(record == record_2)
+        obj_2.get_objectCharacteristics(0).get_fixity(0).set_messageDigest('changed')
+        self.assertEqual(obj, obj_2)
+        self.assertEqual(record, record_2)
+
+        # Repeatable fields compare without regard to order
+        agent = Agent([AgentIdentifier('a', '1'), AgentIdentifier('b', '2')])
+        agent_2 = Agent([AgentIdentifier('b', '2'), AgentIdentifier('a', '1')])
+        self.assertEqual(agent, agent_2)
+        self.assertEqual(hash(agent), hash(agent_2))
+        agent_2.add_agentIdentifier(AgentIdentifier('a', '1'))
+        self.assertNotEqual(agent, agent_2)
+        self.assertNotEqual(agent_2, agent)
+
+        record_2.add_event(deepcopy(record_2.get_event_list()[0]))
+        self.assertFalse(record == record_2)
+
+        # A node shared by many (here equal) parents clears all of their hashes
+        link = LinkingAgentIdentifier('local', 'agent_0')
+        events = [Event(EventIdentifier('local', 'event'), 'ingestion', '2016') for i in range(3)]
+        for event in events:
+            event.add_linkingAgentIdentifier(link)
+        self.assertEqual(len(link._get_parents()), 3)
+        hashes = [hash(x) for x in events]
+        link.set_linkingAgentIdentifierValue('agent_1')
+        self.assertTrue(all(hash(x) != h for x, h in zip(events, hashes)))
+        del events[0]
+        self.assertEqual(len(link._get_parents()), 2)
+
+        # Lists returned by getters can be changed in place
+        obj = Object(ObjectIdentifier('local', 'a'), 'file', ObjectCharacteristics(Format(formatDesignation=FormatDesignation('name'))))
+        built = Object(ObjectIdentifier('local', 'a'), 'file', ObjectCharacteristics(Format(formatDesignation=FormatDesignation('name'))))
+        self.assertEqual(obj, built)
+        identifier = ObjectIdentifier('local', 'b')
+        obj.get_objectIdentifier().append(identifier)
+        built.add_objectIdentifier(ObjectIdentifier('local', 'b'))
+        self.assertEqual(obj, built)
+        self.assertEqual(len({obj, built}), 1)
+        identifier.set_objectIdentifierValue('c')
+        self.assertNotEqual(obj, built)
+        obj.get_objectIdentifier().pop()
+        built.get_objectIdentifier()[1:] = []
+        self.assertEqual(obj, built)
+        self.assertIsInstance(obj.get_objectIdentifier(), FieldList)
+        self.assertIs(type(pickle.loads(pickle.dumps(obj))._values[0]), list)
+        other = Object(ObjectIdentifier('local', 'd'), 'file', ObjectCharacteristics(Format(formatDesignation=FormatDesignation('name'))))
+        other.set_objectIdentifier(obj.get_objectIdentifier())
+        self.assertIsNot(other.get_objectIdentifier(), obj.get_objectIdentifier())
+
+    def testLazyRecord(self):
+        record = build_example_record()
+        path = getcwd() + '/testlazy.xml'
+        record.write_to_file(path)
+        self.addCleanup(remove, path)
+
+        lazy_record = PremisRecord(frompath=path, lazy=True)
+        events = lazy_record.get_event_list()
+        self.assertIsInstance(events, LazyNodeList)
+        self.assertFalse(events.is_loaded())
+
+        self.assertEqual(lazy_record.get_object_list()[1], record.get_object_list()[1])
+        self.assertFalse(events.is_loaded())
+        self.assertEqual(len(events), 3)
+        self.assertTrue(events.is_loaded())
+        self.assertFalse(isinstance(events._items[0], PremisNode))
+
+        self.assertEqual(events[-1], record.get_event_list()[-1])
+        self.assertTrue(isinstance(events._items[-1], PremisNode))
+        self.assertFalse(isinstance(events._items[0], PremisNode))
+
+        lazy_record.add_event(Event(EventIdentifier('local', 'event_3'), 'validation', '2016-01-04T00:00:00'))
+        self.assertEqual(len(events), 4)
+        self.assertEqual(events[3].get_eventType(), 'validation')
+        self.assertFalse(lazy_record == record)
+        record.add_event(Event(EventIdentifier('local', 'event_3'), 'validation', '2016-01-04T00:00:00'))
+        self.assertEqual(lazy_record, record)
+
+    def testIdentifierLookups(self):
+        record = build_example_record()
+        self.assertIs(record.get_object('object_1'), record.get_object_list()[1])
+        self.assertIs(record.get_object('object_1', 'local'), record.get_object_list()[1])
+        self.assertIsNone(record.get_object('object_1', 'not_local'))
+        self.assertIs(record.get_event('event_2'), record.get_event_list()[2])
+        self.assertIs(record.get_agent('agent_0'), record.get_agent_list()[0])
+        self.assertIs(record.get_rights('rights_0', 'local'), record.get_rights_list()[0])
+        self.assertIsNone(record.get_event('event_3'))
+
+        event = Event(EventIdentifier('local', 'event_3'), 'validation', '2016-01-04T00:00:00')
+        record.add_event(event)
+        self.assertIs(record.get_event('event_3'), event)
+
+        record.get_event_list().reverse()
+        self.assertIs(record.get_event('event_0'), record.get_event_list()[-1])
+
+        event.get_eventIdentifier().set_eventIdentifierValue('event_4')
+        record.reindex()
+        self.assertIs(record.get_event('event_4'), event)
+        self.assertIsNone(record.get_event('event_3'))
+
+        path = getcwd() + '/testlookups.xml'
+        record.write_to_file(path)
+        self.addCleanup(remove, path)
+        lazy_record = PremisRecord(frompath=path, lazy=True)
+        self.assertEqual(lazy_record.get_event('event_4'), event)
+        self.assertEqual(sum(isinstance(x, PremisNode) for x in lazy_record.get_event_list().get_items()), 1)
+
+    def testStreamingWriter(self):
+        record = build_example_record()
+        extension = ObjectCharacteristicsExtension()
+        extension.set_field('{http://example.com/ext}checksum', 'a < b & "c"')
+        extension.add_to_field('{http://example.com/ext}note', '')
+        nested = ExtensionNode()
+        nested.set_field('{http://purl.org/dc/elements/1.1/}title', 'title')
+        extension.set_field('description', nested)
+        record.get_object_list()[0].get_objectCharacteristics()[0].set_objectCharacteristicsExtension(extension)
+        record.add_object(Object(ObjectIdentifier('local', 'object_\u00e9'), 'bitstream', ObjectCharacteristics(Format(formatDesignation=FormatDesignation('name')))))
+
+        expected = ET.tostring(record.to_tree().getroot(), encoding='UTF-8')
+        self.assertEqual(record.to_xml(), expected)
+        self.assertEqual(record.to_xml(encoding='unicode'), ET.tostring(record.to_tree().getroot(), encoding='unicode'))
+        self.assertEqual(record.to_xml(encoding='us-ascii'), ET.tostring(record.to_tree().getroot(), encoding='us-ascii'))
+
+        treepath = getcwd() + '/testwriter_tree.xml'
+        path = getcwd() + '/testwriter.xml'
+        record.to_tree().write(treepath, xml_declaration=True, encoding='UTF-8')
+        self.addCleanup(remove, treepath)
+        record.write_to_file(path)
+        self.addCleanup(remove, path)
+        with open(treepath, 'rb') as f:
+            expected = f.read()
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), expected)
+
+        extension.set_field('{http://example.com/ext}note', 'note')
+        record.write_to_file(path)
+        self.assertEqual(PremisRecord(frompath=path), record)
+
+        empty = PremisRecord(events=[Event(EventIdentifier('local', 'event_0'), 'ingestion', '2016-01-01T00:00:00')])
+        empty.get_event_list().pop()
+        self.assertEqual(empty.to_xml(), ET.tostring(empty.to_tree().getroot(), encoding='UTF-8'))
+
+    def testXMLFieldOrder(self):
+        obj = Object(ObjectIdentifier('local', 'object_0'), 'file', ObjectCharacteristics(Format(formatDesignation=FormatDesignation('name'))))
+        obj.set_linkingEventIdentifier(LinkingEventIdentifier('local', 'event_0'))
+        obj.set_originalName('original_name')
+        obj.set_storage(Storage(contentLocation=ContentLocation('filepath', 'file.txt')))
+        obj._set_field('notInPremis', 'value', override=True)
+        obj.add_objectIdentifier(ObjectIdentifier('local', 'object_1'))
+        expected = ['objectIdentifier', 'objectIdentifier', 'objectCharacteristics',
+                    'originalName', 'storage', 'linkingEventIdentifier']
+        self.assertEqual([x.tag for x in obj.toXML()], ['premis:' + x for x in expected])
+
+    def testCompactNodes(self):
+        record = build_example_record()
+        for node in list(record) + [Fixity('MD5', 'digest'), EventIdentifier('local', 'event_0')]:
+            self.assertFalse(hasattr(node, '__dict__'))
+        identifier = ObjectIdentifier('local', 'object_0')
+        fields = identifier.fields
+        self.assertEqual(list(fields), ['objectIdentifierType', 'objectIdentifierValue'])
+        self.assertEqual(len(fields), 2)
+        fields['objectIdentifierValue'] = 'object_1'
+        self.assertEqual(identifier.get_objectIdentifierValue(), 'object_1')
+        del fields['objectIdentifierValue']
+        self.assertNotIn('objectIdentifierValue', identifier.fields)
+        self.assertRaises(KeyError, identifier.get_objectIdentifierValue)
+        identifier.set_objectIdentifierValue('object_0')
+        identifier._set_field('notInPremis', 'value', override=True)
+        self.assertEqual(identifier.fields['notInPremis'], 'value')
+        self.assertEqual(identifier, deepcopy(identifier))
+
+        obj = record.get_object_list()[0]
+        self.assertEqual(pickle.loads(pickle.dumps(obj)), obj)
+        # Nodes pickled before fields were kept in slots still load
+        legacy = Fixity.__new__(Fixity)
+        legacy.__setstate__({'name': 'fixity', '_hash': None, '_parents': None,
+                             'fields': OrderedDict([('messageDigest', 'digest'), ('messageDigestAlgorithm', 'MD5')])})
+        self.assertEqual(legacy, Fixity('MD5', 'digest'))
+
+    def testLoadRecords(self):
+        paths = []
+        for i in range(5):
+            record = build_example_record()
+            for j in range(i):
+                record.add_event(Event(EventIdentifier('local', 'extra_{}'.format(j)), 'validation', '2016-02-01T00:00:00'))
+            path = getcwd() + '/testbatch_{}.xml'.format(i)
+            record.write_to_file(path)
+            self.addCleanup(remove, path)
+            paths.append(path)
+
+        results = list(load_records(iter(paths), max_workers=2, chunksize=2))
+        self.assertEqual([x[0] for x in results], paths)
+        for path, record in results:
+            self.assertEqual(record, PremisRecord(frompath=path))
+        self.assertEqual(results[0][1].get_event('event_1').get_eventType(), 'ingestion')
+
+        results = load_records(paths, max_workers=2, chunksize=1, ordered=False, projection=count_events)
+        self.assertEqual(sorted(results), [(path, 3 + i) for i, path in enumerate(paths)])
+        self.assertRaises(ValueError, list, load_records(paths, chunksize=0))
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            results = load_records(paths, max_workers=1, projection=count_events, executor=executor)
+            self.assertEqual(list(results), [(path, 3 + i) for i, path in enumerate(paths)])
+
+    def testEventJournal(self):
+        record = build_example_record()
+        path = getcwd() + '/testJournal.xml'
+        record.write_to_file(path)
+        self.addCleanup(remove, path)
+        with open(path, 'rb') as f:
+            original = f.read()
+
+        journal = EventJournal(path, journalpath=getcwd() + '/testJournal.xml.journal')
+        events = []
+        for i in range(3):
+            event = Event(EventIdentifier('local', 'check_{}'.format(i)), 'fixity check', '2016-02-01T00:00:00')
+            event.set_eventDetailInformation(EventDetailInformation(eventDetail='checked <{}> & é'.format(i)))
+            event.set_linkingObjectIdentifier(LinkingObjectIdentifier('local', 'object_0'))
+            events.append(event)
+        journal.add_event(events[0])
+        journal.add_events(events[1:], sync=True)
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), original)
+        self.assertEqual(journal.get_event_list(), events)
+        self.assertEqual(len(journal), 3)
+
+        for event in events:
+            record.add_event(event)
+        self.assertEqual(journal.to_record(), record)
+        self.assertEqual(journal.compact(), 3)
+        self.assertEqual(len(journal), 0)
+        self.assertEqual(PremisRecord(frompath=path), record)
+        self.assertEqual(journal.compact(), 0)
+
+        extra = Event(EventIdentifier('local', 'check_3'), 'validation', '2016-02-02T00:00:00')
+        splice_events(path, [extra])
+        record.add_event(extra)
+        self.assertEqual(PremisRecord(frompath=path), record)
+        self.assertRaises(TypeError, journal.add_event, record.get_object_list()[0])
+
+    def testComputeFixity(self):
+        path = getcwd() + '/testFixity.bin'
+        data = bytes(range(256)) * 5000
+        with open(path, 'wb') as f:
+            f.write(data)
+        try:
+            for use_mmap in (False, True):
+                fixities = compute_fixity(path, messageDigestOriginator='pypremis',
+                                          chunksize=4096, use_mmap=use_mmap)
+                self.assertEqual([x.get_messageDigestAlgorithm() for x in fixities],
+                                 ['MD5', 'SHA-1', 'SHA-256', 'SHA-512'])
+                for fixity, name in zip(fixities, ['md5', 'sha1', 'sha256', 'sha512']):
+                    self.assertEqual(fixity.get_messageDigest(), hashlib.new(name, data).hexdigest())
+                    self.assertEqual(fixity.get_messageDigestOriginator(), 'pypremis')
+            with open(path, 'rb') as f:
+                fixity, = compute_fixity(f, ['SHA-256'])
+            self.assertEqual(fixity, Fixity('SHA-256', hashlib.sha256(data).hexdigest()))
+        finally:
+            remove(path)
+        self.assertRaises(ValueError, compute_fixity, path, ['CRC32'])
+
+    def testFixityAudit(self):
+        contents = [b'first file', b'second file', b'third file']
+        paths = ['testAudit_{}.bin'.format(i) for i in range(3)]
+        objects = []
+        for i, (path, content) in enumerate(zip(paths, contents)):
+            with open(getcwd() + '/' + path, 'wb') as f:
+                f.write(content)
+            objectCharacteristics = ObjectCharacteristics(Format(formatDesignation=FormatDesignation('text/plain')))
+            objectCharacteristics.add_fixity(Fixity('MD5', hashlib.md5(content).hexdigest()))
+            digest = hashlib.sha256(content).hexdigest() if i != 1 else '0' * 64
+            objectCharacteristics.add_fixity(Fixity('SHA-256', digest.upper()))
+            obj = Object(ObjectIdentifier('local', 'object_{}'.format(i)), 'file', objectCharacteristics)
+            obj.set_storage(Storage(contentLocation=ContentLocation('filepath', path)))
+            objects.append(obj)
+        missing = Object(ObjectIdentifier('local', 'missing'), 'file', deepcopy(objects[0].get_objectCharacteristics(0)))
+        missing.set_storage(Storage(contentLocation=ContentLocation('filepath', 'testAudit_missing.bin')))
+        unlocated = Object(ObjectIdentifier('local', 'unlocated'), 'file', deepcopy(objects[0].get_objectCharacteristics(0)))
+        record = PremisRecord(objects=objects + [missing, unlocated])
+
+        try:
+            audit = FixityAudit(record, max_workers=2, max_in_flight=2, root=getcwd(),
+                                linkingAgentIdentifier=LinkingAgentIdentifier('local', 'pypremis'))
+            results = list(audit.run(record_events=True))
+        finally:
+            for path in paths:
+                remove(getcwd() + '/' + path)
+        self.assertEqual([x[0] for x in results], record.get_object_list())
+        outcomes = [x[1].get_eventOutcomeInformation(0).get_eventOutcome() for x in results]
+        self.assertEqual(outcomes, ['success', 'failure', 'success', 'failure', 'failure'])
+        for obj, event in results:
+            self.assertEqual(event.get_eventType(), 'fixity check')
+            self.assertEqual(event.get_linkingObjectIdentifier(0).get_linkingObjectIdentifierValue(),
+                             obj.get_objectIdentifier(0).get_objectIdentifierValue())
+            eventID = event.get_eventIdentifier().get_eventIdentifierValue()
+            self.assertIs(record.get_event(eventID), event)
+            self.assertEqual(obj.get_linkingEventIdentifier(0).get_linkingEventIdentifierValue(), eventID)
+        self.assertEqual(results[0][1].get_linkingAgentIdentifier(0), audit.linkingAgentIdentifier)
+        self.assertIsNot(results[0][1].get_linkingAgentIdentifier(0), results[1][1].get_linkingAgentIdentifier(0))
+        self.assertEqual(audit.objects_checked, 5)
+        self.assertEqual(audit.failures, 3)
+        self.assertEqual(audit.bytes_read, sum(len(x) for x in contents))
+        self.assertGreater(audit.get_throughput(), 0)
+        self.assertIn('5 objects checked, 3 failed', audit.report())
+
+        # Algorithms recorded in other spellings are still checked
+        self.assertEqual([normalize_algorithm(x) for x in ('md5', 'sha256', 'sha-256', ' Sha-1', 'crc32')],
+                         ['MD5', 'SHA-256', 'SHA-256', 'SHA-1', None])
+        path = getcwd() + '/testAudit_spelling.bin'
+        with open(path, 'wb') as f:
+            f.write(contents[0])
+        self.addCleanup(remove, path)
+        objectCharacteristics = ObjectCharacteristics(Format(formatDesignation=FormatDesignation('text/plain')))
+        objectCharacteristics.add_fixity(Fixity('sha256', hashlib.sha256(contents[0]).hexdigest()))
+        objectCharacteristics.add_fixity(Fixity('md5', hashlib.md5(contents[0]).hexdigest()))
+        obj = Object(ObjectIdentifier('local', 'spelling'), 'file', objectCharacteristics)
+        obj.set_storage(Storage(contentLocation=ContentLocation('filepath', path)))
+        (obj, event), = FixityAudit(PremisRecord(objects=[obj])).run()
+        self.assertEqual(event.get_eventOutcomeInformation(0).get_eventOutcome(), 'success')
+
+    def testValidation(self):
+        record = build_example_record()
+        self.assertTrue(record.validate())
+        self.assertEqual(record.get_validation_errors(), [])
+        self.assertEqual(validate_node(record.get_object_list()[0]), [])
+
+        fixity = record.get_object_list()[1].get_objectCharacteristics(0).get_fixity(0)
+        fixity._remove_field('messageDigest')
+        event = record.get_event_list()[2]
+        event.add_linkingAgentIdentifier(LinkingAgentIdentifier('local', 'agent_missing'))
+        event._set_field('eventType', ['ingestion', 'validation'])
+        event.get_eventIdentifier()._set_field('eventIdentifierValue', EventIdentifier('local', 'nested'))
+        record.get_agent_list()[0]._set_field('notAField', 'value', override=True)
+
+        errors = record.get_validation_errors()
+        self.assertFalse(record.validate())
+        self.assertTrue(all(isinstance(x, ValidationError) for x in errors))
+        self.assertEqual(sorted(x.path for x in errors), [
+            'agent[0]/notAField',
+            'event[2]/eventIdentifier/eventIdentifierValue',
+            'event[2]/eventType',
+            'event[2]/linkingAgentIdentifier[1]',
+            'object[1]/objectCharacteristics[0]/fixity[0]/messageDigest'
+        ])
+        missing = [x for x in errors if x.field == 'messageDigest'][0]
+        self.assertIs(missing.node, fixity)
+        self.assertEqual(missing.message, 'required field is missing')
+        self.assertEqual(len(validate_record(record, check_links=False)), 4)
+        self.assertTrue(record.validate(check_links=False) is False)
+
+        obj = Object(ObjectIdentifier('local', 'bitstream'), 'bitstream',
+                     deepcopy(record.get_object_list()[0].get_objectCharacteristics(0)))
+        self.assertEqual(validate_node(obj), [])
+        obj._set_field('preservationLevel', [PreservationLevel('full')])
+        self.assertEqual([x.path for x in validate_node(obj)], ['object/preservationLevel'])
+
+        # Fields set by misspelled __init__ arguments are still required
+        link = LinkingEventIdentifier('local', 'event_0')
+        link._remove_field('linkingEventIdentifierType')
+        self.assertEqual([x.path for x in validate_node(link)], ['linkingEventIdentifier/linkingEventIdentifierType'])
+
+    def testLinkIndex(self):
+        record = build_example_record()
+        self.assertEqual(record.get_dangling_links(), [])
+        self.assertEqual(record.get_orphans(), [])
+        links = record.get_link_index()
+        self.assertEqual(links.get_links('event', 'event_0'), [('agent', 'local', 'agent_0'), ('object', 'local', 'object_0')])
+        self.assertEqual(links.get_links('rights', 'rights_0', 'local'), [('object', 'local', 'object_0')])
+        linking = links.get_linking_entities('object', 'object_0')
+        self.assertEqual([x[0] for x in linking], ['event', 'event', 'rights'])
+        self.assertEqual([x[1] for x in linking[:2]], [record.get_event('event_0'), record.get_event('event_2')])
+        self.assertEqual(links.resolve('agent', 'agent_0', 'local'), record.get_agent_list())
+        self.assertEqual(links.resolve('agent', 'agent_0', 'other'), [])
+
+        # Entities added to the record are indexed as they're added
+        lonely = Event(EventIdentifier('local', 'lonely'), 'validation', '2016-02-01T00:00:00')
+        record.add_event(lonely)
+        broken = Event(EventIdentifier('local', 'broken'), 'validation', '2016-02-01T00:00:00')
+        broken.add_linkingAgentIdentifier(LinkingAgentIdentifier('local', 'agent_missing'))
+        broken.add_linkingObjectIdentifier(LinkingObjectIdentifier('local', 'object_1'))
+        record.add_event(broken)
+        self.assertIs(record.get_link_index(), links)
+        self.assertEqual(record.get_dangling_links(), [('event', broken, ('agent', 'local', 'agent_missing'))])
+        self.assertEqual(record.get_orphans(), [('event', lonely)])
+        self.assertIn(('event', broken), links.get_linking_entities('object', 'object_1'))
+
+        # Reordering a list is caught, and the index rebuilt
+        record.get_event_list().reverse()
+        self.assertEqual(links.resolve('event', 'event_0'), [record.get_event('event_0')])
+        self.assertEqual(links.get_links('event', 'event_0'), [('agent', 'local', 'agent_0'), ('object', 'local', 'object_0')])
+        self.assertEqual([x[1] for x in links.get_linking_entities('object', 'object_1')],
+                         [broken, record.get_event('event_1')])
+        record.get_event_list().reverse()
+        self.assertEqual(record.get_dangling_links(), [('event', broken, ('agent', 'local', 'agent_missing'))])
+
+        path = getcwd() + '/testLinkIndex.xml'
+        record.write_to_file(path)
+        self.addCleanup(remove, path)
+        lazy = PremisRecord(frompath=path, lazy=True)
+        self.assertEqual(lazy.get_dangling_links(), record.get_dangling_links())
+        self.assertEqual(lazy.get_orphans(), record.get_orphans())
+
+    def testProvenance(self):
+        record = build_example_record()
+        provenance = record.get_provenance('object_0')
+        self.assertEqual([x[0].get_eventIdentifier().get_eventIdentifierValue() for x in provenance],
+                         ['event_0', 'event_2'])
+        self.assertEqual(provenance[0][1], record.get_agent_list())
+        self.assertIs(provenance[0][2], record.get_object('object_0'))
+        record.get_event_list().reverse()
+        self.assertEqual(record.get_provenance('object_0'), provenance)
+        record.get_event_list().reverse()
+
+        # object_1 is derived from object_0, and links to an earlier event
+        # which only the object links to
+        source = Object(ObjectIdentifier('local', 'object_2'), 'file',
+                        deepcopy(record.get_object('object_0').get_objectCharacteristics(0)))
+        record.add_object(source)
+        record.get_object('object_0').add_relationship(
+            Relationship('derivation', 'has source', RelatedObjectIdentifier('local', 'object_2')))
+        record.get_object('object_1').add_relationship(
+            Relationship('derivation', 'has source', RelatedObjectIdentifier('local', 'object_0')))
+        creation = Event(EventIdentifier('local', 'creation'), 'creation', '2015-12-31T00:00:00')
+        record.add_event(creation)
+        record.add_event(Event(EventIdentifier('local', 'unrelated'), 'creation', '2015-01-01T00:00:00'))
+        source.add_linkingEventIdentifier(LinkingEventIdentifier('local', 'creation'))
+        record.reindex()
+
+        provenance = record.get_provenance('object_1', 'local')
+        self.assertEqual([x[0].get_eventIdentifier().get_eventIdentifierValue() for x in provenance],
+                         ['creation', 'event_0', 'event_1', 'event_2'])
+        self.assertEqual(provenance[0][1], [])
+        self.assertIs(provenance[0][2], source)
+        self.assertEqual(len(record.get_provenance('object_1', follow_relationships=False)), 1)
+        self.assertEqual(len(record.get_provenance('object_1', relationshipTypes=['structural'])), 1)
+        self.assertEqual(record.get_provenance('object_missing'), [])
+
+    def testPremisStore(self):
+        record = build_example_record()
+        record.add_event(Event(EventIdentifier('local', 'check_0'), 'fixity check', '2016-03-01T00:00:00',
+                               linkingObjectIdentifier=LinkingObjectIdentifier('local', 'object_0')))
+        store = PremisStore()
+        store.add_record(record, path='a.xml')
+        self.assertEqual(store.get_record('a.xml'), record)
+        self.assertIn('a.xml', store)
+        self.assertRaises(ValueError, store.add_record, record)
+        self.assertRaises(KeyError, store.get_record, 'missing.xml')
+
+        self.assertEqual(store.get_entities('agent', 'agent_0'), [('a.xml', record.get_agent_list()[0])])
+        self.assertEqual(store.get_entities('object', 'object_0', 'other'), [])
+        self.assertEqual([x[1].get_eventIdentifier().get_eventIdentifierValue()
+                          for x in store.get_object_events('object_0')], ['event_0', 'event_2', 'check_0'])
+        self.assertEqual(len(store.find_events('ingestion', since='2016-01-02T00:00:00')), 2)
+        self.assertEqual(store.find_objects_by_fixity('digest_1', 'MD5'), [('a.xml', record.get_object('object_1'))])
+        self.assertEqual(store.find_objects_by_fixity(messageDigestAlgorithm='md5'),
+                         store.find_objects_by_fixity(messageDigestAlgorithm='MD5'))
+        self.assertEqual(len(store.find_objects_by_fixity(messageDigestAlgorithm='md5')), 2)
+        self.assertEqual(store.find_objects_by_fixity(messageDigestAlgorithm='sha256'), [])
+        self.assertEqual(store.find_objects_not_checked_since('2016-02-01T00:00:00', 'MD5'),
+                         [('a.xml', record.get_object('object_1'))])
+        self.assertEqual(store.find_objects_not_checked_since('2016-02-01T00:00:00', ' md5'),
+                         [('a.xml', record.get_object('object_1'))])
+        self.assertEqual(len(store.find_objects_not_checked_since('2016-04-01T00:00:00')), 2)
+
+        # Storing under the same path replaces the record
+        store.add_record(build_example_record(), path='a.xml')
+        self.assertEqual(len(store), 1)
+        self.assertEqual(len(store.find_objects_not_checked_since('2016-02-01T00:00:00')), 2)
+        path = getcwd() + '/teststore.xml'
+        record.write_to_file(path)
+        self.addCleanup(remove, path)
+        self.assertEqual(store.add_files([path], max_workers=1), 1)
+        self.assertEqual(store.get_paths(), ['a.xml', path])
+        self.assertEqual(len(store.find_objects_by_fixity('digest_0')), 2)
+        store.remove_record('a.xml')
+        self.assertEqual(store.find_objects_by_fixity('digest_0'), [(path, record.get_object('object_0'))])
+        self.assertRaises(KeyError, store.remove_record, 'a.xml')
+        store.close()
+
+    def testBinarySerialization(self):
+        record = build_example_record()
+        extension = ExtensionNode()
+        extension.set_name('{http://example.com/ns}root')
+        extension.set_field('child', ['value', 'value'])
+        nested = ExtensionNode()
+        nested.set_field('leaf', 'caf\u00e9')
+        extension.add_to_field('nested', nested)
+        record.get_agent_list()[0].get_agentExtension(0).add_to_field('content', extension)
+        data = binary.dumps(record)
+        self.assertEqual(binary.loads(data), record)
+        self.assertLess(len(data), len(record.to_xml()))
+
+        # Loaded nodes are adopted, so changes still clear cached hashes
+        loaded = binary.loads(data)
+        obj = loaded.get_object('object_0')
+        hash(obj)
+        obj.get_objectIdentifier(0).set_objectIdentifierValue('changed')
+        self.assertNotEqual(obj, record.get_object('object_0'))
+
+        node = record.get_event_list()[0]
+        path = getcwd() + '/testbinary.bin'
+        binary.dump(node, path)
+        self.assertEqual(binary.load(path), node)
+        remove(path)
+        self.assertRaises(ValueError, binary.loads, data[:-1])
+        self.assertRaises(ValueError, binary.loads, b'not premis')
+        self.assertRaises(ValueError, binary.loads, binary.MAGIC)
+        self.assertRaises(ValueError, binary.loads, data[:len(binary.MAGIC) + 3])
+        self.assertRaises(TypeError, binary.dumps, 'not a node')
+
+    def testJSONSerialization(self):
+        record = build_example_record()
+        extension = ExtensionNode()
+        extension.set_name('{http://example.com/ns}root')
+        extension.set_field('child', 'value')
+        extension.add_to_field('identifier', AgentIdentifier('local', 'agent_1'))
+        record.get_agent_list()[0].get_agentExtension(0).add_to_field('content', extension)
+        self.assertEqual(PremisRecord.from_json(record.to_json()), record)
+        self.assertEqual(record.to_json(), json.dumps(record.to_dict()))
+        self.assertEqual(PremisRecord.from_dict(json.loads(record.to_json(indent=2))), record)
+
+        obj = record.get_object('object_0')
+        data = obj.to_dict()
+        self.assertEqual(list(data), ['objectIdentifier', 'objectCategory', 'objectCharacteristics',
+                                      'storage', 'linkingEventIdentifier'])
+        self.assertEqual(data['objectCategory'], 'file')
+        self.assertEqual(data['objectIdentifier'], [{'objectIdentifierType': 'local',
+                                                     'objectIdentifierValue': 'object_0'}])
+        self.assertEqual(Object.from_json(obj.to_json()), obj)
+        content = record.get_agent_list()[0].to_dict()['agentExtension'][0]['content'][0]
+        self.assertEqual(content['@name'], '{http://example.com/ns}root')
+        self.assertEqual(content['identifier'][0]['@type'], 'AgentIdentifier')
+
+        event = record.get_event_list()[0]
+        self.assertEqual(PremisNode.from_dict(dict(event.to_dict(), **{'@type': 'Event'})), event)
+        link = LinkingEventIdentifier('local', 'event_0')
+        self.assertEqual(LinkingEventIdentifier.from_json(link.to_json()), link)
+        self.assertRaises(ValueError, Event.from_dict, dict(event.to_dict(), unknown='value'))
+        self.assertRaises(ValueError, PremisNode.from_dict, event.to_dict())
+        self.assertRaises(TypeError, Event.from_dict, {'eventType': 'ingestion'})
+        self.assertRaises(ValueError, PremisRecord.from_dict, {'entities': []})
+
+    def testPicklingAndCopying(self):
+        record = build_example_record()
+        record.get_object('object_0').get_objectIdentifier(0)._set_field('notInPremis', 'value', override=True)
+        loaded = pickle.loads(pickle.dumps(record))
+        self.assertEqual(loaded, record)
+        self.assertEqual(loaded.get_object('object_0').get_objectIdentifier(0).fields['notInPremis'], 'value')
+        self.assertEqual(deepcopy(record), record)
+
+        # Copies are independent, and changes to them clear their cached hashes
+        for clone in (pickle.loads(pickle.dumps(record.get_object('object_1'))),
+                      deepcopy(record.get_object('object_1'))):
+            self.assertEqual(hash(clone), hash(record.get_object('object_1')))
+            clone.get_objectCharacteristics(0).get_fixity(0).set_messageDigest('changed')
+            self.assertNotEqual(clone, record.get_object('object_1'))
+            self.assertEqual(record.get_object('object_1').get_objectCharacteristics(0).get_fixity(0).get_messageDigest(),
+                             'digest_1')
+
+        # Nodes shared within a copied tree stay shared
+        identifier = ObjectIdentifier('local', 'shared')
+        obj = Object([identifier, identifier], 'file', deepcopy(record.get_object('object_0').get_objectCharacteristics(0)))
+        for clone in (deepcopy(obj), pickle.loads(pickle.dumps(obj))):
+            self.assertIs(clone.get_objectIdentifier(0), clone.get_objectIdentifier(1))
+            self.assertIsNot(clone.get_objectIdentifier(0), identifier)
+
+        shallow = copy(obj)
+        shallow.add_objectIdentifier(ObjectIdentifier('local', 'other'))
+        self.assertEqual(len(obj.get_objectIdentifier()), 2)
+        self.assertIs(shallow.get_objectCharacteristics(0), obj.get_objectCharacteristics(0))
+        hash(shallow)
+        shallow.get_objectIdentifier(0).set_objectIdentifierValue('changed')
+        self.assertIsNone(shallow._hash)
+
+    def testBulkLinkingFactories(self):
+        record = build_example_record()
+        objects = record.get_object_list()
+        event = Event(EventIdentifier('local', 'ingest'), 'ingestion', '2016-03-01T00:00:00')
+        event.add_linkingObjectIdentifier(LinkingObjectIdentifier('local', 'existing'))
+        hash(event)
+        links = LinkingObjectIdentifierFactory.produce_linking_nodes(objects, role='source', target=event)
+        self.assertEqual(links, [LinkingObjectIdentifierFactory(x).produce_linking_node('source') for x in objects])
+        self.assertEqual(event.get_linkingObjectIdentifier()[1:], links)
+        self.assertIsNone(event._hash)
+        links[0].add_linkingObjectRole('outcome')
+        self.assertEqual(links[0].get_linkingObjectRole(), ['source', 'outcome'])
+        self.assertEqual(links[1].get_linkingObjectRole(), ['source'])
+        # The linking nodes are adopted by their target
+        hash(event)
+        links[1].set_linkingObjectIdentifierValue('renamed')
+        self.assertIsNone(event._hash)
+        self.assertEqual(LinkingObjectIdentifierFactory.produce_linking_nodes(objects)[0]._get_parents(), [])
+
+        agent = record.get_agent_list()[0]
+        self.assertEqual(LinkingAgentIdentifierFactory.produce_linking_nodes([agent], target=event),
+                         [LinkingAgentIdentifier('local', 'agent_0')])
+        self.assertEqual(event.get_linkingAgentIdentifier(), [LinkingAgentIdentifier('local', 'agent_0')])
+        self.assertEqual(LinkingEventIdentifierFactory.produce_linking_nodes([event], target=agent),
+                         [LinkingEventIdentifier('local', 'ingest')])
+        self.assertEqual(agent.get_linkingEventIdentifier(0).get_linkingEventIdentifierValue(), 'ingest')
+        self.assertRaises(ValueError, LinkingObjectIdentifierFactory.produce_linking_nodes, [agent])
+        self.assertRaises(ValueError, LinkingObjectIdentifierFactory.produce_linking_nodes, objects, target=agent)
+        self.assertRaises(NotImplementedError, LinkingEventIdentifierFactory.produce_linking_nodes, [event], role='x')
+
+    def testInterning(self):
+        table = InternTable(maxsize=3)
+        first = ''.join(['ingest', 'ion'])
+        self.assertIs(table.intern(first), first)
+        self.assertIs(table.intern(''.join(['inges', 'tion'])), first)
+        self.assertEqual((table.hits, table.misses), (1, 1))
+        self.assertIsNone(table.intern(None))
+        for x in ('a', 'b', 'c'):
+            table.intern(x)
+        self.assertEqual(len(table), 1)
+
+        path = getcwd() + '/testintern.xml'
+        build_example_record().write_to_file(path)
+        self.addCleanup(remove, path)
+        for factory in (XMLNodeFactory(path), StreamingXMLNodeFactory(path)):
+            events = list(factory.find_events())
+            self.assertIs(events[0].get_eventType(), events[2].get_eventType())
+            self.assertIs(events[0].get_eventIdentifier().get_eventIdentifierType(),
+                          events[1].get_linkingObjectIdentifier(0).get_linkingObjectIdentifierType())
+        events = list(XMLNodeFactory(path, intern_strings=False).find_events())
+        self.assertIsNot(events[0].get_eventType(), events[2].get_eventType())
+        self.assertEqual(PremisRecord(frompath=path), build_example_record())
+
+        table = InternTable()
+        self.assertIsNone(set_intern_table(table))
+        try:
+            self.assertIsNone(XMLNodeFactory(path).intern_table)
+            events = [Event(EventIdentifier('local', 'event_{}'.format(i)), ''.join(['valid', 'ation']), '2016')
+                      for i in range(2)]
+            self.assertIs(events[0].get_eventType(), events[1].get_eventType())
+            self.assertEqual(PremisRecord(frompath=path), build_example_record())
+        finally:
+            self.assertIs(set_intern_table(None), table)
+        self.assertRaises(TypeError, set_intern_table, {})
+
+    def testXMLCaching(self):
+        record = build_example_record()
+        obj = record.get_object_list()[0]
+        element = obj.toXML()
+        self.assertIs(obj.toXML(), element)
+        characteristics = obj.get_objectCharacteristics(0).toXML()
+        obj.get_storage(0).get_contentLocation().set_contentLocationValue('moved.txt')
+        self.assertIsNot(obj.toXML(), element)
+        self.assertIs(obj.toXML()[1], characteristics)
+        self.assertEqual(ET.tostring(obj.toXML()), ET.tostring(deepcopy(obj).toXML()))
+        obj.get_objectCharacteristics(0).get_fixity(0).set_messageDigest('changed')
+        self.assertIn(b'changed', ET.tostring(record.to_tree().getroot()))
+
+        record.cache_xml = True
+        agent = record.get_agent_list()[0]
+        agent.get_agentExtension(0).set_field('{http://example.com/a}child', 'value')
+        expected = deepcopy(record)
+        expected.cache_xml = False
+        self.assertEqual(record.to_xml(), expected.to_xml())
+        self.assertEqual(record.to_xml(), expected.to_xml())
+        self.assertIsNotNone(agent._xml)
+        obj.get_objectIdentifier(0).set_objectIdentifierValue('renamed')
+        expected.get_object_list()[0].get_objectIdentifier(0).set_objectIdentifierValue('renamed')
+        self.assertEqual(record.to_xml(), expected.to_xml())
+        # A namespace first used before the agent changes the agent's prefixes.
+        for r in (record, expected):
+            extension = RightsExtension()
+            extension.set_field('{http://example.com/r}child', 'value')
+            r.get_rights_list()[0].set_rightsExtension(extension)
+        self.assertIn(b'ns1:child', record.to_xml())
+        self.assertEqual(record.to_xml(), expected.to_xml())
+        self.assertEqual(record.to_xml(short_empty_elements=False),
+                         expected.to_xml(short_empty_elements=False))
+        path = getcwd() + '/testxmlcache.xml'
+        record.write_to_file(path)
+        self.addCleanup(remove, path)
+        self.assertEqual(PremisRecord(frompath=path), expected)
+
+        # Changing a list returned by a getter clears the caches too
+        element = obj.toXML()
+        for r in (record, expected):
+            r.get_object_list()[0].get_objectIdentifier().append(ObjectIdentifier('local', 'appended'))
+        self.assertIsNot(obj.toXML(), element)
+        self.assertIn(b'appended', ET.tostring(obj.toXML()))
+        record.write_to_file(path)
+        self.assertEqual(PremisRecord(frompath=path), expected)
+        self.assertIn(b'appended', record.to_xml())
+
+    def testOffsetIndex(self):
+        record = build_example_record()
+        record.get_agent_list()[0].get_agentExtension(0).set_field('{http://example.com/a}child', 'value')
+        path = getcwd() + '/testoffsets.xml'
+        record.write_to_file(path)
+        self.addCleanup(remove, path)
+        with open(path, 'rb') as f:
+            data = f.read()
+        rootStart, bodyStart, entities = scan_offsets(path)
+        self.assertEqual(data[rootStart:bodyStart].split()[0], b'<premis:premis')
+        self.assertEqual([x[0] for x in entities], ['object'] * 2 + ['event'] * 3 + ['rights', 'agent'])
+        self.assertEqual(entities[2][3], [('local', 'event_0')])
+        for kind, start, end, identifiers in entities:
+            self.assertTrue(data[start:end].startswith(b'<premis:' + kind.encode()))
+            self.assertTrue(data[start:end].endswith(b'</premis:' + kind.encode() + b'>'))
+
+        with OffsetIndex(path) as index:
+            self.addCleanup(remove, path + '.offsets')
+            self.assertEqual(index.get_indexpath(), path + '.offsets')
+            self.assertEqual(len(index), 7)
+            self.assertEqual(index.get_range('event', 'event_1'), entities[3][1:3])
+            self.assertEqual(index.get_object('object_1', 'local'), record.get_object('object_1'))
+            self.assertEqual(index.get_event('event_2'), record.get_event('event_2'))
+            self.assertEqual(index.get_agent('agent_0'), record.get_agent('agent_0'))
+            self.assertEqual(index.get_rights('rights_0'), record.get_rights('rights_0'))
+            self.assertIsNone(index.get_object('object_1', 'other'))
+            self.assertIsNone(index.get_event('missing'))
+            self.assertRaises(ValueError, index.get_range, 'file', 'object_0')
+        with OffsetIndex(path) as index:
+            self.assertTrue(index.is_current())
+            # Changing the file rebuilds the index on the next lookup
+            record.add_event(Event(EventIdentifier('local', 'event_3'), 'deletion', '2016-02-01T00:00:00'))
+            record.write_to_file(path)
+            self.assertFalse(index.is_current())
+            self.assertEqual(index.get_event('event_3'), record.get_event('event_3'))
+            self.assertEqual(len(index), 8)
+
+    def testOffsetIndexReplace(self):
+        record = build_example_record()
+        path = getcwd() + '/testreplace.xml'
+        record.write_to_file(path)
+        self.addCleanup(remove, path)
+        index = OffsetIndex(path)
+        self.addCleanup(remove, path + '.offsets')
+        self.addCleanup(index.close)
+        obj = record.get_object('object_0')
+        obj.set_originalName('a much longer original name than before.txt')
+        start, end = index.replace(obj)
+        self.assertEqual(index.get_range('object', 'object_0'), (start, end))
+        self.assertEqual(PremisRecord(frompath=path), record)
+        obj.set_originalName('short.txt')
+        self.assertLess(index.replace(obj)[1], end)
+        self.assertEqual(PremisRecord(frompath=path), record)
+        event = record.get_event('event_1')
+        event.set_eventType('x')
+        index.replace(event, sync=True)
+        self.assertEqual(index.get_event('event_2'), record.get_event('event_2'))
+        # Replacing an entity whose identifier has changed
+        agent = record.get_agent('agent_0')
+        agent.get_agentIdentifier(0).set_agentIdentifierValue('agent_1')
+        index.replace(agent, 'agent_0')
+        self.assertIsNone(index.get_agent('agent_0'))
+        self.assertEqual(index.get_agent('agent_1'), agent)
+        index.replace(record.get_rights_list()[0])
+        self.assertEqual(PremisRecord(frompath=path), record)
+        self.assertTrue(index.is_current())
+        rootStart, bodyStart, entities = scan_offsets(path)
+        self.assertEqual([index.get_range(kind, identifiers[0][1], identifiers[0][0])
+                          for kind, start, end, identifiers in entities],
+                         [(start, end) for kind, start, end, identifiers in entities])
+        self.assertRaises(KeyError, index.replace, Event(EventIdentifier('local', 'missing'), 'x', '2016'))
+        self.assertRaises(TypeError, index.replace, obj.get_objectIdentifier(0))
+
 if __name__ == '__main__':
     unittest.main()